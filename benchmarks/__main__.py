@@ -0,0 +1,11 @@
+# benchmarks/__main__.py
+
+import sys
+from pathlib import Path
+
+# Same import roots as pytest.ini: the src/ layout
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from benchmarks.runner import main
+
+sys.exit(main())
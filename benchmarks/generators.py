@@ -0,0 +1,108 @@
+# benchmarks/generators.py
+
+import json
+
+import numpy as np
+
+# Synthetic data lives around Riverside, CA (the demo road layer's area)
+CENTER = (33.83, -117.19)
+SPAN_DEG = 0.5
+SURFACES = ("paved", "dirt", "gravel")
+SURFACE_WEIGHTS = (0.6, 0.3, 0.1)
+HAZARD_TYPES = ("unpaved", "flood", "crash", "closure", "debris")
+DEFAULT_SEED = 0
+
+def _rng(seed):
+    return np.random.default_rng(seed)
+
+def _locations(count):
+    return np.array([f"L{i}" for i in range(count)], dtype=object)
+
+def random_points(n, seed=DEFAULT_SEED, span_deg=SPAN_DEG):
+    """(n, 2) float64 array of (lat, lon) points spread over span_deg around CENTER."""
+    offsets = (_rng(seed).random((n, 2)) - 0.5) * span_deg
+    return offsets + np.asarray(CENTER)
+
+def stop_set(n, seed=DEFAULT_SEED):
+    """n stops as a list of (lat, lon) tuples, the form optimize_route takes."""
+    return [tuple(p) for p in random_points(n, seed).tolist()]
+
+def road_network(n, seed=DEFAULT_SEED, vertices=(2, 6)):
+    """
+    GeoDataFrame of n short random-walk roads (lon/lat LineStrings) with a surface column.
+    Args:
+        vertices (tuple[int, int]): Min and max (exclusive) vertices per road
+    """
+    import geopandas as gpd
+    import shapely
+
+    rng = _rng(seed)
+    counts = rng.integers(*vertices, size=n)
+    starts = random_points(n, seed)[:, ::-1]
+    # ~50-150 m steps between vertices
+    steps = rng.normal(0.0, 0.001, size=(int(counts.sum()), 2))
+    road = np.repeat(np.arange(n), counts)
+    first = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    steps[first] = 0.0
+    walk = np.cumsum(steps, axis=0)
+    coords = starts[road] + walk - walk[first][road]
+    return gpd.GeoDataFrame(
+        {
+            "name": [f"Road {i}" for i in range(n)],
+            "surface": rng.choice(SURFACES, size=n, p=SURFACE_WEIGHTS),
+        },
+        geometry=shapely.linestrings(coords, indices=road),
+        crs="EPSG:4326",
+    )
+
+def hazard_set(n, seed=DEFAULT_SEED, n_locations=None):
+    """
+    n hazard dicts (location, type, severity) as score_hazards takes them, plus the
+    surface_data mapping for their locations.
+    Args:
+        n_locations (int, optional): Distinct locations (default ~sqrt(n), so locations
+            repeat the way they do along real routes)
+    Returns:
+        tuple[list[dict], dict]: hazards, surface_data
+    """
+    rng = _rng(seed)
+    n_locations = n_locations or max(1, int(np.sqrt(n)))
+    locations = _locations(n_locations)
+    where = rng.integers(0, n_locations, size=n)
+    types = rng.choice(HAZARD_TYPES, size=n)
+    severity = rng.integers(1, 6, size=n)
+    hazards = [
+        {"location": loc, "type": kind, "severity": sev}
+        for loc, kind, sev in zip(locations[where].tolist(), types.tolist(), severity.tolist())
+    ]
+    surface_data = dict(zip(locations.tolist(), rng.choice(SURFACES, size=n_locations).tolist()))
+    return hazards, surface_data
+
+def route_segments(n, seed=DEFAULT_SEED):
+    """n route segment dicts (id, location, surface, flood_risk) as analyze_route takes them."""
+    rng = _rng(seed)
+    surfaces = rng.choice(("paved", "unpaved", "gravel"), size=n, p=(0.7, 0.2, 0.1)).tolist()
+    flood = (rng.random(n) < 0.05).tolist()
+    return [
+        {"id": i, "location": f"L{i}", "surface": surface, "flood_risk": risk}
+        for i, (surface, risk) in enumerate(zip(surfaces, flood))
+    ]
+
+def write_route_geojson(path, n, seed=DEFAULT_SEED):
+    """Write an n-feature route FeatureCollection (two-point LineStrings) for parse_geojson_file."""
+    rng = _rng(seed)
+    a = random_points(n, seed)
+    b = a + rng.normal(0.0, 0.001, size=(n, 2))
+    surfaces = rng.choice(("paved", "unpaved", "gravel"), size=n).tolist()
+    flood = (rng.random(n) < 0.05).tolist()
+    features = [
+        {
+            "type": "Feature",
+            "properties": {"name": f"Segment {i}", "surface": surface, "flood_risk": risk},
+            "geometry": {"type": "LineString", "coordinates": [[p[1], p[0]], [q[1], q[0]]]},
+        }
+        for i, (p, q, surface, risk) in enumerate(zip(a.round(6).tolist(), b.round(6).tolist(), surfaces, flood))
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+    return path
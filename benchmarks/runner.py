@@ -0,0 +1,229 @@
+# benchmarks/runner.py
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.generators import DEFAULT_SEED
+
+FORMAT_VERSION = 1
+RESULTS_DIR = Path(".benchmarks")
+DEFAULT_OUTPUT = RESULTS_DIR / "latest.json"
+DEFAULT_BASELINE = RESULTS_DIR / "baseline.json"
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_TIME_S = 0.1
+DEFAULT_TOLERANCE = 0.25
+QUICK_MAX_SIZE = 10_000
+
+def time_callable(fn, repeat=DEFAULT_REPEAT, min_time_s=DEFAULT_MIN_TIME_S):
+    """
+    Time fn like timeit.autorange: calls per sample grow until one sample takes at
+    least min_time_s, then `repeat` samples are taken. The garbage collector is off
+    while timing, as in timeit.
+    Returns:
+        dict: per-call seconds (median_s, min_s, mean_s, stdev_s and every sample),
+            number, repeat
+    """
+    fn()  # warm-up: imports, lazy indexes, caches
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _sample(fn, repeat, min_time_s)
+    finally:
+        if enabled:
+            gc.enable()
+
+def _sample(fn, repeat, min_time_s):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time_s or number >= 1 << 20:
+            break
+        number *= 10 if elapsed < min_time_s / 10 else 2
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "mean_s": statistics.fmean(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "samples": samples,
+        "number": number,
+        "repeat": len(samples),
+    }
+
+def run_suite(cases, sizes, seed=DEFAULT_SEED, repeat=DEFAULT_REPEAT, min_time_s=DEFAULT_MIN_TIME_S, log=None):
+    """
+    Returns:
+        list[dict]: one result per (case, size): name, size, setup_s and time_callable stats
+    """
+    results = []
+    for bench in cases:
+        for size in bench.sizes(sizes):
+            t0 = time.perf_counter()
+            fn = bench.setup(size, seed)
+            setup_s = time.perf_counter() - t0
+            try:
+                stats = time_callable(fn, repeat, min_time_s)
+            finally:
+                if bench.teardown is not None:
+                    bench.teardown(fn)
+            result = {"name": bench.name, "size": size, "setup_s": setup_s, **stats}
+            results.append(result)
+            if log:
+                log(f"{bench.name:<40} {size:>9,}  {_format_seconds(stats['median_s']):>10}")
+    return results
+
+def environment():
+    """Machine and version info stored alongside results; timings only compare on like machines."""
+    import numpy
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+    }
+
+def save_results(path, results, seed=DEFAULT_SEED):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seed": seed,
+        "environment": environment(),
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    return payload
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def compare_results(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Match results by (name, size) and compare their fastest samples: interference from
+    other processes only ever adds time, so the minimum is the most repeatable statistic.
+    As in asv, a change also needs the two sets of samples not to overlap, so one noisy
+    sample on a busy machine is not reported as a regression.
+    Args:
+        current, baseline (list[dict]): Result lists (the "results" of a saved file)
+        tolerance (float): Allowed slowdown; 0.25 flags anything over 1.25x the baseline
+    Returns:
+        list[dict]: name, size, baseline_s, current_s, ratio and status, which is
+            "regression", "improvement" (faster by more than the tolerance), "ok" or
+            "new" (no baseline entry)
+    """
+    before = {(r["name"], r["size"]): r for r in baseline}
+    rows = []
+    for result in current:
+        key = (result["name"], result["size"])
+        old = before.get(key)
+        row = {"name": key[0], "size": key[1], "baseline_s": old and old["min_s"], "current_s": result["min_s"],
+               "ratio": None, "status": "new"}
+        if old and old["min_s"]:
+            row["ratio"] = result["min_s"] / old["min_s"]
+            row["status"] = "ok"
+            if row["ratio"] > 1 + tolerance and result["min_s"] > _slowest(old):
+                row["status"] = "regression"
+            elif row["ratio"] < 1 / (1 + tolerance) and _slowest(result) < old["min_s"]:
+                row["status"] = "improvement"
+        rows.append(row)
+    return rows
+
+def _slowest(result):
+    return max(result.get("samples") or [result["median_s"]])
+
+def format_comparison(rows):
+    lines = [f"{'benchmark':<40} {'size':>9}  {'baseline':>10}  {'current':>10}  {'ratio':>6}  status"]
+    for row in rows:
+        baseline = _format_seconds(row["baseline_s"]) if row["baseline_s"] else "-"
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        lines.append(f"{row['name']:<40} {row['size']:>9,}  {baseline:>10}  "
+                     f"{_format_seconds(row['current_s']):>10}  {ratio:>6}  {row['status']}")
+    return "\n".join(lines)
+
+def _format_seconds(seconds):
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+# --- CLI ---
+def _parse_sizes(text):
+    return tuple(int(float(s)) for s in text.split(",") if s.strip())
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Run the PavePath benchmark suite on synthetic data.")
+    parser.add_argument("-k", "--filter", help="Only cases whose name contains this text")
+    parser.add_argument("--sizes", type=_parse_sizes, help="Comma-separated input sizes, e.g. 1e2,1e4")
+    parser.add_argument("--full", action="store_true", help="Run every size up to 10^6 (default stops at 10^4)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME_S, help="Seconds per sample")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_OUTPUT, help="Results JSON file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown before a case is a regression (0.25 = 1.25x)")
+    parser.add_argument("--list", action="store_true", help="List cases and exit")
+    return parser
+
+def main(argv=None):
+    from benchmarks import suite
+
+    args = build_parser().parse_args(argv)
+    cases = suite.select(args.filter)
+    if args.list:
+        for bench in cases:
+            print(f"{bench.name:<40} sizes {', '.join(f'{s:,}' for s in bench.sizes())}")
+        return 0
+    sizes = args.sizes or tuple(s for s in suite.SIZES if args.full or s <= QUICK_MAX_SIZE)
+
+    results = run_suite(cases, sizes, args.seed, args.repeat, args.min_time, log=print)
+    save_results(args.output, results, args.seed)
+    print(f"\nResults written to {args.output}")
+
+    status = 0
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = load_results(args.baseline)
+        rows = compare_results(results, baseline["results"], args.tolerance)
+        print(f"\nCompared with {args.baseline} (commit {baseline['environment'].get('commit')}):")
+        print(format_comparison(rows))
+        regressions = [row for row in rows if row["status"] == "regression"]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {1 + args.tolerance:.2f}x the baseline")
+            status = 1
+    if args.save_baseline:
+        save_results(args.baseline, results, args.seed)
+        print(f"Baseline saved to {args.baseline}")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# benchmarks/suite.py
+
+import os
+import tempfile
+
+from benchmarks import generators
+
+# 10^2 .. 10^6; each case stops at its own max_size
+SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+
+class Case:
+    """
+    One benchmark: setup(size, seed) builds the inputs (untimed) and returns the
+    zero-argument callable that is timed. teardown, if given, gets setup's callable.
+    """
+
+    def __init__(self, name, setup, max_size=SIZES[-1], teardown=None):
+        self.name = name
+        self.setup = setup
+        self.max_size = max_size
+        self.teardown = teardown
+
+    def sizes(self, sizes=SIZES):
+        return [size for size in sizes if size <= self.max_size]
+
+CASES = []
+
+def case(name, max_size=SIZES[-1], teardown=None):
+    def register(setup):
+        CASES.append(Case(name, setup, max_size, teardown))
+        return setup
+    return register
+
+def select(pattern=None):
+    """Cases whose name contains pattern (all when None)."""
+    return [c for c in CASES if not pattern or pattern in c.name]
+
+# --- Distances ---
+@case("route_optimizer.haversine")
+def _haversine(size, seed):
+    from pavepath.route_optimizer import haversine
+
+    a = generators.stop_set(size, seed)
+    b = generators.stop_set(size, seed + 1)
+    return lambda: [haversine(p, q) for p, q in zip(a, b)]
+
+@case("route_optimizer.haversine_many")
+def _haversine_many(size, seed):
+    from pavepath.route_optimizer import haversine_many
+
+    a = generators.random_points(size, seed)
+    b = generators.random_points(size, seed + 1)
+    return lambda: haversine_many(a, b)
+
+# --- Routing ---
+# Multi-stop routing builds an N x N cost matrix: 10^3 stops is already 10^6 legs.
+# The improvement budget is off so timings measure matrix + construction, not the clock.
+@case("core.routing.optimize_route", max_size=1_000)
+def _optimize_route(size, seed):
+    from pavepath.core.routing import optimize_route
+
+    stops = generators.stop_set(size, seed)
+    return lambda: optimize_route(stops, mode="safe", time_budget_s=0.0)
+
+# --- Hazards ---
+@case("hazard_scoring.score_hazards")
+def _score_hazards(size, seed):
+    from pavepath.hazard_scoring import score_hazards
+
+    hazards, surface_data = generators.hazard_set(size, seed)
+    return lambda: score_hazards(hazards, surface_data)
+
+@case("hazard_service.analyze_route")
+def _analyze_route(size, seed):
+    from pavepath.hazard_service import analyze_route
+
+    segments = generators.route_segments(size, seed)
+    surface_data = {s["location"]: s["surface"] for s in segments}
+    # analyze_route stores scores on fresh hazard dicts, so the input is reusable
+    return lambda: analyze_route({"segments": segments}, surface_data)
+
+# --- Input / overlay ---
+def _remove_file(run):
+    os.unlink(run.path)
+
+# json.load of 10^6 features needs several GB; 10^5 (~15 MB) is the largest run here
+@case("input_parser.parse_geojson_file", max_size=100_000, teardown=_remove_file)
+def _parse_geojson_file(size, seed):
+    from pavepath.input_parser import parse_geojson_file
+
+    fd, path = tempfile.mkstemp(suffix=".geojson", prefix="pavepath-bench-")
+    os.close(fd)
+    generators.write_route_geojson(path, size, seed)
+
+    def run():
+        return parse_geojson_file(path)
+    run.path = path
+    return run
+
+@case("mapper.filter_roads")
+def _filter_roads(size, seed):
+    from surface_overlay.mapper import filter_roads
+
+    roads = generators.road_network(size, seed)
+    return lambda: filter_roads(roads, "dirt")
+
+@case("mapper.filter_roads[RoadIndex]")
+def _filter_roads_indexed(size, seed):
+    from surface_overlay.mapper import RoadIndex, filter_roads
+
+    index = RoadIndex(generators.road_network(size, seed))
+    return lambda: filter_roads(index, "dirt")
@@ -1,6 +1,7 @@
 import streamlit as st
 from streamlit_folium import st_folium
-from pavepath.core.routing import optimize_route
+from pavepath.core.routing import default_route_cache, optimize_route
+from pavepath.core.segments import as_segment_table
 from pavepath.visualizer import render_route_map
 from pavepath.utils.geocoder import geocode_location
 from pavepath.utils.display import mask_key  # extracted helper
@@ -17,7 +18,7 @@ def generate_route(origin: str, destination: str, api_key: str):
     if None in origin_coords or None in destination_coords:
         return None
 
-    return optimize_route([origin_coords, destination_coords], mode="driving")
+    return optimize_route([origin_coords, destination_coords], mode="driving", cache=default_route_cache)
 
 
 # Load API key from Streamlit Secrets
@@ -74,13 +75,13 @@ if st.session_state.route_data:
     st.subheader("🗺️ Optimized Route with Hazard Overlays")
     st_folium(render_route_map(st.session_state.route_data), width=350, height=400)
 
-    segments = st.session_state.route_data.get("segments", [])
-    total_score = sum(seg.get("hazard_score", 0) for seg in segments)
+    segments = as_segment_table(st.session_state.route_data.get("segments", []))
+    total_score = segments.total_hazard()
     st.markdown(f"**Total Hazard Score:** {round(total_score, 2)}")
 
-    high_risk = [seg for seg in segments if seg.get("hazard_score", 0) > HAZARD_THRESHOLD]
-    if high_risk:
-        st.warning(f"{len(high_risk)} segment(s) flagged as high-risk.")
+    high_risk_count = segments.high_risk_count(HAZARD_THRESHOLD)
+    if high_risk_count:
+        st.warning(f"{high_risk_count} segment(s) flagged as high-risk.")
 
     with st.expander("📊 Segment-Level Hazard Scores"):
         for i, seg in enumerate(segments):
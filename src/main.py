@@ -6,6 +6,9 @@ import pydeck as pdk
 import streamlit.components.v1 as components
 
 from surface_overlay import mapper
+from surface_overlay.compiled import compiled_mtime, compiled_path, is_compiled
+from surface_overlay.layers import path_layer_data
+from pavepath.utils.color_map import threshold_rgb
 from pavepath.hazard_service import analyze_route
 from pavepath.visualizer import visualize_route_scores
 
@@ -29,9 +32,57 @@ st.title("PavePath: Routing App with Dirt/Paved Road Toggle")
 road_type_input = st.radio("Select road type to display:", ["Dirt Roads", "Paved Roads", "Both"])
 road_type_mapped = {"Dirt Roads": "dirt", "Paved Roads": "paved", "Both": "both"}[road_type_input]
 
+ROADS_PATH = "data/roads.geojson"
+
+# ♻️ Cached Data
+# Streamlit reruns this script on every widget change. Everything that depends only on
+# the road file and the surface filter is cached (keyed on the source mtime and the
+# compiled layer's meta.json mtime, so edits or a recompile invalidate it); a slider
+# move only recolours the cached paths.
+# cache_resource hands back the same objects without copying - treat them as read-only.
+def roads_mtime(path):
+    mtimes = [os.path.getmtime(path)] if os.path.exists(path) else []
+    if is_compiled(compiled_path(path)):
+        mtimes.append(compiled_mtime(compiled_path(path)))
+    if not mtimes:
+        raise FileNotFoundError(path)
+    return max(mtimes)
+
+@st.cache_resource(max_entries=2, show_spinner="Loading roads...")
+def load_roads_cached(path, mtime):
+    return mapper.load_roads(path)
+
+@st.cache_resource(max_entries=6)
+def filter_roads_cached(path, mtime, road_type):
+    return mapper.filter_roads(load_roads_cached(path, mtime), road_type)
+
+# 🧪 Generate Random Hazard Data
+def generate_random_hazards():
+    return {
+        "weather": round(random.uniform(0, 10), 1),
+        "road_condition": round(random.uniform(0, 10), 1),
+        "traffic": round(random.uniform(0, 10), 1),
+        "crime": round(random.uniform(0, 10), 1),
+        "natural_disaster": round(random.uniform(0, 10), 1)
+    }
+
+@st.cache_resource(max_entries=6, show_spinner="Scoring hazards...")
+def analyze_roads_cached(path, mtime, road_type):
+    """
+    Demo hazards and their analysis for one filtered view, plus the pydeck path column.
+    Returns:
+        tuple[dict, pd.DataFrame]: analyze_route result, per-road PathLayer columns
+    """
+    filtered = filter_roads_cached(path, mtime, road_type)
+    route_data = [generate_random_hazards() for _ in range(len(filtered))]
+    result = analyze_route(route_data)
+    scores = [s["score"] for s in result.get("segment_scores", [])]
+    return result, path_layer_data(filtered, scores if len(scores) == len(filtered) else None)
+
 # 🗂️ Load Road Data
 try:
-    roads_gdf = mapper.load_roads("data/roads.geojson")
+    mtime = roads_mtime(ROADS_PATH)
+    roads_gdf = load_roads_cached(ROADS_PATH, mtime)
     if roads_gdf.empty:
         st.warning("Roads dataset is empty. Check data/roads.geojson.")
 except FileNotFoundError:
@@ -42,7 +93,7 @@ except Exception as e:
     st.stop()
 
 # 🔍 Apply Filter
-filtered_roads = mapper.filter_roads(roads_gdf, road_type_mapped)
+filtered_roads = filter_roads_cached(ROADS_PATH, mtime, road_type_mapped)
 
 # 🧰 Debugging + UI Feedback
 if st.checkbox("Show road data table"):
@@ -57,25 +108,12 @@ if filtered_roads.empty:
 # 🎚️ User-defined risk threshold
 risk_threshold = st.slider("Set risk threshold", min_value=0.0, max_value=10.0, value=6.0, step=0.5)
 
-# 🧪 Generate Random Hazard Data
-def generate_random_hazards():
-    return {
-        "weather": round(random.uniform(0, 10), 1),
-        "road_condition": round(random.uniform(0, 10), 1),
-        "traffic": round(random.uniform(0, 10), 1),
-        "crime": round(random.uniform(0, 10), 1),
-        "natural_disaster": round(random.uniform(0, 10), 1)
-    }
-
-route_data = [generate_random_hazards() for _ in range(len(filtered_roads))]
-result = analyze_route(route_data, risk_threshold=risk_threshold)
-
-# ⚠️ Inject hazard scores into filtered_roads for map coloring
-scores = [s['score'] for s in result.get('segment_scores', [])]
-if len(scores) == len(filtered_roads):
-    filtered_roads = filtered_roads.copy()
-    filtered_roads['hazard_score'] = scores
-else:
+cached_result, road_paths = analyze_roads_cached(ROADS_PATH, mtime, road_type_mapped)
+# Scores don't depend on the threshold; only the reroute decision does
+result = dict(cached_result, should_reroute=any(
+    s["score"] >= risk_threshold for s in cached_result.get("segment_scores", [])
+))
+if road_paths["hazard_score"].isna().all() and not filtered_roads.empty:
     st.warning("Hazard score count doesn't match filtered road segments.")
 
 # 📊 Show Hazard Scores
@@ -105,28 +143,11 @@ if st.checkbox("Download hazard analysis as CSV"):
 
 # 🗺️ Pydeck visualization
 if not filtered_roads.empty:
-    def linestring_to_coords(geom):
-        if geom and geom.geom_type == "LineString":
-            return [[lat, lon] for lon, lat in geom.coords]  # swap to [lat, lon]
-        return []
-
-    filtered_roads["path"] = filtered_roads.geometry.apply(linestring_to_coords)
-
-    def score_to_color(score):
-        if score is None:
-            return [100, 100, 255]  # neutral blue
-        if score < 3:
-            return [0, 180, 80]     # green
-        elif score < 6:
-            return [255, 200, 0]    # yellow
-        else:
-            return [220, 60, 60]    # red
-
-    filtered_roads["color"] = filtered_roads.get("hazard_score", pd.Series([None] * len(filtered_roads))).apply(score_to_color)
+    deck_data = road_paths.assign(color=threshold_rgb(road_paths["hazard_score"], risk_threshold).tolist())
 
     layer = pdk.Layer(
         "PathLayer",
-        filtered_roads,
+        deck_data,
         get_path="path",
         get_color="color",
         width_scale=1,
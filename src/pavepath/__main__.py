@@ -0,0 +1,5 @@
+import sys
+
+from pavepath.cli import main
+
+sys.exit(main())
@@ -1,7 +1,9 @@
 # utils/app.py
 
+import numpy as np
 import streamlit as st
-from route_optimizer import optimize_route
+from pavepath.core.routing import default_route_cache, optimize_route
+from pavepath.core.segments import as_segment_table
 from utils.geocoder import geocode_location
 import folium
 from streamlit_folium import folium_static
@@ -24,17 +26,21 @@ if st.button("Generate Route"):
 
     # Now pass numeric coords to the optimizer
     locations = [(start_lat, start_lon), (end_lat, end_lon)]
-    result = optimize_route(locations, mode="driving")
+    result = optimize_route(locations, mode="driving", cache=default_route_cache)
 
     # Map
     m = folium.Map(location=[start_lat, start_lon], zoom_start=11)
-    for seg in result["segments"]:
-        color = "red" if seg["hazard_score"] > 0.7 else "orange" if seg["hazard_score"] > 0.4 else "green"
+    segments = as_segment_table(result["segments"])
+    colors = np.select([segments.hazard_score > 0.7, segments.hazard_score > 0.4], ["red", "orange"], "green")
+    for start, end, color, score, distance_km in zip(
+        segments.from_coords.tolist(), segments.to_coords.tolist(), colors,
+        segments.hazard_score.tolist(), segments.distance_km.tolist()
+    ):
         folium.PolyLine(
-            locations=[seg["from"], seg["to"]],
+            locations=[start, end],
             color=color,
             weight=5,
-            tooltip=f"Hazard: {seg['hazard_score']}, Distance: {seg['distance_km']} km"
+            tooltip=f"Hazard: {score}, Distance: {distance_km} km"
         ).add_to(m)
     folium_static(m)
 
@@ -0,0 +1,57 @@
+# pavepath/cli.py
+
+import argparse
+import sys
+
+def _roads_compile(args):
+    from surface_overlay.compiled import compile_roads, compiled_path
+    from surface_overlay.mapper import load_roads
+
+    out = compile_roads(load_roads(args.source), args.output or compiled_path(args.source), source_path=args.source)
+    print(f"Compiled {args.source} -> {out}")
+
+def _roads_index(args):
+    from pavepath.routing.hierarchy import build_index
+
+    out = build_index(args.source, mode=args.mode, out_path=args.output)
+    print(f"Built routing index for {args.source} -> {out}")
+
+def _serve(args):
+    from pavepath.service import serve
+
+    print(f"Serving on http://{args.host}:{args.port}")
+    serve(args.host, args.port, workers=args.workers, max_pending=args.max_pending,
+          request_timeout_s=args.timeout)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pavepath")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    roads = commands.add_parser("roads", help="Road layer preprocessing")
+    roads_commands = roads.add_subparsers(dest="roads_command", required=True)
+
+    compile_cmd = roads_commands.add_parser("compile", help="Write a memory-mappable binary road layer")
+    compile_cmd.add_argument("source", help="GeoJSON (or any format geopandas reads)")
+    compile_cmd.add_argument("-o", "--output", help="Output directory (default: <source>.roads)")
+    compile_cmd.set_defaults(func=_roads_compile)
+
+    index_cmd = roads_commands.add_parser("index", help="Build the contraction-hierarchy routing index")
+    index_cmd.add_argument("source")
+    index_cmd.add_argument("--mode", default="safe")
+    index_cmd.add_argument("-o", "--output", help="Output file (default: <source>.ch.npz)")
+    index_cmd.set_defaults(func=_roads_index)
+
+    serve_cmd = commands.add_parser("serve", help="Run the HTTP routing service")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=8080)
+    serve_cmd.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    serve_cmd.add_argument("--max-pending", type=int, default=256, help="In-flight requests before 503")
+    serve_cmd.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    serve_cmd.set_defaults(func=_serve)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,140 @@
 # pavepath/core/alerts.py
 
+import numpy as np
+import shapely
+
+from pavepath.core.segments import SegmentTable, as_segment_table
+from pavepath.route_optimizer import haversine_many
+from pavepath.utils.geometry import linestring_arrays
+from pavepath.utils.projection import query_dwithin_m
+
+# Road layer surfaces treated as dirt / unpaved
+DIRT_SURFACES = frozenset({"dirt", "unpaved", "ground", "earth", "mud"})
+SNAP_DISTANCE_M = 15.0
+# Endpoints are compared at 1e-6 degrees (~10 cm)
+_ID_SCALE = 1e6
+
+def _mix(h):
+    # splitmix64 finalizer: spreads nearby coordinates over the whole id space
+    h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+def segment_ids(from_coords, to_coords):
+    """
+    Direction-independent 64-bit id per segment, from its endpoints rounded to ~10 cm.
+    Args:
+        from_coords, to_coords (np.ndarray): (N, 2) endpoints as (lat, lon)
+    """
+    a = np.round(np.asarray(from_coords, dtype=np.float64).reshape(-1, 2) * _ID_SCALE).astype(np.int64)
+    b = np.round(np.asarray(to_coords, dtype=np.float64).reshape(-1, 2) * _ID_SCALE).astype(np.int64)
+    swap = (a[:, 0] > b[:, 0]) | ((a[:, 0] == b[:, 0]) & (a[:, 1] > b[:, 1]))
+    lo = np.where(swap[:, None], b, a).view(np.uint64)
+    hi = np.where(swap[:, None], a, b).view(np.uint64)
+    with np.errstate(over="ignore"):
+        h = _mix(lo[:, 0])
+        for column in (lo[:, 1], hi[:, 0], hi[:, 1]):
+            h = _mix(h ^ column)
+    return h
+
+class DirtRoadIndex:
+    """
+    Dirt-road lookup built once from a road layer's `surface` column.
+
+    Every consecutive vertex pair of a dirt road is stored as a hashed segment id, so a
+    route that follows the road network is classified with one sorted-array lookup.
+    Route segments that miss (different vertices, straight-line legs) fall back to
+    geometry: a segment counts as dirt when its midpoint and both endpoints snap to a
+    dirt road within snap_m (metres, measured around each point's own latitude).
+    """
+
+    def __init__(self, roads_gdf, surfaces=DIRT_SURFACES, snap_m=SNAP_DISTANCE_M):
+        self.snap_m = snap_m
+        surface = roads_gdf["surface"] if "surface" in roads_gdf else None
+        dirt = roads_gdf[surface.isin(surfaces)] if surface is not None else roads_gdf.iloc[[]]
+        self.roads = dirt
+        geoms = np.asarray(dirt.geometry.explode(index_parts=False).values, dtype=object)
+
+        coords, offsets = linestring_arrays(geoms)
+        latlon = coords[:, ::-1]
+        road_of_vertex = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        starts = np.flatnonzero(road_of_vertex[:-1] == road_of_vertex[1:])
+        self._ids = np.unique(segment_ids(latlon[starts], latlon[starts + 1]))
+
+        self._geoms = geoms
+        self._tree = shapely.STRtree(geoms)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _snaps(self, points):
+        hits, _ = query_dwithin_m(self._tree, self._geoms, shapely.points(points[:, 1], points[:, 0]), self.snap_m)
+        near = np.zeros(len(points), dtype=bool)
+        near[hits] = True
+        return near
+
+    def dirt_mask(self, from_coords, to_coords):
+        """
+        Args:
+            from_coords, to_coords (np.ndarray): (N, 2) segment endpoints as (lat, lon)
+        Returns:
+            np.ndarray: True per segment on a dirt road
+        """
+        from_coords = np.asarray(from_coords, dtype=np.float64).reshape(-1, 2)
+        to_coords = np.asarray(to_coords, dtype=np.float64).reshape(-1, 2)
+        ids = segment_ids(from_coords, to_coords)
+        pos = np.minimum(np.searchsorted(self._ids, ids), max(len(self._ids) - 1, 0))
+        mask = self._ids[pos] == ids if len(self._ids) else np.zeros(len(ids), dtype=bool)
+
+        misses = np.flatnonzero(~mask)
+        if len(misses) and len(self.roads):
+            a, b = from_coords[misses], to_coords[misses]
+            near = self._snaps(np.vstack([a, b, (a + b) / 2])).reshape(3, -1).all(axis=0)
+            mask[misses[near]] = True
+        return mask
+
+    def route_mask(self, route_segment):
+        """dirt_mask for a SegmentTable or list of legacy segment dicts."""
+        table = as_segment_table(route_segment)
+        return self.dirt_mask(table.from_coords, table.to_coords)
+
 def check_for_dirt_road(route_segment, dirt_roads):
     """Returns True if any segment in route overlaps with dirt road list"""
-    return any(segment in dirt_roads for segment in route_segment)
+    return len(_dirt_segments(route_segment, dirt_roads)) > 0
+
+def _dirt_segments(route_segment, dirt_roads):
+    """Indices of route segments on dirt roads."""
+    if isinstance(dirt_roads, DirtRoadIndex):
+        return np.flatnonzero(dirt_roads.route_mask(route_segment))
+    try:
+        lookup = set(dirt_roads)  # one O(dirt_roads) pass, then O(1) per segment
+        return np.flatnonzero([segment in lookup for segment in route_segment])
+    except TypeError:  # unhashable entries: keep the original list membership test
+        return np.flatnonzero([segment in dirt_roads for segment in route_segment])
+
+def _segment_lengths(route_segment):
+    if isinstance(route_segment, SegmentTable) or (
+        route_segment and isinstance(route_segment[0], dict) and "from" in route_segment[0]
+    ):
+        # From the endpoints, not distance_km: that is rounded to 10 m, so short
+        # network-following segments would weigh nothing
+        table = as_segment_table(route_segment)
+        return haversine_many(table.from_coords, table.to_coords)
+    return np.ones(len(route_segment))  # opaque segment ids: weight each one equally
 
 def generate_alert(route_segment, dirt_roads):
-    """Returns alert message and action options"""
-    if check_for_dirt_road(route_segment, dirt_roads):
+    """
+    Returns alert message and action options, plus the dirt segment indices and the
+    fraction of route distance on dirt
+    """
+    dirt = _dirt_segments(route_segment, dirt_roads)
+    if len(dirt):
+        lengths = _segment_lengths(route_segment)
+        total = float(lengths.sum())
         return {
             "message": "⚠️ Dirt road detected along your route.",
-            "options": ["Proceed", "Reroute"]
+            "options": ["Proceed", "Reroute"],
+            "segments": dirt.tolist(),
+            "dirt_fraction": float(lengths[dirt].sum()) / total if total else 1.0,
         }
-    return {"message": None}
+    return {"message": None, "segments": [], "dirt_fraction": 0.0}
@@ -0,0 +1,262 @@
+# pavepath/core/monitor.py
+
+import numpy as np
+import shapely
+
+from pavepath.core.segments import SegmentTable
+from pavepath.hazard_scoring import score_hazard
+from pavepath.hazard_service import DEFAULT_RISK_THRESHOLD
+from pavepath.hazard_store import DEFAULT_BUFFER_M
+from pavepath.utils.projection import LocalProjection
+
+DEFAULT_LOOKAHEAD = 5      # segments checked ahead of the vehicle
+SNAP_WINDOW = 8            # segments searched forward from the cursor on each ping
+OFF_ROUTE_M = 75.0
+ARRIVED_M = 30.0
+_M_PER_DEG = 111_320.0
+
+def _route_points(route):
+    if isinstance(route, SegmentTable):
+        if len(route) == 0:
+            return np.empty((0, 2))
+        return np.vstack([route.from_coords, route.to_coords[-1:]])
+    return np.asarray(route, dtype=np.float64).reshape(-1, 2)
+
+def _point_segment_distance(p, a, b):
+    """Distance from p to each segment a[i] -> b[i] and the position t (0-1) along it."""
+    ab = b - a
+    length2 = np.einsum("ij,ij->i", ab, ab)
+    t = np.clip(np.einsum("ij,ij->i", p - a, ab) / np.where(length2 > 0, length2, 1.0), 0.0, 1.0)
+    closest = a + t[:, None] * ab
+    return np.hypot(*(closest - p).T), t
+
+class _VehicleRoute:
+    __slots__ = ("points", "xy", "cum_m", "base_scores", "scores", "dirt", "cursor", "hazard_alerted",
+                 "dirt_alerted", "off_route", "projection", "tree")
+
+    def __init__(self, points, base_scores, scores, dirt):
+        self.points = points
+        self.projection = LocalProjection.from_bounds(points[:, 1].min(), points[:, 0].min(),
+                                                      points[:, 1].max(), points[:, 0].max())
+        self.xy = np.column_stack(self.projection.forward(points[:, 1], points[:, 0]))
+        self.cum_m = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(self.xy, axis=0).T))])
+        self.base_scores = base_scores
+        self.scores = scores
+        self.dirt = dirt
+        self.cursor = 0
+        # Alerts already sent per segment; a hazard flag is cleared again when the score rises
+        self.hazard_alerted = np.zeros(len(scores), dtype=bool)
+        self.dirt_alerted = np.zeros(len(scores), dtype=bool)
+        self.off_route = False
+        self.tree = None  # STRtree over segments, built on the first full rescan
+
+    def segment_tree(self):
+        if self.tree is None:
+            pairs = np.stack([self.xy[:-1], self.xy[1:]], axis=1)
+            self.tree = shapely.STRtree(shapely.linestrings(pairs))
+        return self.tree
+
+class RerouteMonitor:
+    """
+    Tracks live vehicle positions against their planned routes.
+
+    Each registered route keeps per-segment hazard scores and a dirt-road mask computed
+    once up front. A ping snaps the vehicle to the nearest segment in a short window
+    ahead of its cursor and checks only the next `lookahead` segments, so the work per
+    ping is constant regardless of route length. When the vehicle is not in that window
+    (GPS gap, skipped ahead, off route) the rest of the route is searched through a
+    per-route STRtree built on first use, O(log n) per ping. Alerts fire once per
+    segment; a hazard alert fires again only if a hazard refresh raises the score:
+
+        hazard_ahead  a segment's score is at or above risk_threshold
+        dirt_ahead    a segment is on a dirt road
+        off_route     the vehicle is more than off_route_m from its route
+        arrived       the vehicle reached the end (the route is dropped)
+    """
+
+    def __init__(self, risk_threshold=DEFAULT_RISK_THRESHOLD, lookahead=DEFAULT_LOOKAHEAD,
+                 off_route_m=OFF_ROUTE_M, arrived_m=ARRIVED_M, hazard_store=None, buffer_m=DEFAULT_BUFFER_M,
+                 dirt_index=None):
+        self.risk_threshold = risk_threshold
+        self.lookahead = lookahead
+        self.off_route_m = off_route_m
+        self.arrived_m = arrived_m
+        self.hazard_store = hazard_store
+        self.buffer_m = buffer_m
+        self.dirt_index = dirt_index
+        self._routes = {}
+        self.stats = {"pings": 0, "alerts": 0, "rescans": 0}
+
+    def __len__(self):
+        return len(self._routes)
+
+    def __contains__(self, vehicle_id):
+        return vehicle_id in self._routes
+
+    # --- Routes ---
+    def _store_scores(self, points, segments=None):
+        """
+        Highest hazard score within buffer_m of each segment (or of the given segment
+        indices), from the hazard store.
+        """
+        if segments is None:
+            segments = np.arange(max(len(points) - 1, 0))
+        scores = np.zeros(len(segments))
+        if self.hazard_store is None or len(segments) == 0:
+            return scores
+        coords = np.stack([points[segments], points[segments + 1]], axis=1).reshape(-1, 2)
+        offsets = np.arange(0, 2 * len(segments) + 1, 2)
+        lines, hazard_ids = self.hazard_store.query_lines(coords, offsets, self.buffer_m)
+        for line, hazard_id in zip(lines.tolist(), hazard_ids.tolist()):
+            h = self.hazard_store[hazard_id]
+            scores[line] = max(scores[line], h["score"] if "score" in h else score_hazard(h))
+        return scores
+
+    def register_route(self, vehicle_id, route, scores=None, dirt=None):
+        """
+        Args:
+            route (list[tuple] | SegmentTable): Route as (lat, lon) points or segments
+            scores (array-like, optional): Hazard score per segment (default: the
+                SegmentTable's hazard_score); combined with the hazard store, if any
+            dirt (array-like, optional): True per segment on a dirt road (default: from
+                the monitor's DirtRoadIndex, if any)
+        """
+        points = _route_points(route)
+        if len(points) < 2:
+            raise ValueError("a monitored route needs at least two points")
+        n = len(points) - 1
+        if scores is None:
+            scores = route.hazard_score if isinstance(route, SegmentTable) else np.zeros(n)
+        base_scores = np.asarray(scores, dtype=np.float64)
+        if dirt is None and self.dirt_index is not None:
+            dirt = self.dirt_index.dirt_mask(points[:-1], points[1:])
+        dirt = np.zeros(n, dtype=bool) if dirt is None else np.asarray(dirt, dtype=bool)
+        if len(base_scores) != n or len(dirt) != n:
+            raise ValueError(f"expected {n} segment scores / dirt flags")
+        scores = np.maximum(base_scores, self._store_scores(points))
+        self._routes[vehicle_id] = _VehicleRoute(points, base_scores, scores, dirt)
+
+    def unregister(self, vehicle_id):
+        self._routes.pop(vehicle_id, None)
+
+    def refresh_hazards(self, changed=None):
+        """
+        Re-read the hazard store for the remaining part of the routes near `changed`.
+        Args:
+            changed (array-like, optional): Lon/lat geometries of hazards that were added,
+                moved or removed (e.g. HazardStore.last_changed); None rescores every route
+        Returns:
+            int: routes rescored
+        """
+        if changed is not None:
+            changed = np.asarray(changed, dtype=object)
+            if len(changed) == 0:
+                return 0
+            changed_tree = shapely.STRtree(changed)
+        rescored = 0
+        for route in self._routes.values():
+            remaining = np.arange(route.cursor, len(route.scores))
+            if changed is not None:
+                remaining = remaining[self._segments_near(route, remaining, changed_tree)]
+                if len(remaining) == 0:
+                    continue
+            scores = np.maximum(route.base_scores[remaining], self._store_scores(route.points, remaining))
+            route.hazard_alerted[remaining[scores > route.scores[remaining]]] = False
+            route.scores[remaining] = scores
+            rescored += 1
+        return rescored
+
+    def _segments_near(self, route, segments, changed_tree):
+        """Mask of segments whose box, grown by buffer_m, meets a changed geometry's box."""
+        a, b = route.points[segments], route.points[segments + 1]
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        margin = self.buffer_m / (_M_PER_DEG * np.cos(np.radians(np.abs(route.points[:, 0]).max())))
+        boxes = shapely.box(lo[:, 1] - margin, lo[:, 0] - margin, hi[:, 1] + margin, hi[:, 0] + margin)
+        near = np.zeros(len(segments), dtype=bool)
+        near[changed_tree.query(boxes)[0]] = True
+        return near
+
+    def on_hazard_update(self, epoch, updates):
+        """HazardFeed listener: rescore the routes the batch touched."""
+        self.refresh_hazards(self.hazard_store.last_changed if self.hazard_store is not None else None)
+
+    def remaining_route(self, vehicle_id):
+        route = self._routes[vehicle_id]
+        return route.points[route.cursor:]
+
+    # --- Pings ---
+    def _snap(self, route, p, lo, hi):
+        d, t = _point_segment_distance(p, route.xy[lo:hi], route.xy[lo + 1:hi + 1])
+        k = int(np.argmin(d))
+        return lo + k, float(d[k]), float(t[k])
+
+    def _rescan(self, route, p):
+        """Nearest segment at or after the cursor within off_route_m, via the route's tree."""
+        hits = route.segment_tree().query(shapely.points(p[0]), predicate="dwithin", distance=self.off_route_m)
+        hits = np.sort(hits[hits >= route.cursor])
+        if len(hits) == 0:
+            return route.cursor, np.inf, 0.0
+        d, t = _point_segment_distance(p, route.xy[hits], route.xy[hits + 1])
+        k = int(np.argmin(d))
+        return int(hits[k]), float(d[k]), float(t[k])
+
+    def ping(self, vehicle_id, lat, lon):
+        """
+        Process one GPS position.
+        Returns:
+            list[dict]: new alerts (possibly empty)
+        """
+        self.stats["pings"] += 1
+        route = self._routes.get(vehicle_id)
+        if route is None:
+            return []
+        n = len(route.scores)
+        p = np.column_stack(route.projection.forward(lon, lat))
+        segment, distance_m, t = self._snap(route, p, route.cursor, min(route.cursor + SNAP_WINDOW, n))
+        if distance_m > self.off_route_m:
+            # Lost the vehicle near the cursor (GPS gap, skipped ahead): search the rest
+            self.stats["rescans"] += 1
+            segment, distance_m, t = self._rescan(route, p)
+
+        alerts = []
+        if distance_m > self.off_route_m:
+            if not route.off_route:
+                route.off_route = True
+                alerts.append(self._alert(vehicle_id, "off_route", route.cursor, distance_m=distance_m,
+                                          message="⚠️ You have left the planned route."))
+            return self._emit(alerts)
+        route.off_route = False
+        route.cursor = segment
+
+        position_m = route.cum_m[segment] + t * (route.cum_m[segment + 1] - route.cum_m[segment])
+        if segment == n - 1 and route.cum_m[-1] - position_m <= self.arrived_m:
+            self.unregister(vehicle_id)
+            return self._emit([self._alert(vehicle_id, "arrived", segment, message="Arrived.")])
+
+        for i in range(segment, min(segment + self.lookahead, n)):
+            ahead_m = max(route.cum_m[i] - position_m, 0.0)
+            if route.scores[i] >= self.risk_threshold and not route.hazard_alerted[i]:
+                route.hazard_alerted[i] = True
+                alerts.append(self._alert(vehicle_id, "hazard_ahead", i, score=float(route.scores[i]),
+                                          distance_m=ahead_m, message="⚠️ Hazard ahead on your route."))
+            if route.dirt[i] and not route.dirt_alerted[i]:
+                route.dirt_alerted[i] = True
+                alerts.append(self._alert(vehicle_id, "dirt_ahead", i, distance_m=ahead_m,
+                                          message="⚠️ Dirt road detected along your route."))
+        return self._emit(alerts)
+
+    def _alert(self, vehicle_id, kind, segment, **fields):
+        alert = {"vehicle": vehicle_id, "type": kind, "segment": segment, **fields}
+        if kind in ("hazard_ahead", "dirt_ahead", "off_route"):
+            alert["options"] = ["Proceed", "Reroute"]
+        return alert
+
+    def _emit(self, alerts):
+        self.stats["alerts"] += len(alerts)
+        return alerts
+
+    async def run(self, pings):
+        """Consume an async iterable of (vehicle_id, lat, lon) pings, yielding alerts as they fire."""
+        async for vehicle_id, lat, lon in pings:
+            for alert in self.ping(vehicle_id, lat, lon):
+                yield alert
@@ -1,57 +1,170 @@
 # pavepath/core/routing.py
 
-from pavepath.hazard_service import simulate_hazards_for_segment, score_segment
-from pavepath.route_optimizer import compute_segment_cost, get_driving_segments
+import json
+import os
 
-def optimize_route(locations, mode="safe"):
+import numpy as np
+
+from pavepath.core.segments import SegmentTable
+from pavepath.core.solver import solve_route
+from pavepath.routing.matrix import cost_matrix
+from pavepath.route_optimizer import get_driving_segments, segment_cost_matrix, segment_costs
+from pavepath.utils.tiered_cache import TieredCache
+
+def _encode_route_value(obj):
+    if isinstance(obj, SegmentTable):
+        return {"__segments__": [obj.from_coords.tolist(), obj.to_coords.tolist(), obj.hazard_score.tolist(),
+                                 obj.distance_km.tolist(), obj.composite_cost.tolist()]}
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+def _decode_route_value(obj):
+    if "__segments__" in obj:
+        from_coords, to_coords, hazard_score, distance_km, composite_cost = obj["__segments__"]
+        return SegmentTable(np.reshape(from_coords, (-1, 2)), np.reshape(to_coords, (-1, 2)),
+                            hazard_score, distance_km, composite_cost)
+    return obj
+
+class RouteCache(TieredCache):
+    """
+    LRU cache of optimize_route results, optionally backed by SQLite (see TieredCache;
+    results are stored as JSON).
+
+    Keys are the stops rounded to `precision` decimal places (4 ~ 11 m), the mode and the
+    hazard-data epoch, so nearby repeat requests share one entry and bumping the epoch
+    after a hazard update retires every older route at once. A hit for a nearby request
+    returns the route computed for the first one. Results are shared - don't mutate the
+    segments.
+    """
+
+    table = "route_entries"
+
+    def __init__(self, path=None, precision=4, max_memory_entries=1024, max_disk_entries=50_000):
+        super().__init__(path, max_memory_entries, max_disk_entries)
+        self.precision = precision
+        self.epoch = self.get_meta("epoch", 0)
+
+    def encode(self, result):
+        return json.dumps(result, default=_encode_route_value)
+
+    def decode(self, text):
+        result = json.loads(text, object_hook=_decode_route_value)
+        for name in ("optimized_route", "path"):  # stops come back as (lat, lon) tuples
+            if isinstance(result.get(name), list):
+                result[name] = [tuple(stop) for stop in result[name]]
+        return result
+
+    def key(self, locations, mode):
+        stops = np.round(np.asarray(locations, dtype=np.float64).reshape(-1, 2), self.precision) + 0.0  # no -0.0
+        return f"{mode}|{self.epoch}|" + ";".join(f"{lat:.{self.precision}f},{lon:.{self.precision}f}"
+                                                  for lat, lon in stops.tolist())
+
+    def get(self, locations, mode):
+        """Returns: a copy of the cached result dict, or None on a miss."""
+        result = self.lookup(self.key(locations, mode))
+        return None if result is None else dict(result)
+
+    def set(self, locations, mode, result):
+        self.store(self.key(locations, mode), result, tag=self.epoch)
+
+    def bump_epoch(self, epoch=None):
+        """
+        Invalidate every cached route after a hazard-data change.
+        Args:
+            epoch (int, optional): New epoch (e.g. from the hazard feed); ignored unless
+                newer than the current one. Default: current + 1.
+        Returns:
+            int: the epoch now in effect
+        """
+        new_epoch = self.epoch + 1 if epoch is None else max(self.epoch, int(epoch))
+        if new_epoch != self.epoch:
+            self.epoch = new_epoch
+            self.drop_tags_below(new_epoch)
+            self.set_meta("epoch", new_epoch)
+        return self.epoch
+
+    def on_hazard_update(self, epoch, updates):
+        """
+        HazardFeed listener: retire every cached route once per applied batch. The
+        feed's own epoch is not reused, as it restarts at 1 while this one persists.
+        Returns:
+            int: the epoch now in effect
+        """
+        return self.bump_epoch() if updates else self.epoch
+
+# Process-wide cache for the UIs; set PAVEPATH_ROUTE_CACHE to a file path to persist it
+default_route_cache = RouteCache(path=os.environ.get("PAVEPATH_ROUTE_CACHE"))
+
+def optimize_route(locations, mode="safe", time_budget_s=0.5, graph=None, cache=None):
+    """
+    Args:
+        locations (list[tuple]): Stops as (lat, lon); the first one is the start
+        mode (str): "safe", "driving" or "fast" (see route_optimizer.HAZARD_WEIGHTS)
+        time_budget_s (float): Improvement budget for multi-stop solving
+        graph (RoadGraph, optional): Local road network; two-stop routes are then routed
+            offline over roads instead of through the external driving API, and
+            multi-stop legs are costed over roads
+        cache (RouteCache, optional): Reuse results for repeated requests; use one cache
+            per road graph
+    """
     if not locations or len(locations) < 2:
-        return {"segments": [], "mode": mode}
+        return {"segments": SegmentTable.empty(), "mode": mode}
+
+    if cache is not None:
+        cached = cache.get(locations, mode)
+        if cached is not None:
+            return cached
+        result = optimize_route(locations, mode, time_budget_s, graph)
+        cache.set(locations, mode, result)
+        return dict(result)
+
+    if graph is not None and len(locations) == 2:
+        routed = graph.route(locations[0], locations[1], mode="safe" if mode == "driving" else mode)
+        if routed is not None:
+            routed["mode"] = mode
+            return routed
 
     if mode == "driving" and len(locations) == 2:
         origin, destination = locations
         segments, directions = get_driving_segments(origin, destination)
-        segment_details = []
-
-        for seg in segments:
-            cost, hazard_score, distance_km = compute_segment_cost(seg["from"], seg["to"], mode="safe")
-            seg.update({
-                "hazard_score": hazard_score,
-                "distance_km": round(distance_km, 2),
-                "composite_cost": cost
-            })
-            segment_details.append(seg)
+        table = SegmentTable.empty()
+        if segments:
+            froms = [seg["from"] for seg in segments]
+            tos = [seg["to"] for seg in segments]
+            costs, hazard_scores, distances = segment_costs(froms, tos, mode="safe")
+            table = SegmentTable(froms, tos, hazard_scores, np.round(distances, 2), costs)
 
         return {
             "optimized_route": [origin, destination],
-            "segments": segment_details,
+            "segments": table,
             "directions": directions,
             "mode": mode
         }
 
-    # Default greedy logic for multi-stop routing
-    unvisited = locations[:]
-    route = [unvisited.pop(0)]
-    segment_details = []
-
-    while unvisited:
-        last = route[-1]
-        next_loc, best_cost, hazard_score, distance_km = min(
-            [(loc, *compute_segment_cost(last, loc, mode)) for loc in unvisited],
-            key=lambda x: x[1]
-        )
-        route.append(next_loc)
-        unvisited.remove(next_loc)
-        segment_details.append({
-            "from": last,
-            "to": next_loc,
-            "hazard_score": hazard_score,
-            "distance_km": round(distance_km, 2),
-            "composite_cost": best_cost
-        })
+    # Multi-stop routing: nearest-neighbour seed + 2-opt/Or-opt on a precomputed cost matrix
+    costs, hazard_scores, distances = segment_cost_matrix(locations, mode)
+    if graph is not None:
+        # Road-network leg costs; distance_km stays the straight-line leg length
+        road_costs = cost_matrix(locations, locations, mode, graph=graph)
+        costs = np.where(np.isfinite(road_costs), road_costs, costs)
+    return route_from_matrix(locations, mode, costs, hazard_scores, distances, time_budget_s)
+
+def route_from_matrix(locations, mode, costs, hazard_scores, distances, time_budget_s=0.5):
+    """
+    Multi-stop result from precomputed (N, N) leg matrices (see segment_cost_matrix),
+    e.g. when a batch of requests is costed in one array call.
+    """
+    order = solve_route(costs, start=0, time_budget_s=time_budget_s)
+    stops = np.asarray(locations, dtype=np.float64)
+    legs = (order[:-1], order[1:])
 
     return {
-        "optimized_route": route,
-        "segments": segment_details,
+        "optimized_route": [locations[i] for i in order],
+        "segments": SegmentTable(stops[legs[0]], stops[legs[1]], hazard_scores[legs],
+                                 np.round(distances[legs], 2), costs[legs]),
         "directions": [],
         "mode": mode
     }
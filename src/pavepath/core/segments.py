@@ -0,0 +1,90 @@
+# pavepath/core/segments.py
+
+from collections.abc import Sequence
+
+import numpy as np
+
+class SegmentTable(Sequence):
+    """
+    Column-oriented route segments backed by NumPy arrays.
+
+    Indexing or iterating yields the legacy per-segment dicts
+    ({"from", "to", "hazard_score", "distance_km", "composite_cost"}), built on demand,
+    so existing consumers keep working. Aggregates run on the arrays directly.
+
+    The dicts are detached snapshots: seg.update(...) or seg["hazard_score"] = x
+    changes only that dict, never the table. To modify segments, assign to the column
+    arrays (table.hazard_score[i] = x) or rebuild with from_records(to_records()).
+    """
+
+    __slots__ = ("from_coords", "to_coords", "hazard_score", "distance_km", "composite_cost")
+
+    def __init__(self, from_coords, to_coords, hazard_score, distance_km, composite_cost):
+        self.from_coords = np.asarray(from_coords, dtype=np.float64).reshape(-1, 2)
+        self.to_coords = np.asarray(to_coords, dtype=np.float64).reshape(-1, 2)
+        self.hazard_score = np.asarray(hazard_score, dtype=np.float64)
+        self.distance_km = np.asarray(distance_km, dtype=np.float64)
+        self.composite_cost = np.asarray(composite_cost, dtype=np.float64)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty((0, 2)), np.empty((0, 2)), [], [], [])
+
+    @classmethod
+    def from_records(cls, segments):
+        """Build a table from legacy segment dicts."""
+        segments = list(segments)
+        if not segments:
+            return cls.empty()
+        return cls(
+            [seg["from"] for seg in segments],
+            [seg["to"] for seg in segments],
+            [seg.get("hazard_score", 0) for seg in segments],
+            [seg.get("distance_km", 0) for seg in segments],
+            [seg.get("composite_cost", 0) for seg in segments],
+        )
+
+    def __len__(self):
+        return len(self.hazard_score)
+
+    def __getitem__(self, index):
+        """A new dict per call (a copy, see the class docstring), or a table for a slice."""
+        if isinstance(index, slice):
+            return SegmentTable(self.from_coords[index], self.to_coords[index], self.hazard_score[index],
+                                self.distance_km[index], self.composite_cost[index])
+        return {
+            "from": (float(self.from_coords[index, 0]), float(self.from_coords[index, 1])),
+            "to": (float(self.to_coords[index, 0]), float(self.to_coords[index, 1])),
+            "hazard_score": float(self.hazard_score[index]),
+            "distance_km": float(self.distance_km[index]),
+            "composite_cost": float(self.composite_cost[index]),
+        }
+
+    def __repr__(self):
+        return f"SegmentTable({len(self)} segments)"
+
+    def to_records(self):
+        return list(self)
+
+    # --- Vectorized aggregates ---
+    def total_hazard(self) -> float:
+        return float(self.hazard_score.sum())
+
+    def total_distance_km(self) -> float:
+        return float(self.distance_km.sum())
+
+    def high_risk_mask(self, threshold) -> np.ndarray:
+        return self.hazard_score > threshold
+
+    def high_risk_count(self, threshold) -> int:
+        return int(np.count_nonzero(self.high_risk_mask(threshold)))
+
+    def midpoints(self) -> np.ndarray:
+        """(N, 2) array of segment midpoints as (lat, lon)."""
+        return (self.from_coords + self.to_coords) / 2
+
+def as_segment_table(segments):
+    """Accept a SegmentTable or a list of legacy segment dicts."""
+    if isinstance(segments, SegmentTable):
+        return segments
+    return SegmentTable.from_records(segments or [])
@@ -0,0 +1,120 @@
+# pavepath/core/solver.py
+
+import time
+
+import numpy as np
+
+# Moves must improve the tour by more than this to be applied (guards float noise)
+_EPS = 1e-9
+
+def nearest_neighbour_tour(costs, start=0):
+    """
+    Greedy seed tour: repeatedly visit the cheapest unvisited stop.
+    Args:
+        costs (np.ndarray): (N, N) leg cost matrix
+        start (int): Index of the fixed first stop
+    Returns:
+        np.ndarray: Visiting order as stop indices
+    """
+    n = len(costs)
+    visited = np.zeros(n, dtype=bool)
+    tour = np.empty(n, dtype=np.intp)
+    tour[0] = current = start
+    visited[start] = True
+    for k in range(1, n):
+        current = int(np.argmin(np.where(visited, np.inf, costs[current])))
+        visited[current] = True
+        tour[k] = current
+    return tour
+
+def tour_cost(costs, tour):
+    """Total cost of an open tour (no return leg)."""
+    tour = np.asarray(tour)
+    return float(costs[tour[:-1], tour[1:]].sum())
+
+def _edge_costs(padded, tour):
+    return padded[tour[:-1], tour[1:]]
+
+def _two_opt_pass(padded, tour, deadline):
+    """One sweep of best-improvement 2-opt per position. Mutates tour; returns True if improved."""
+    n = len(tour) - 1  # last slot is the free-end sentinel
+    improved = False
+    edges = _edge_costs(padded, tour)
+    for i in range(1, n - 1):
+        a, b = tour[i - 1], tour[i]
+        tj, tj1 = tour[i + 1:n], tour[i + 2:n + 1]
+        delta = padded[a, tj] + padded[b, tj1] - edges[i - 1] - edges[i + 1:n]
+        k = int(np.argmin(delta))
+        if delta[k] < -_EPS:
+            j = i + 1 + k
+            tour[i:j + 1] = tour[i:j + 1][::-1].copy()
+            edges = _edge_costs(padded, tour)
+            improved = True
+        if time.perf_counter() > deadline:
+            break
+    return improved
+
+def _or_opt_pass(padded, tour, deadline, max_segment=3):
+    """Relocate chains of 1..max_segment stops (optionally reversed). Returns (tour, improved)."""
+    n = len(tour) - 1
+    improved = False
+    for k in range(1, max_segment + 1):
+        i = 1
+        while i + k <= n:
+            edges = _edge_costs(padded, tour)
+            p, s0, se, nx = tour[i - 1], tour[i], tour[i + k - 1], tour[i + k]
+            gain = padded[p, s0] + padded[se, nx] - padded[p, nx]
+
+            tj, tj1 = tour[:n], tour[1:n + 1]
+            forward = padded[tj, s0] + padded[se, tj1] - edges
+            backward = padded[tj, se] + padded[s0, tj1] - edges
+            insert = np.minimum(forward, backward)
+            insert[i - 1:i + k] = np.inf  # edges touching the chain itself
+
+            j = int(np.argmin(insert))
+            if insert[j] - gain < -_EPS:
+                chain = tour[i:i + k]
+                if backward[j] < forward[j]:
+                    chain = chain[::-1]
+                rest = np.concatenate([tour[:i], tour[i + k:]])
+                pos = j + 1 if j < i else j - k + 1
+                tour = np.concatenate([rest[:pos], chain, rest[pos:]])
+                improved = True
+            else:
+                i += 1
+            if time.perf_counter() > deadline:
+                return tour, improved
+    return tour, improved
+
+def solve_route(costs, start=0, time_budget_s=0.5):
+    """
+    Multi-stop route with a fixed start and a free end.
+
+    Seeds with nearest-neighbour, then alternates 2-opt and Or-opt sweeps until no move
+    improves the tour or the time budget runs out. 2-opt reverses sub-paths, so costs are
+    assumed (near) symmetric.
+    Args:
+        costs (np.ndarray): (N, N) leg cost matrix
+        start (int): Index of the first stop
+        time_budget_s (float): Wall-clock budget for the improvement phase
+    Returns:
+        np.ndarray: Visiting order as stop indices
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    n = len(costs)
+    tour = nearest_neighbour_tour(costs, start)
+    if n < 4 or time_budget_s <= 0:
+        return tour
+
+    # Zero-cost sentinel after the last stop turns the open path into a fixed-end tour
+    padded = np.zeros((n + 1, n + 1))
+    padded[:n, :n] = costs
+    tour = np.append(tour, n)
+
+    deadline = time.perf_counter() + time_budget_s
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = _two_opt_pass(padded, tour, deadline)
+        tour, moved = _or_opt_pass(padded, tour, deadline)
+        improved = improved or moved
+    return tour[:-1]
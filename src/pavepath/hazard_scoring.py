@@ -1,3 +1,78 @@
+import numpy as np
+
+# Score adjustment per surface type; unknown surfaces leave the severity unchanged
+SURFACE_ADJUSTMENTS = {"gravel": 1, "paved": -1}
+MIN_SCORE = 1
+
+class HazardColumns:
+    """
+    Hazards stored column-wise for batch scoring.
+    Attributes:
+        locations (list): Location vocabulary; location_codes index into it
+        location_codes (np.ndarray): int code per hazard
+        types (list): Hazard type vocabulary; type_codes index into it
+        type_codes (np.ndarray): int code per hazard
+        severity (np.ndarray): Raw severity per hazard
+    """
+
+    __slots__ = ("locations", "location_codes", "types", "type_codes", "severity")
+
+    def __init__(self, locations, location_codes, types, type_codes, severity):
+        self.locations = locations
+        self.location_codes = np.asarray(location_codes, dtype=np.intp)
+        self.types = types
+        self.type_codes = np.asarray(type_codes, dtype=np.intp)
+        self.severity = np.asarray(severity)
+
+    def __len__(self):
+        return len(self.severity)
+
+def _codes(values):
+    vocab = {}
+    codes = [vocab.setdefault(v, len(vocab)) for v in values]
+    return list(vocab), codes
+
+def encode_hazards(hazards):
+    """Convert hazard dicts (location, type, severity) into HazardColumns."""
+    locations, location_codes = _codes(h.get("location") for h in hazards)
+    types, type_codes = _codes(h.get("type") for h in hazards)
+    severity = [h.get("severity", 1) for h in hazards]
+    return HazardColumns(locations, location_codes, types, type_codes, severity)
+
+def surface_adjustment_table(locations, surface_data=None):
+    """
+    Per-location score adjustment, aligned with a location vocabulary.
+    Returns:
+        np.ndarray: int adjustment per location (0 where the surface is unknown)
+    """
+    surface_data = surface_data or {}
+    return np.fromiter(
+        (SURFACE_ADJUSTMENTS.get(surface_data.get(loc), 0) for loc in locations),
+        dtype=np.int64, count=len(locations)
+    )
+
+def score_hazard_columns(severity, location_codes=None, surface_adjustment=None):
+    """
+    Vectorized hazard scoring.
+    Args:
+        severity (np.ndarray): Raw severity per hazard
+        location_codes (np.ndarray, optional): Index into surface_adjustment per hazard
+        surface_adjustment (np.ndarray, optional): Adjustment per location code
+    Returns:
+        np.ndarray: Scores, clamped to at least MIN_SCORE
+    """
+    scores = np.asarray(severity)
+    if location_codes is not None and surface_adjustment is not None and len(surface_adjustment):
+        scores = scores + np.asarray(surface_adjustment)[np.asarray(location_codes)]
+    return np.maximum(scores, MIN_SCORE)
+
+def score_hazard(hazard, surface_data=None):
+    """Score a single hazard dict; same rules as score_hazard_columns."""
+    score = hazard.get("severity", 1)
+    if surface_data:
+        score += SURFACE_ADJUSTMENTS.get(surface_data.get(hazard.get("location")), 0)
+    return max(score, MIN_SCORE)
+
 def score_hazards(hazards, surface_data=None):
     """
     Assign severity scores to hazards and normalize them.
@@ -7,18 +82,10 @@ def score_hazards(hazards, surface_data=None):
     Returns:
         list[dict]: Hazard dicts with added 'score' key
     """
-    scored = []
-    for hazard in hazards:
-        loc = hazard.get("location")
-        base_score = hazard.get("severity", 1)
-
-        # Adjust score based on surface context
-        if surface_data and loc in surface_data:
-            surface = surface_data[loc]
-            if surface == "gravel":
-                base_score += 1
-            elif surface == "paved":
-                base_score -= 1
-
-        scored.append({**hazard, "score": max(base_score, 1)})
-    return scored
+    if not hazards:
+        return []
+    columns = encode_hazards(hazards)
+    scores = score_hazard_columns(
+        columns.severity, columns.location_codes, surface_adjustment_table(columns.locations, surface_data)
+    )
+    return [{**hazard, "score": score} for hazard, score in zip(hazards, scores.tolist())]
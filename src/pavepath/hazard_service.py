@@ -1,13 +1,256 @@
-def analyze_route(route):
-    segments = route.get("segments") if isinstance(route, dict) else route
-    hazards = load_osm_hazards(segments)
-    return {"hazards": hazards}
+import hashlib
+import json
+from collections import Counter, defaultdict
+from time import perf_counter
+
+import numpy as np
+
+from pavepath.hazard_scoring import score_hazard, score_hazard_columns, surface_adjustment_table
+from pavepath.hazard_sources.osm_loader import load_osm_hazards, segment_hazards
+
+DEFAULT_RISK_THRESHOLD = 4
 
-def load_osm_hazards(route_geometry):
+def analyze_route(route, surface_data=None, risk_threshold=DEFAULT_RISK_THRESHOLD, reroute_only=False):
+    """
+    Extract, score and evaluate hazards in a single pass over the route segments.
+    Args:
+        route (dict | list[dict]): Route dict with 'segments', or the segment list itself
+        surface_data (dict, optional): Surface type per location, used for scoring
+        risk_threshold (float): Hazard score that triggers a reroute (see hazard_rules.should_reroute)
+        reroute_only (bool): Stop at the first hazard over the threshold; results are partial
+    Returns:
+        dict: hazards (scored), segment_scores, should_reroute, timings (seconds per stage)
+    """
+    segments = route.get("segments") if isinstance(route, dict) else route
     hazards = []
-    for segment in route_geometry:
-        if segment.get("surface") == "unpaved":
-            hazards.append({"location": segment["location"], "type": "unpaved", "severity": 2, "score": 2})
-        if segment.get("flood_risk"):
-            hazards.append({"location": segment["location"], "type": "flood", "severity": 5, "score": 5})
-    return hazards
+    segment_scores = []
+    should_reroute = False
+    extract_s = score_s = evaluate_s = 0.0
+    start = perf_counter()
+
+    for i, segment in enumerate(segments or []):
+        t0 = perf_counter()
+        found = segment_hazards(segment)
+        t1 = perf_counter()
+        for hazard in found:
+            hazard["score"] = score_hazard(hazard, surface_data)
+        t2 = perf_counter()
+        segment_score = max((h["score"] for h in found), default=0)
+        hazards.extend(found)
+        segment_scores.append({"segment": segment.get("id", i), "score": segment_score, "hazards": found})
+        over = segment_score >= risk_threshold
+        should_reroute = should_reroute or over
+        t3 = perf_counter()
+
+        extract_s += t1 - t0
+        score_s += t2 - t1
+        evaluate_s += t3 - t2
+        if over and reroute_only:
+            break
+
+    return {
+        "hazards": hazards,
+        "segment_scores": segment_scores,
+        "should_reroute": should_reroute,
+        "timings": {
+            "extract_s": extract_s,
+            "score_s": score_s,
+            "evaluate_s": evaluate_s,
+            "total_s": perf_counter() - start,
+        },
+    }
+
+def analyze_routes(requests):
+    """
+    analyze_route for many routes at once: hazards of every route are scored in a single
+    score_hazard_columns call and reduced to segment maxima with one array pass.
+    Args:
+        requests (list[tuple]): (route, surface_data, risk_threshold) per route
+    Returns:
+        list: analyze_route's result dict per route, or the exception its own input
+            raised (other routes in the batch are unaffected); timings are those of the
+            whole batch
+    """
+    start = perf_counter()
+    results = [None] * len(requests)
+    parsed = []         # (request index, segment ids, hazards per segment, first segment)
+    severity, location_codes, segment_of, adjustments = [], [], [], []
+    n_segments = code_base = 0
+    for r, (route, surface_data, _) in enumerate(requests):
+        # Everything that depends on the caller's input stays inside the try, so a bad
+        # request fails on its own instead of failing the batch it was queued with
+        try:
+            segments = list((route.get("segments") if isinstance(route, dict) else route) or [])
+            found = [segment_hazards(segment) for segment in segments]
+            ids = [segment.get("id", i) for i, segment in enumerate(segments)]
+            vocab, codes, rows = {}, [], []
+            for k, hazards in enumerate(found):
+                for hazard in hazards:
+                    codes.append(code_base + vocab.setdefault(hazard.get("location"), len(vocab)))
+                    rows.append(n_segments + k)
+            adjustment = surface_adjustment_table(list(vocab), surface_data)
+        except Exception as exc:
+            results[r] = exc
+            continue
+        severity.extend(hazard.get("severity", 1) for hazards in found for hazard in hazards)
+        location_codes.extend(codes)
+        segment_of.extend(rows)
+        adjustments.append(adjustment)
+        parsed.append((r, ids, found, n_segments))
+        n_segments += len(segments)
+        code_base += len(vocab)
+    extracted = perf_counter()
+
+    adjustment = np.concatenate(adjustments or [np.zeros(0, dtype=np.int64)])
+    scores = score_hazard_columns(np.asarray(severity), np.asarray(location_codes, dtype=np.intp), adjustment)
+    segment_max = np.zeros(n_segments, dtype=scores.dtype if len(scores) else np.int64)
+    np.maximum.at(segment_max, np.asarray(segment_of, dtype=np.intp), scores)
+    scores, segment_max = scores.tolist(), segment_max.tolist()
+    scored = perf_counter()
+
+    h = 0
+    for r, ids, found, first in parsed:
+        risk_threshold = requests[r][2]
+        hazards, segment_scores = [], []
+        for k, (segment_id, segment_hazards_found) in enumerate(zip(ids, found)):
+            for hazard in segment_hazards_found:
+                hazard["score"] = scores[h]
+                h += 1
+            hazards.extend(segment_hazards_found)
+            segment_scores.append({"segment": segment_id, "score": segment_max[first + k],
+                                   "hazards": segment_hazards_found})
+        try:
+            should_reroute = any(s["score"] >= risk_threshold for s in segment_scores)
+        except Exception as exc:
+            results[r] = exc
+            continue
+        results[r] = {"hazards": hazards, "segment_scores": segment_scores, "should_reroute": should_reroute}
+    end = perf_counter()
+    timings = {"extract_s": extracted - start, "score_s": scored - extracted, "evaluate_s": end - scored,
+               "total_s": end - start}
+    for result in results:
+        if isinstance(result, dict):
+            result["timings"] = dict(timings)
+    return results
+
+# ----------------------------
+# Incremental analysis
+# ----------------------------
+
+def segment_content_hash(segment):
+    """Stable digest of a segment's attributes, used to skip unchanged segments."""
+    payload = json.dumps(segment, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+class IncrementalRouteAnalyzer:
+    """
+    Keeps per-segment hazard results keyed by segment id + content hash so that feed or
+    surface updates only recompute the segments they touch.
+
+    Aggregates (total_score, max_score, should_reroute) are maintained in O(changed):
+    the max comes from a histogram of segment scores, which has only a handful of
+    distinct values.
+    """
+
+    def __init__(self, segments=None, surface_data=None, risk_threshold=DEFAULT_RISK_THRESHOLD):
+        self.surface_data = dict(surface_data or {})
+        self.risk_threshold = risk_threshold
+        self.total_score = 0
+        self._segments = {}
+        self._results = {}  # segment id -> (hash, location, segment score, scored hazards)
+        self._score_counts = Counter()
+        self._by_location = defaultdict(set)
+        if segments:
+            self.update_segments(segments)
+
+    def __len__(self):
+        return len(self._results)
+
+    def _drop(self, seg_id):
+        _, location, segment_score, found = self._results.pop(seg_id)
+        self.total_score -= sum(h["score"] for h in found)
+        self._score_counts[segment_score] -= 1
+        if not self._score_counts[segment_score]:
+            del self._score_counts[segment_score]
+        self._by_location[location].discard(seg_id)
+
+    def _store(self, seg_id, segment, digest):
+        found = segment_hazards(segment)
+        for hazard in found:
+            hazard["score"] = score_hazard(hazard, self.surface_data)
+        segment_score = max((h["score"] for h in found), default=0)
+        location = segment.get("location")
+        self._results[seg_id] = (digest, location, segment_score, found)
+        self.total_score += sum(h["score"] for h in found)
+        self._score_counts[segment_score] += 1
+        self._by_location[location].add(seg_id)
+
+    def update_segments(self, segments, start_index=0):
+        """
+        Insert or refresh segments; ids default to position (start_index + i).
+        Returns:
+            list: ids of segments that were actually recomputed
+        """
+        changed = []
+        for i, segment in enumerate(segments, start=start_index):
+            seg_id = segment.get("id", i)
+            digest = segment_content_hash(segment)
+            current = self._results.get(seg_id)
+            if current is not None and current[0] == digest:
+                continue
+            if current is not None:
+                self._drop(seg_id)
+            self._segments[seg_id] = segment
+            self._store(seg_id, segment, digest)
+            changed.append(seg_id)
+        return changed
+
+    def remove_segments(self, seg_ids):
+        for seg_id in seg_ids:
+            if seg_id in self._results:
+                self._drop(seg_id)
+                del self._segments[seg_id]
+
+    def update_surface(self, changes):
+        """
+        Apply surface changes ({location: surface or None}) and rescore affected segments.
+        Returns:
+            list: ids of segments that were recomputed
+        """
+        affected = set()
+        for location, surface in changes.items():
+            if surface is None:
+                self.surface_data.pop(location, None)
+            else:
+                self.surface_data[location] = surface
+            affected.update(self._by_location.get(location, ()))
+        for seg_id in affected:
+            digest = self._results[seg_id][0]
+            self._drop(seg_id)
+            self._store(seg_id, self._segments[seg_id], digest)
+        return sorted(affected, key=str)
+
+    @property
+    def max_score(self):
+        return max(self._score_counts, default=0)
+
+    @property
+    def should_reroute(self):
+        return self.max_score >= self.risk_threshold
+
+    def segment_score(self, seg_id):
+        return self._results[seg_id][2]
+
+    def result(self):
+        """Full snapshot in the analyze_route shape (O(segments))."""
+        segment_scores = [
+            {"segment": seg_id, "score": segment_score, "hazards": found}
+            for seg_id, (_, _, segment_score, found) in self._results.items()
+        ]
+        return {
+            "hazards": [h for entry in segment_scores for h in entry["hazards"]],
+            "segment_scores": segment_scores,
+            "should_reroute": self.should_reroute,
+            "total_score": self.total_score,
+            "max_score": self.max_score,
+        }
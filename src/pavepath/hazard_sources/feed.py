@@ -0,0 +1,236 @@
+# pavepath/hazard_sources/feed.py
+
+import asyncio
+import json
+import logging
+import math
+
+import shapely
+
+from pavepath.hazard_store import HazardStore, hazard_key
+
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_BATCH_SIZE = 1_000
+DEFAULT_FLUSH_INTERVAL_S = 0.25
+_READ_BYTES = 1 << 17  # file bytes read per executor call
+
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+def _validated(event):
+    """
+    The event with lat/lon/ts coerced to float, or None when it cannot be applied
+    (not a dict, no usable position, out-of-range coordinates, unhashable key, ...).
+    """
+    if not isinstance(event, dict):
+        return None
+    event = dict(event)
+    try:
+        if "ts" in event:
+            event["ts"] = _finite(event["ts"])
+        if not event.get("deleted"):
+            geometry = event.get("geometry")
+            if geometry is not None:
+                if isinstance(geometry, dict):
+                    shapely.geometry.shape(geometry)
+                elif not isinstance(geometry, shapely.Geometry):
+                    return None
+            else:
+                lat, lon = _finite(event["lat"]), _finite(event["lon"])
+                if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                    return None
+                event["lat"], event["lon"] = lat, lon
+        hash(hazard_key(event))
+    except (KeyError, TypeError, ValueError, AttributeError, shapely.errors.GEOSException):
+        return None
+    return event
+
+def _finite(value):
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(value)
+    return value
+
+class HazardFeed:
+    """
+    Streaming hazard ingestion into a HazardStore.
+
+    Any number of producers (JSONL files or replays, socket connections, direct
+    submit() calls) put events on one bounded asyncio queue; when it is full they wait,
+    which pushes back on the source. A single consumer coalesces events per hazard_key
+    (last one wins; older 'ts' never overwrites newer) and applies them in batches of
+    up to batch_size, or every flush_interval_s, via HazardStore.apply_updates - one
+    epoch per batch. Listeners are called with (epoch, updates) after each batch, e.g.
+    RouteCache.on_hazard_update or RerouteMonitor.on_hazard_update.
+    """
+
+    def __init__(self, store=None, queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval_s=DEFAULT_FLUSH_INTERVAL_S, listeners=()):
+        self.store = store if store is not None else HazardStore()
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.listeners = list(listeners)
+        self.queue = None
+        self.stats = {"received": 0, "rejected": 0, "coalesced": 0, "stale": 0, "applied": 0, "batches": 0,
+                      "dropped": 0}
+
+    # --- Producers ---
+    async def submit(self, event):
+        """Queue one event, waiting while the queue is full."""
+        event = _validated(event)
+        if event is None:
+            self.stats["rejected"] += 1
+            return
+        await self.queue.put(event)
+
+    async def _submit_line(self, line):
+        line = line.strip()
+        if not line:
+            return
+        try:
+            event = json.loads(line)
+        except ValueError:
+            self.stats["rejected"] += 1
+            return
+        await self.submit(event)
+
+    async def produce_jsonl(self, path, speed=None):
+        """
+        Feed a JSONL file, one event per line.
+        Args:
+            speed (float, optional): Replay in real time scaled by this factor, pacing
+                events by their 'ts' (seconds); default is as fast as the queue allows
+        """
+        loop = asyncio.get_running_loop()
+        first_ts = started = None
+        with open(path, "r", encoding="utf-8") as f:
+            while True:
+                lines = await loop.run_in_executor(None, f.readlines, _READ_BYTES)
+                if not lines:
+                    break
+                for line in lines:
+                    if speed:
+                        ts = _event_ts(line)
+                        if ts is not None:
+                            if first_ts is None:
+                                first_ts, started = ts, loop.time()
+                            delay = started + (ts - first_ts) / speed - loop.time()
+                            if delay > 0:
+                                await asyncio.sleep(delay)
+                    await self._submit_line(line)
+
+    async def produce_stream(self, reader):
+        """Feed newline-delimited JSON from an asyncio StreamReader until EOF."""
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            await self._submit_line(line.decode("utf-8", errors="replace"))
+
+    async def serve(self, host="127.0.0.1", port=9090):
+        """Accept producer connections over TCP; each one streams JSONL events."""
+        async def handle(reader, writer):
+            try:
+                await self.produce_stream(reader)
+            finally:
+                writer.close()
+        return await asyncio.start_server(handle, host, port)
+
+    # --- Consumer ---
+    def _coalesce(self, pending, event):
+        self.stats["received"] += 1
+        key = hazard_key(event)
+        previous = pending.get(key)
+        current = previous if previous is not None else self.store.get(key)
+        if current is not None and _older(event, current):
+            self.stats["stale"] += 1
+            return
+        if previous is not None:
+            self.stats["coalesced"] += 1
+        pending[key] = event
+
+    def flush(self, pending):
+        updates = list(pending.values())
+        try:
+            epoch = self.store.apply_updates(updates)
+        except Exception:
+            # One bad event must not sink the batch: find it, drop it, apply the rest
+            bad = [update for update in updates if not _applies(update)]
+            logger.warning("hazard feed dropped %d invalid event(s): %r", len(bad), bad[:10])
+            self.stats["dropped"] += len(bad)
+            updates = [update for update in updates if not any(update is b for b in bad)]
+            epoch = self.store.apply_updates(updates)
+        self.stats["applied"] += len(updates)
+        self.stats["batches"] += 1
+        for listener in self.listeners:
+            listener(epoch, updates)
+        return epoch
+
+    async def consume(self):
+        """Run until stop(); applies whatever is pending before returning."""
+        loop = asyncio.get_running_loop()
+        pending = {}
+        deadline = None
+        stopping = False
+        while not stopping:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                event = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                event = None
+            # Drain what is already queued without yielding, so bursts form one batch
+            while event is not None:
+                if event is _STOP:
+                    stopping = True
+                    break
+                self._coalesce(pending, event)
+                if deadline is None:
+                    deadline = loop.time() + self.flush_interval_s
+                if len(pending) >= self.batch_size or self.queue.empty():
+                    break
+                event = self.queue.get_nowait()
+            if pending and (stopping or len(pending) >= self.batch_size or loop.time() >= deadline):
+                try:
+                    self.flush(pending)
+                except Exception:  # a failing listener or store: log it, keep consuming
+                    logger.exception("hazard feed flush failed")
+                pending, deadline = {}, None
+
+    def start(self):
+        """Create the queue and the consumer task (call from inside the event loop)."""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        return asyncio.ensure_future(self.consume())
+
+    async def stop(self, consumer):
+        await self.queue.put(_STOP)
+        await consumer
+
+    async def run(self, *producers):
+        """Run producers to completion, then apply the remaining events. Returns the final epoch."""
+        consumer = self.start()
+        try:
+            await asyncio.gather(*producers)
+        finally:
+            await self.stop(consumer)
+        return self.store.epoch
+
+def _older(event, current):
+    try:
+        return "ts" in current and "ts" in event and event["ts"] < float(current["ts"])
+    except (TypeError, ValueError):
+        return False  # the stored hazard has no comparable ts: the update wins
+
+def _applies(update):
+    try:
+        HazardStore().apply_updates([update])
+    except Exception:
+        return False
+    return True
+
+def _event_ts(line):
+    try:
+        return float(json.loads(line).get("ts"))
+    except (ValueError, TypeError, AttributeError):
+        return None
@@ -1,3 +1,17 @@
+def segment_hazards(segment):
+    """
+    Hazards for a single route segment (see load_osm_hazards).
+    Returns:
+        list[dict]: Hazard dicts with keys: location, type, severity
+    """
+    loc = segment.get("location")
+    hazards = []
+    if segment.get("surface") in {"unpaved", "gravel"}:
+        hazards.append({"location": loc, "type": "unpaved", "severity": 2})
+    if segment.get("flood_risk"):
+        hazards.append({"location": loc, "type": "flood", "severity": 5})
+    return hazards
+
 def load_osm_hazards(route_geometry):
     """
     Extract hazard-related tags from OSM-like data along the route.
@@ -9,10 +23,5 @@ def load_osm_hazards(route_geometry):
     """
     hazards = []
     for segment in route_geometry:
-        loc = segment.get("location")
-        surface = segment.get("surface")
-        if surface in {"unpaved", "gravel"}:
-            hazards.append({"location": loc, "type": "unpaved", "severity": 2})
-        if segment.get("flood_risk"):
-            hazards.append({"location": loc, "type": "flood", "severity": 5})
+        hazards.extend(segment_hazards(segment))
     return hazards
@@ -0,0 +1,230 @@
+# pavepath/hazard_store.py
+
+import json
+
+import numpy as np
+import shapely
+
+from pavepath.utils.projection import query_dwithin_m
+
+DEFAULT_BUFFER_M = 50.0
+# Point hazards without an id or location are keyed by position rounded to ~1 m
+_KEY_DIGITS = 5
+
+def hazard_key(hazard):
+    """
+    Identity used to coalesce updates: 'id', else (location, type) where the location is
+    'location', the lat/lon rounded to ~1 m, or the geometry itself.
+    """
+    if hazard.get("id") is not None:
+        return hazard["id"]
+    where = hazard.get("location")
+    if where is None and "lat" in hazard:
+        where = (round(float(hazard["lat"]), _KEY_DIGITS), round(float(hazard["lon"]), _KEY_DIGITS))
+    elif where is None and hazard.get("geometry") is not None:
+        geometry = hazard["geometry"]
+        where = json.dumps(geometry, sort_keys=True) if isinstance(geometry, dict) else geometry.wkb
+    return (where, hazard.get("type"))
+
+def _hazard_geometries(hazards):
+    """Geometry per hazard; lat/lon hazards are turned into points in one vectorized call."""
+    geoms = np.empty(len(hazards), dtype=object)
+    points = []
+    for i, hazard in enumerate(hazards):
+        geometry = hazard.get("geometry")
+        if geometry is None:
+            points.append(i)
+        elif isinstance(geometry, dict):
+            geoms[i] = shapely.geometry.shape(geometry)  # GeoJSON mapping
+        elif isinstance(geometry, shapely.Geometry):
+            geoms[i] = geometry
+        else:
+            raise TypeError(f"hazard geometry must be a shapely geometry or GeoJSON mapping, not {geometry!r}")
+    if points:
+        lat = np.fromiter((hazards[i]["lat"] for i in points), dtype=np.float64, count=len(points))
+        lon = np.fromiter((hazards[i]["lon"] for i in points), dtype=np.float64, count=len(points))
+        geoms[points] = shapely.points(lon, lat)
+    return geoms
+
+class HazardStore:
+    """
+    Spatial index of point and polygon hazards (floods, crashes, closures, ...).
+
+    Hazards are dicts with either a 'geometry' (shapely or GeoJSON, in lon/lat) or
+    'lat'/'lon' keys, plus whatever attributes scoring needs ('type', 'severity', ...).
+    The STRtree is kept in lon/lat and buffers are measured in metres around each query's
+    own latitude (query_dwithin_m), so they hold across a national extent; it is rebuilt
+    lazily on the first query after hazards are added or removed, so bulk loads
+    and feed updates cost one rebuild, not one per hazard. Every hazard is registered
+    under its hazard_key, so add() and apply_updates() replace by key whether a hazard
+    came from a preload or the feed; apply_updates() also advances `epoch` once per batch.
+    """
+
+    def __init__(self, hazards=None):
+        self._hazards = []
+        self._keys = []  # hazard_key per store id
+        self._geoms = []  # object arrays, one per add() call
+        self._chunk_starts = []  # first store id of each _geoms chunk
+        self._alive = []
+        self._live_count = 0
+        self._tree = None  # (STRtree, tree geometries, hazard id per tree position)
+        self._ids_by_key = {}
+        self.epoch = 0
+        self.last_changed = np.empty(0, dtype=object)  # geometries added/removed by the last batch
+        if hazards:
+            self.add(hazards)
+
+    def __len__(self):
+        return self._live_count
+
+    def __getitem__(self, hazard_id):
+        if not self._alive[hazard_id]:
+            raise KeyError(hazard_id)
+        return self._hazards[hazard_id]
+
+    def add(self, hazards, key=hazard_key):
+        """
+        Insert hazards, replacing any stored hazard with the same key (the last one wins).
+        Returns:
+            list[int]: store ids of the added hazards
+        """
+        hazards = list(hazards)
+        keys = [key(hazard) for hazard in hazards]
+        geoms = _hazard_geometries(hazards)  # raises before anything changes on bad input
+        self.remove([self._ids_by_key[k] for k in set(keys) if k in self._ids_by_key])
+        start = len(self._hazards)
+        self._chunk_starts.append(start)
+        self._geoms.append(geoms)
+        self._hazards.extend(hazards)
+        self._keys.extend(keys)
+        self._alive.extend([True] * len(hazards))
+        self._live_count += len(hazards)
+        for offset, k in enumerate(keys):
+            previous = self._ids_by_key.get(k)
+            if previous is not None and previous >= start:  # duplicate key within this call
+                self._alive[previous] = False
+                self._live_count -= 1
+            self._ids_by_key[k] = start + offset
+        self._tree = None
+        return list(range(start, len(self._hazards)))
+
+    def remove(self, hazard_ids):
+        for hazard_id in hazard_ids:
+            if self._alive[hazard_id]:
+                self._alive[hazard_id] = False
+                self._live_count -= 1
+                self._tree = None
+                if self._ids_by_key.get(self._keys[hazard_id]) == hazard_id:
+                    del self._ids_by_key[self._keys[hazard_id]]
+
+    def apply_updates(self, updates, key=hazard_key):
+        """
+        Upsert or delete hazards as one batch (the last update per key wins). An update
+        with "deleted": true removes the hazard with its key; anything else replaces it.
+        A batch with an invalid geometry raises without changing the store. Store ids may be renumbered when removed hazards are compacted away.
+        Returns:
+            int: the new epoch
+        """
+        latest = {key(update): update for update in updates}
+        replaced = [self._ids_by_key[k] for k in latest if k in self._ids_by_key]
+        before = self.geometries(replaced)
+        added = self.add([update for update in latest.values() if not update.get("deleted")], key)
+        self.remove([self._ids_by_key[k] for k, update in latest.items()
+                     if update.get("deleted") and k in self._ids_by_key])
+        self.last_changed = np.concatenate([before, self.geometries(added)])
+        if len(self._hazards) > 2 * self._live_count + 1024:
+            self.compact()
+        self.epoch += 1
+        return self.epoch
+
+    def compact(self):
+        """Drop removed hazards and renumber the rest. Returns: dict old id -> new id."""
+        keep = np.flatnonzero(self._alive)
+        geoms = np.concatenate(self._geoms)[keep] if self._geoms else np.empty(0, dtype=object)
+        self._hazards = [self._hazards[i] for i in keep.tolist()]
+        self._keys = [self._keys[i] for i in keep.tolist()]
+        self._geoms = [geoms]
+        self._chunk_starts = [0]
+        self._alive = [True] * len(keep)
+        mapping = {old: new for new, old in enumerate(keep.tolist())}
+        self._ids_by_key = {k: mapping[i] for k, i in self._ids_by_key.items()}
+        self._tree = None
+        return mapping
+
+    def geometries(self, hazard_ids):
+        """Lon/lat geometries of the given store ids (removed ones included)."""
+        ids = np.asarray(hazard_ids, dtype=np.int64)
+        result = np.empty(len(ids), dtype=object)
+        chunk = np.searchsorted(self._chunk_starts, ids, side="right") - 1
+        for c in np.unique(chunk).tolist():
+            mask = chunk == c
+            result[mask] = self._geoms[c][ids[mask] - self._chunk_starts[c]]
+        return result
+
+    def get(self, hazard_key_value):
+        hazard_id = self._ids_by_key.get(hazard_key_value)
+        return None if hazard_id is None else self._hazards[hazard_id]
+
+    def _index(self):
+        if self._tree is None:
+            ids = np.flatnonzero(self._alive)
+            geoms = np.concatenate(self._geoms)[ids] if self._geoms else np.empty(0, dtype=object)
+            self._tree = (shapely.STRtree(geoms), geoms, ids)
+        return self._tree
+
+    def query_lines(self, coords, offsets, buffer_m=DEFAULT_BUFFER_M):
+        """
+        Bulk hazards-within-buffer query for many lines at once.
+        Args:
+            coords (np.ndarray): (N, 2) vertices as (lat, lon)
+            offsets (np.ndarray): (M + 1,) line k is coords[offsets[k]:offsets[k + 1]]
+            buffer_m (float): Search distance around each line in metres
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (line index, hazard id) pairs sorted by line
+        """
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        counts = np.diff(offsets)
+        lines = np.flatnonzero(counts > 0)
+        if len(lines) == 0 or not self._live_count:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        tree, tree_geoms, ids = self._index()
+        # Single-vertex lines get their vertex twice (a zero-length segment) so every
+        # input is a LineString; empty lines are left out
+        line_of_vertex = np.repeat(np.arange(len(counts)), counts)
+        single = np.flatnonzero(counts == 1)
+        vertex = np.concatenate([np.arange(len(line_of_vertex)) + offsets[0], offsets[single]])
+        line_of_vertex = np.concatenate([line_of_vertex, single])
+        order = np.argsort(line_of_vertex, kind="stable")
+        vertex, line_of_vertex = vertex[order], line_of_vertex[order]
+        geoms = shapely.linestrings(coords[vertex, ::-1], indices=np.searchsorted(lines, line_of_vertex))
+
+        line_pos, tree_pos = query_dwithin_m(tree, tree_geoms, geoms, buffer_m)
+        order = np.lexsort((ids[tree_pos], line_pos))
+        return lines[line_pos[order]], ids[tree_pos[order]]
+
+    def hazards_along(self, route_polyline, buffer_m=DEFAULT_BUFFER_M):
+        """
+        Hazards within buffer_m of each segment of a route, in one query.
+        Args:
+            route_polyline (list[tuple]): Route as (lat, lon) points
+        Returns:
+            list[list[dict]]: hazards per segment (len(route_polyline) - 1 lists)
+        """
+        points = np.asarray(route_polyline, dtype=np.float64).reshape(-1, 2)
+        n_segments = max(len(points) - 1, 0)
+        result = [[] for _ in range(n_segments)]
+        if n_segments == 0:
+            return result
+        # Segment i is points[i], points[i + 1]
+        coords = np.repeat(points, 2, axis=0)[1:-1]
+        offsets = np.arange(0, 2 * n_segments + 1, 2)
+        for segment, hazard_id in zip(*(a.tolist() for a in self.query_lines(coords, offsets, buffer_m))):
+            result[segment].append(self._hazards[hazard_id])
+        return result
+
+    def near(self, lat, lon, radius_m=DEFAULT_BUFFER_M):
+        """Hazards within radius_m of a point."""
+        _, hazard_ids = self.query_lines([(lat, lon)], [0, 1], radius_m)
+        return [self._hazards[i] for i in hazard_ids.tolist()]
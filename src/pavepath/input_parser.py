@@ -1,6 +1,6 @@
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple, Union
 
 # ----------------------------
 # Ad-hoc parsing (tests expect these)
@@ -44,26 +44,143 @@ def load_geojson(path: Union[str, Path]) -> Dict[str, Any]:
     with p.open("r", encoding="utf-8") as f:
         return json.load(f)
 
+def _normalize_feature(feature: Dict[str, Any]) -> Dict[str, Any]:
+    props = feature.get("properties", {}) or {}
+    geom = feature.get("geometry", {}) or {}
+    coords = geom.get("coordinates", [])
+    return {
+        "location": props.get("name") or str(coords),
+        "surface": props.get("surface"),
+        "flood_risk": props.get("flood_risk", False),
+        "raw_properties": props
+    }
+
 def extract_route_features(geojson: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Normalize GeoJSON features into hazard-ready dicts.
     """
-    features: List[Dict[str, Any]] = []
-    for feature in geojson.get("features", []):
-        props = feature.get("properties", {}) or {}
-        geom = feature.get("geometry", {}) or {}
-        coords = geom.get("coordinates", [])
-        features.append({
-            "location": props.get("name") or str(coords),
-            "surface": props.get("surface"),
-            "flood_risk": props.get("flood_risk", False),
-            "raw_properties": props
-        })
-    return features
+    return [_normalize_feature(feature) for feature in geojson.get("features", [])]
 
 def parse_geojson_file(path: Union[str, Path]) -> List[Dict[str, Any]]:
     return extract_route_features(load_geojson(path))
 
+# ----------------------------
+# Streaming GeoJSON parsing (large files)
+# ----------------------------
+
+# parse_input streams files above this size instead of loading them whole
+STREAMING_THRESHOLD_BYTES = 64 * 1024 * 1024
+_READ_SIZE = 1 << 20
+
+class _JsonStream:
+    """
+    Incremental reader that decodes one JSON value at a time from a text file.
+    Only the value currently being decoded is held in memory.
+    """
+
+    def __init__(self, f: IO[str], read_size: int = _READ_SIZE):
+        self._f = f
+        self._read_size = read_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        # Read at least as much as is pending so a value spanning many reads is re-scanned O(log n) times
+        chunk = self._f.read(max(self._read_size, len(self._buf) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or '' at end of file."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed GeoJSON: expected '{char}', found '{found or 'EOF'}'")
+        self._pos += 1
+
+    def decode(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # A value ending exactly at the buffer edge may be truncated (e.g. a number)
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+def _iter_raw_features(stream: _JsonStream) -> Iterator[Dict[str, Any]]:
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.decode()
+        stream.expect(":")
+        if key == "features":
+            stream.expect("[")
+            if stream.peek() == "]":
+                stream.expect("]")
+            else:
+                while True:
+                    yield stream.decode()
+                    if stream.peek() == ",":
+                        stream.expect(",")
+                    else:
+                        stream.expect("]")
+                        break
+        else:
+            stream.decode()  # skip other top-level members (type, crs, bbox, ...)
+        if stream.peek() == ",":
+            stream.expect(",")
+        else:
+            stream.expect("}")
+            return
+
+def iter_route_features(path: Union[str, Path], chunk_size: Optional[int] = None,
+                        read_size: int = _READ_SIZE) -> Iterator[Any]:
+    """
+    Stream normalized features from a GeoJSON FeatureCollection without loading the whole file.
+    Args:
+        path: GeoJSON file path
+        chunk_size: If set, yield lists of up to chunk_size features for batched scoring
+        read_size: Characters read from disk per refill
+    Yields:
+        dict (or list[dict] when chunk_size is set): same shape as extract_route_features
+    """
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"GeoJSON file not found: {p}")
+    with p.open("r", encoding="utf-8") as f:
+        features = (_normalize_feature(raw) for raw in _iter_raw_features(_JsonStream(f, read_size)))
+        if not chunk_size:
+            yield from features
+            return
+        batch: List[Dict[str, Any]] = []
+        for feature in features:
+            batch.append(feature)
+            if len(batch) >= chunk_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
 # ----------------------------
 # Unified dispatcher
 # ----------------------------
@@ -72,9 +189,13 @@ def parse_input(input_data: Any):
     """
     Dispatch based on input type:
     - str ending with .geojson -> list[dict] hazard-ready features
+      (an iterator of them for files over STREAMING_THRESHOLD_BYTES)
     - list/tuple of items -> list[(lat, lon)] for ad-hoc tests
     """
     if isinstance(input_data, str) and input_data.lower().endswith(".geojson"):
+        p = Path(input_data)
+        if p.exists() and p.stat().st_size > STREAMING_THRESHOLD_BYTES:
+            return iter_route_features(p)
         return parse_geojson_file(input_data)
     if isinstance(input_data, (list, tuple)):
         return parse_ad_hoc(input_data)
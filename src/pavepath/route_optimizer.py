@@ -11,6 +11,17 @@ except ImportError:
 # --- existing imports ---
 import math
 
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+# How strongly each routing mode penalizes hazard exposure (cost per km per hazard point)
+HAZARD_WEIGHTS = {
+    "fast": 0.0,
+    "driving": 0.5,
+    "safe": 2.0,
+}
+
 # Example functions (keep or extend with your real logic)
 def haversine(coord1, coord2):
     """Calculate great-circle distance between two (lat, lon) points in km."""
@@ -24,8 +35,112 @@ def haversine(coord1, coord2):
     a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
     return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
+# ----------------------------
+# Vectorized distances
+# ----------------------------
+
+def haversine_many(coords1, coords2, dtype=np.float64):
+    """
+    Element-wise great-circle distance in km between arrays of (lat, lon) points.
+    Args:
+        coords1, coords2 (array-like): (..., 2) arrays of (lat, lon); broadcast against each other
+        dtype: np.float64 (default) or np.float32 for half the memory on large batches
+    Returns:
+        np.ndarray: distances in km with the broadcast shape of the inputs minus the last axis
+    """
+    a = np.asarray(coords1, dtype=dtype)
+    b = np.asarray(coords2, dtype=dtype)
+    lat1, lon1 = np.radians(a[..., 0]), np.radians(a[..., 1])
+    lat2, lon2 = np.radians(b[..., 0]), np.radians(b[..., 1])
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+def distance_matrix(points, dtype=np.float64):
+    """
+    All-pairs great-circle distances in km.
+    Args:
+        points (array-like): N (lat, lon) points
+        dtype: np.float64 (default) or np.float32
+    Returns:
+        np.ndarray: (N, N) symmetric matrix with a zero diagonal
+    """
+    p = np.asarray(points, dtype=dtype).reshape(-1, 2)
+    lat, lon = np.radians(p[:, 0]), np.radians(p[:, 1])
+    cos_lat = np.cos(lat)
+    h = (np.sin((lat[None, :] - lat[:, None]) / 2) ** 2
+         + cos_lat[:, None] * cos_lat[None, :] * np.sin((lon[None, :] - lon[:, None]) / 2) ** 2)
+    return (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+# ----------------------------
+# Segment costs
+# ----------------------------
+
+def segment_costs(origins, destinations, mode="safe", hazard_scores=None, dtype=np.float64):
+    """
+    Composite cost of many (origin, destination) legs in one array operation.
+    Args:
+        origins, destinations (array-like): (..., 2) arrays of (lat, lon)
+        mode (str): Routing mode, see HAZARD_WEIGHTS
+        hazard_scores (array-like, optional): Hazard score per leg; defaults to 0
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: (cost, hazard_score, distance_km)
+    """
+    distance_km = haversine_many(origins, destinations, dtype)
+    if hazard_scores is None:
+        hazard = np.zeros_like(distance_km)
+    else:
+        hazard = np.broadcast_to(np.asarray(hazard_scores, dtype=dtype), distance_km.shape)
+    cost = distance_km * (1 + HAZARD_WEIGHTS.get(mode, 1.0) * hazard)
+    return cost, hazard, distance_km
+
+def segment_cost_matrix(points, mode="safe", hazard_scores=None, dtype=np.float64):
+    """
+    All-pairs composite cost between stops.
+    Args:
+        points (array-like): N (lat, lon) points
+        mode (str): Routing mode, see HAZARD_WEIGHTS
+        hazard_scores (array-like, optional): (N, N) hazard score per leg; defaults to 0
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: (cost, hazard_score, distance_km), each (N, N)
+    """
+    distance_km = distance_matrix(points, dtype)
+    if hazard_scores is None:
+        hazard = np.zeros_like(distance_km)
+    else:
+        hazard = np.asarray(hazard_scores, dtype=dtype)
+    cost = distance_km * (1 + HAZARD_WEIGHTS.get(mode, 1.0) * hazard)
+    return cost, hazard, distance_km
+
+def compute_segment_cost(coord1, coord2, mode="safe", hazard_score=0.0):
+    """
+    Composite cost of a single leg.
+    Returns:
+        tuple[float, float, float]: (cost, hazard_score, distance_km)
+    """
+    distance_km = haversine(coord1, coord2)
+    cost = distance_km * (1 + HAZARD_WEIGHTS.get(mode, 1.0) * hazard_score)
+    return cost, hazard_score, distance_km
+
+def get_driving_segments(origin, destination):
+    """
+    Fetch a driving route from OpenRouteService and split it into straight segments.
+    Returns:
+        tuple[list[dict], list[dict]]: (segments with 'from'/'to' (lat, lon), directions)
+    """
+    import openrouteservice
+    from pavepath.core.directions import extract_directions
+
+    client = openrouteservice.Client(key=ORS_API_KEY)
+    route_json = client.directions(
+        coordinates=[(origin[1], origin[0]), (destination[1], destination[0])],
+        profile="driving-car",
+        format="geojson",
+    )
+    coords = [(lat, lon) for lon, lat in route_json["features"][0]["geometry"]["coordinates"]]
+    segments = [{"from": a, "to": b} for a, b in zip(coords[:-1], coords[1:])]
+    return segments, extract_directions(route_json)
+
 def optimize_route(points):
     """Dummy optimizer that just returns the points in order."""
-    return {"route": points, "distance_km": sum(
-        haversine(points[i], points[i+1]) for i in range(len(points)-1)
-    )}
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return {"route": points, "distance_km": float(haversine_many(pts[:-1], pts[1:]).sum())}
@@ -1,5 +1,36 @@
+from pavepath.hazard_scoring import score_hazard
+from pavepath.hazard_store import DEFAULT_BUFFER_M
+from pavepath.utils.polyline_tools import decode_polylines
+
 def annotate_route_with_hazards(steps, hazard_scores):
     for i, step in enumerate(steps):
         hazard = hazard_scores.get(f"segment_{i:03}", 0)
         step['hazard_score'] = hazard
     return steps
+
+def annotate_route_spatially(steps, store, buffer_m=DEFAULT_BUFFER_M, surface_data=None):
+    """
+    Annotate Directions steps with the hazards of a HazardStore that lie within buffer_m
+    of each step's geometry (its encoded polyline, else start -> end), in one bulk query.
+    Sets step['hazards'] and step['hazard_score'] (highest hazard score, 0 if none).
+    """
+    coords, offsets = decode_polylines([step.get("polyline", {}).get("points", "") for step in steps])
+    lines = [coords[offsets[i]:offsets[i + 1]].tolist() for i in range(len(steps))]
+    for i, step in enumerate(steps):
+        if not lines[i] and "start_location" in step:
+            ends = [step["start_location"], step.get("end_location", step["start_location"])]
+            lines[i] = [[p["lat"], p["lng"]] for p in ends]
+
+    flat = [point for line in lines for point in line]
+    line_offsets = [0]
+    for line in lines:
+        line_offsets.append(line_offsets[-1] + len(line))
+    step_index, hazard_ids = store.query_lines(flat, line_offsets, buffer_m)
+
+    for step in steps:
+        step["hazards"] = []
+    for i, hazard_id in zip(step_index.tolist(), hazard_ids.tolist()):
+        steps[i]["hazards"].append(store[hazard_id])
+    for step in steps:
+        step["hazard_score"] = max((score_hazard(h, surface_data) for h in step["hazards"]), default=0)
+    return steps
@@ -1,6 +1,22 @@
 import googlemaps
 
+from pavepath.utils.polyline_tools import decode_polylines
+
 def fetch_route(start, end, api_key):
     gmaps = googlemaps.Client(key=api_key)
     route = gmaps.directions(start, end, mode="driving")
     return route[0]['legs'][0]['steps']
+
+def step_geometry(steps):
+    """
+    Decode every step polyline of a Directions leg in one batch.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: coords (N, 2) as (lat, lon) and offsets (len(steps) + 1,)
+            such that step k is coords[offsets[k]:offsets[k + 1]]
+    """
+    return decode_polylines([step.get("polyline", {}).get("points", "") for step in steps])
+
+def fetch_route_geometry(start, end, api_key):
+    """fetch_route plus the decoded step geometry: (steps, coords, offsets)."""
+    steps = fetch_route(start, end, api_key)
+    return (steps, *step_geometry(steps))
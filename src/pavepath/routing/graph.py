@@ -0,0 +1,257 @@
+# pavepath/routing/graph.py
+
+import heapq
+import math
+
+import numpy as np
+import shapely
+
+from pavepath.core.segments import SegmentTable
+from pavepath.route_optimizer import EARTH_RADIUS_KM, HAZARD_WEIGHTS, haversine_many
+from pavepath.utils.geometry import linestring_arrays
+from pavepath.utils.projection import LocalProjection
+
+# Extra cost per km by road surface, on top of distance
+SURFACE_PENALTIES = {"paved": 0.0, "asphalt": 0.0, "gravel": 0.5, "unpaved": 1.0, "dirt": 1.0}
+UNKNOWN_SURFACE_PENALTY = 0.25
+
+# Vertices closer than 10^-7 degrees (~1 cm) are merged into one node
+_SNAP_SCALE = 1e7
+# A* computes its heuristic per reached node until a search reaches this share of the graph
+_FULL_HEURISTIC_FRACTION = 0.1
+
+class RoadGraph:
+    """
+    Undirected road network in CSR form.
+
+    Nodes are road vertices (shared vertices connect roads); every consecutive vertex
+    pair of a road becomes an edge in both directions. Edge cost blends distance, the
+    road surface and a hazard score:
+
+        cost = length_km * (1 + surface_penalty + HAZARD_WEIGHTS[mode] * hazard)
+    """
+
+    def __init__(self, node_coords, indptr, indices, edge_length_km, edge_road, road_surfaces,
+                 road_hazards=None):
+        self.node_coords = node_coords          # (N, 2) lat, lon
+        self.indptr = indptr                    # (N + 1,)
+        self.indices = indices                  # (E,) target node per edge
+        self.edge_length_km = edge_length_km    # (E,)
+        self.edge_road = edge_road              # (E,) source road row per edge
+        self.road_surfaces = list(road_surfaces)
+        self._surface_penalty = np.array(
+            [SURFACE_PENALTIES.get(s, UNKNOWN_SURFACE_PENALTY) for s in self.road_surfaces], dtype=np.float64
+        )
+        self.road_hazards = np.zeros(len(self.road_surfaces))
+        self._weights = {}
+        self._weight_lists = {}
+        self._adjacency = None
+        self._node_radians = None
+        self._node_tree = None
+        self.hierarchy = None
+        if road_hazards is not None:
+            self.set_hazards(road_hazards)
+
+    # --- Construction ---
+    @staticmethod
+    def _build_csr(coords, offsets):
+        coords = np.asarray(coords, dtype=np.float64)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        keys = np.round(coords * _SNAP_SCALE).astype(np.int64)
+        unique_keys, node_of_vertex = np.unique(keys, axis=0, return_inverse=True)
+        node_of_vertex = node_of_vertex.reshape(-1)
+        node_coords = (unique_keys[:, ::-1] / _SNAP_SCALE).astype(np.float64)
+
+        # An edge joins vertex i to i + 1 unless i is the last vertex of its road
+        road_of_vertex = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        starts = np.flatnonzero(road_of_vertex[:-1] == road_of_vertex[1:])
+        u, v = node_of_vertex[starts], node_of_vertex[starts + 1]
+        keep = u != v
+        u, v, road = u[keep], v[keep], road_of_vertex[starts][keep]
+        length = haversine_many(node_coords[u], node_coords[v])
+
+        src = np.concatenate([u, v])
+        order = np.argsort(src, kind="stable")
+        indptr = np.zeros(len(node_coords) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(node_coords)), out=indptr[1:])
+        return (node_coords, indptr, np.concatenate([v, u])[order],
+                np.concatenate([length, length])[order], np.concatenate([road, road])[order])
+
+    @classmethod
+    def from_arrays(cls, coords, offsets, surfaces, road_hazards=None):
+        """
+        Args:
+            coords (np.ndarray): (N, 2) road vertices as (lon, lat)
+            offsets (np.ndarray): (M + 1,) road k is coords[offsets[k]:offsets[k + 1]]
+            surfaces (list[str]): Surface per road
+            road_hazards (array-like, optional): Hazard score per road
+        """
+        return cls(*cls._build_csr(coords, offsets), surfaces, road_hazards)
+
+    @classmethod
+    def from_roads(cls, roads_gdf, hazard_column="hazard_score"):
+        """Build from a surface_overlay.mapper.load_roads GeoDataFrame (roads keep their row position)."""
+        geoms = roads_gdf.geometry.reset_index(drop=True).explode(index_parts=False)
+        node_coords, indptr, indices, length, part = cls._build_csr(*linestring_arrays(geoms.values))
+        edge_road = geoms.index.to_numpy()[part]  # multi-part roads map back to their row
+
+        surfaces = roads_gdf["surface"].tolist() if "surface" in roads_gdf else [None] * len(roads_gdf)
+        hazards = roads_gdf[hazard_column].fillna(0).to_numpy() if hazard_column in roads_gdf else None
+        return cls(node_coords, indptr, indices, length, edge_road, surfaces, hazards)
+
+    @classmethod
+    def from_file(cls, road_path, hazard_column="hazard_score", index_path=None):
+        """
+        Load a road layer (surface_overlay.mapper.load_roads) and attach its saved
+        contraction hierarchy, <road_path>.ch.npz by default, when one matches the layer.
+        """
+        from pavepath.routing.hierarchy import load_index
+        from surface_overlay.mapper import load_roads
+
+        graph = cls.from_roads(load_roads(road_path), hazard_column)
+        load_index(road_path, graph, index_path)
+        return graph
+
+    def __len__(self):
+        return len(self.node_coords)
+
+    @property
+    def edge_count(self):
+        return len(self.indices)
+
+    # --- Costs ---
+    def set_hazards(self, road_hazards):
+        """Replace per-road hazard scores; edge weights are recomputed lazily."""
+        self.road_hazards = np.asarray(road_hazards, dtype=np.float64)
+        self._weights.clear()
+        self._weight_lists.clear()
+        if self.hierarchy is not None:
+            self.hierarchy.customize(self.edge_weights(self.hierarchy.mode))
+
+    def edge_weights(self, mode="safe"):
+        """Blended cost per CSR edge for a routing mode."""
+        if mode not in self._weights:
+            factor = (1 + self._surface_penalty[self.edge_road]
+                      + HAZARD_WEIGHTS.get(mode, 1.0) * self.road_hazards[self.edge_road])
+            self._weights[mode] = self.edge_length_km * factor
+        return self._weights[mode]
+
+    def _lists(self, mode):
+        # Python lists are much faster than NumPy scalars inside the heap loop
+        if self._adjacency is None:
+            self._adjacency = (self.indptr.tolist(), self.indices.tolist())
+        if mode not in self._weight_lists:
+            self._weight_lists[mode] = self.edge_weights(mode).tolist()
+        return self._adjacency + (self._weight_lists[mode],)
+
+    def attach_hierarchy(self, hierarchy):
+        """
+        Answer shortest-path queries for hierarchy.mode from a ContractionHierarchy
+        (see pavepath.routing.hierarchy). Hazard updates re-customize it in place.
+        """
+        self.hierarchy = hierarchy
+        hierarchy.customize(self.edge_weights(hierarchy.mode))
+
+    # --- Queries ---
+    def nearest_node(self, lat, lon):
+        if self._node_tree is None:
+            projection = LocalProjection(float(np.mean(self.node_coords[:, 0])) if len(self) else 0.0)
+            x, y = projection.forward(self.node_coords[:, 1], self.node_coords[:, 0])
+            self._node_tree = (projection, shapely.STRtree(shapely.points(x, y)))
+        projection, tree = self._node_tree
+        x, y = projection.forward(lon, lat)
+        return int(tree.nearest(shapely.Point(float(x), float(y))))
+
+    def shortest_path(self, source, target, mode="safe"):
+        """
+        A* from node to node with a great-circle heuristic (admissible: every edge costs
+        at least its length).
+        Returns:
+            tuple[float, list[int]]: (cost, node path); (inf, []) if unreachable
+        """
+        if source == target:
+            return 0.0, [source]
+        if self.hierarchy is not None and self.hierarchy.mode == mode:
+            return self.hierarchy.shortest_path(source, target)
+        indptr, indices, weights = self._lists(mode)
+        if self._node_radians is None:  # once per graph; the heuristic itself is per pushed node
+            lat, lon = np.radians(self.node_coords[:, 0]), np.radians(self.node_coords[:, 1])
+            self._node_radians = (lat.tolist(), np.cos(lat).tolist(), lon.tolist())
+        lat, cos_lat, lon = self._node_radians
+        t_lat, t_cos, t_lon = lat[target], cos_lat[target], lon[target]
+        heuristic = {}
+        full = None
+
+        def remaining_km(node):
+            # Great-circle distance to the target (haversine_many's formula), memoized. A
+            # search that reaches a large part of the graph switches to one array call
+            nonlocal full
+            if full is not None:
+                return full[node]
+            value = heuristic.get(node)
+            if value is None:
+                if len(heuristic) > _FULL_HEURISTIC_FRACTION * len(lat):
+                    full = haversine_many(self.node_coords, self.node_coords[target]).tolist()
+                    return full[node]
+                h = (math.sin((t_lat - lat[node]) / 2) ** 2
+                     + cos_lat[node] * t_cos * math.sin((t_lon - lon[node]) / 2) ** 2)
+                value = heuristic[node] = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(max(h, 0.0), 1.0)))
+            return value
+
+        best = {source: 0.0}
+        parent = {source: -1}
+        heap = [(remaining_km(source), 0.0, source)]
+        closed = set()
+        while heap:
+            _, g, node = heapq.heappop(heap)
+            if node == target:
+                path = [node]
+                while parent[path[-1]] != -1:
+                    path.append(parent[path[-1]])
+                return g, path[::-1]
+            if node in closed:
+                continue
+            closed.add(node)
+            for e in range(indptr[node], indptr[node + 1]):
+                nxt = indices[e]
+                cost = g + weights[e]
+                if cost < best.get(nxt, float("inf")):
+                    best[nxt] = cost
+                    parent[nxt] = node
+                    heapq.heappush(heap, (cost + remaining_km(nxt), cost, nxt))
+        return float("inf"), []
+
+    def _edge_between(self, u, v, weights):
+        lo, hi = self.indptr[u], self.indptr[u + 1]
+        candidates = lo + np.flatnonzero(self.indices[lo:hi] == v)
+        return int(candidates[np.argmin(weights[candidates])])
+
+    def route(self, origin, destination, mode="safe"):
+        """
+        Route between two (lat, lon) points over the road network.
+        Returns:
+            dict: optimize_route-shaped result ('optimized_route', 'segments', 'directions',
+                'mode') plus 'path' (lat, lon) and 'cost'; None if no road path exists
+        """
+        source = self.nearest_node(*origin)
+        target = self.nearest_node(*destination)
+        cost, path = self.shortest_path(source, target, mode)
+        if not path:
+            return None
+
+        weights = self.edge_weights(mode)
+        edges = np.array([self._edge_between(u, v, weights) for u, v in zip(path[:-1], path[1:])], dtype=np.int64)
+        nodes = np.asarray(path)
+        segments = SegmentTable(
+            self.node_coords[nodes[:-1]], self.node_coords[nodes[1:]],
+            self.road_hazards[self.edge_road[edges]] if len(edges) else [],
+            np.round(self.edge_length_km[edges], 2), weights[edges],
+        )
+        return {
+            "optimized_route": [origin, destination],
+            "segments": segments,
+            "directions": [],
+            "mode": mode,
+            "path": [tuple(p) for p in self.node_coords[nodes].tolist()],
+            "cost": cost,
+        }
@@ -0,0 +1,317 @@
+# pavepath/routing/hierarchy.py
+
+import sys
+from bisect import bisect_left
+from pathlib import Path
+
+import numpy as np
+
+# Nested dissection stops splitting below this many nodes
+_LEAF_SIZE = 32
+
+def default_index_path(road_path):
+    """Index file stored next to the road layer, e.g. data/roads.geojson.ch.npz."""
+    return Path(str(road_path) + ".ch.npz")
+
+def _nested_dissection_order(node_coords, eu, ev):
+    """
+    Metric-independent contraction order: recursively bisect the nodes at the median of
+    their wider coordinate axis and rank the separator above both halves.
+    Returns:
+        np.ndarray: nodes from lowest to highest rank
+    """
+    order = []
+    # One scratch buffer for every split: only the entries of the current sub-problem
+    # are written, and they are reset before moving on, so each split costs O(its size)
+    side = np.full(len(node_coords), -1, dtype=np.int8)
+    # Work items are (nodes, edges among them) or a finished separator block
+    stack = [("split", np.arange(len(node_coords)), np.arange(len(eu)))]
+    while stack:
+        kind, nodes, edges = stack.pop()
+        if kind == "emit":
+            order.append(nodes)
+            continue
+        if len(nodes) <= _LEAF_SIZE:
+            order.append(nodes)
+            continue
+        pts = node_coords[nodes]
+        axis = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        median = np.median(pts[:, axis])
+        left = pts[:, axis] <= median
+        if left.all() or not left.any():
+            order.append(nodes)
+            continue
+
+        u, v = eu[edges], ev[edges]
+        side[nodes] = np.where(left, 0, 1)
+        su, sv = side[u], side[v]
+        cross = su != sv
+        separator = np.unique(np.where(su[cross] == 0, u[cross], v[cross]))
+        side[separator] = 2
+        su, sv, node_side = side[u], side[v], side[nodes]
+        side[nodes] = -1
+
+        # Popped in reverse: A, then B, then the separator last (highest rank)
+        stack.append(("emit", separator, None))
+        stack.append(("split", nodes[node_side == 1], edges[(su == 1) & (sv == 1)]))
+        stack.append(("split", nodes[node_side == 0], edges[(su == 0) & (sv == 0)]))
+    return np.concatenate(order) if order else np.empty(0, dtype=np.int64)
+
+class ContractionHierarchy:
+    """
+    Customizable contraction hierarchy (CCH) over a RoadGraph.
+
+    Preprocessing (build) picks a nested-dissection order and computes the shortcut
+    topology once; it does not depend on edge weights. Customization fills in arc weights
+    for a given metric in one bottom-up pass, so hazard updates only need customize(),
+    not a rebuild. Queries walk the elimination tree upward from both endpoints - no
+    priority queue - and unpack shortcuts through their middle nodes.
+    """
+
+    def __init__(self, rank, up_indptr, up_indices, arc_of_edge, mode="safe"):
+        self.rank = rank                  # original node -> rank
+        self.node_of_rank = np.argsort(rank)
+        self.up_indptr = up_indptr        # CSR over ranks: arcs to higher-ranked nodes
+        self.up_indices = up_indices
+        self.arc_of_edge = arc_of_edge    # RoadGraph CSR edge -> arc id
+        self.mode = mode
+        n = len(rank)
+        tails = np.repeat(np.arange(n), np.diff(up_indptr))
+        self._arc_keys = tails.astype(np.int64) * n + up_indices
+        # Elimination-tree parent: the lowest-ranked upward neighbour (arcs are sorted)
+        self.parent = np.full(n, -1, dtype=np.int64)
+        has_up = np.diff(up_indptr) > 0
+        self.parent[has_up] = up_indices[up_indptr[:-1][has_up]]
+        self.weights = np.full(len(up_indices), np.inf)
+        self.middle = np.full(len(up_indices), -1, dtype=np.int64)
+        self._lists = None
+
+    # --- Preprocessing ---
+    @classmethod
+    def build(cls, graph, mode="safe"):
+        """Order, contract and customize a RoadGraph for the given routing mode."""
+        n = len(graph)
+        src = np.repeat(np.arange(n), np.diff(graph.indptr))
+        dst = graph.indices
+        forward = src < dst
+        order = _nested_dissection_order(graph.node_coords, src[forward], dst[forward])
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.arange(n)
+
+        # Symbolic contraction: merging each node's upward set into its lowest upward
+        # neighbour yields the chordal supergraph (all shortcuts) in one pass
+        up = [set() for _ in range(n)]
+        for a, b in zip(rank[src].tolist(), rank[dst].tolist()):
+            if a < b:
+                up[a].add(b)
+        for v in range(n):
+            if up[v]:
+                p = min(up[v])
+                up[p].update(up[v])
+                up[p].discard(p)
+
+        counts = np.fromiter((len(s) for s in up), dtype=np.int64, count=n)
+        up_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=up_indptr[1:])
+        up_indices = np.fromiter((b for s in up for b in sorted(s)), dtype=np.int64, count=int(counts.sum()))
+
+        lo, hi = np.minimum(rank[src], rank[dst]), np.maximum(rank[src], rank[dst])
+        keys = np.repeat(np.arange(n), counts).astype(np.int64) * n + up_indices
+        arc_of_edge = np.searchsorted(keys, lo * n + hi)
+
+        ch = cls(rank, up_indptr, up_indices, arc_of_edge, mode)
+        ch.customize(graph.edge_weights(mode))
+        return ch
+
+    def customize(self, edge_weights):
+        """
+        Recompute arc weights for new RoadGraph edge weights without re-contracting.
+        Args:
+            edge_weights (np.ndarray): Cost per RoadGraph CSR edge
+        """
+        weights = np.full(len(self.up_indices), np.inf)
+        np.minimum.at(weights, self.arc_of_edge, np.asarray(edge_weights, dtype=np.float64))
+        middle = np.full(len(self.up_indices), -1, dtype=np.int64)
+        n = len(self.rank)
+        indptr, indices, keys = self.up_indptr, self.up_indices, self._arc_keys
+
+        # Lower-triangle pass: a path a <- v -> b through a lower node v bounds arc (a, b)
+        for v in range(n):
+            lo, hi = indptr[v], indptr[v + 1]
+            if hi - lo < 2:
+                continue
+            heads = indices[lo:hi]
+            w = weights[lo:hi]
+            i, j = np.triu_indices(hi - lo, k=1)
+            arcs = np.searchsorted(keys, heads[i] * n + heads[j])
+            candidate = w[i] + w[j]
+            better = candidate < weights[arcs]
+            weights[arcs[better]] = candidate[better]
+            middle[arcs[better]] = v
+
+        self.weights = weights
+        self.middle = middle
+        self._lists = None
+
+    # --- Persistence ---
+    def save(self, path):
+        np.savez(path, rank=self.rank, up_indptr=self.up_indptr, up_indices=self.up_indices,
+                 arc_of_edge=self.arc_of_edge, weights=self.weights, middle=self.middle,
+                 mode=np.array(self.mode))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        ch = cls(data["rank"], data["up_indptr"], data["up_indices"], data["arc_of_edge"], str(data["mode"]))
+        ch.weights = data["weights"]
+        ch.middle = data["middle"]
+        return ch
+
+    # --- Queries ---
+    def _query_state(self):
+        # Plain lists for scalar lookups in the per-node loops; NumPy only for arc batches
+        if self._lists is None:
+            self._lists = (self.parent.tolist(), self.up_indptr.tolist(), self._arc_keys.tolist(),
+                           self.middle.tolist(), np.full(len(self.rank), -1, dtype=np.int64))
+        return self._lists
+
+    def _upward(self, start):
+        """
+        Upward search from one rank. In a chordal CCH every upward neighbour of an
+        ancestor is itself an ancestor, so the search space is exactly the elimination-tree
+        path to the root and can be relaxed in order with one array op per node.
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: (ancestor ranks, distances, predecessor positions)
+        """
+        parent, indptr, _, _, pos = self._query_state()
+        ancestors = []
+        v = start
+        while v != -1:
+            ancestors.append(v)
+            v = parent[v]
+        ancestors = np.asarray(ancestors, dtype=np.int64)
+        pos[ancestors] = np.arange(len(ancestors))
+        dist = np.full(len(ancestors), np.inf)
+        pred = np.full(len(ancestors), -1, dtype=np.int64)
+        dist[0] = 0.0
+        indices, weights = self.up_indices, self.weights
+        inf = np.inf
+        for i, v in enumerate(ancestors.tolist()):
+            lo, hi = indptr[v], indptr[v + 1]
+            if lo == hi:
+                continue
+            d = dist[i]
+            if d == inf:
+                continue
+            local = pos[indices[lo:hi]]
+            candidate = d + weights[lo:hi]
+            better = candidate < dist[local]
+            dist[local[better]] = candidate[better]
+            pred[local[better]] = i
+        pos[ancestors] = -1
+        return ancestors, dist, pred
+
+    def _unpack(self, ranks):
+        """Expand a rank path containing shortcuts into original-graph ranks."""
+        _, _, keys, middle, _ = self._query_state()
+        n = len(self.rank)
+        path = [ranks[0]]
+        for a, b in zip(ranks[:-1], ranks[1:]):
+            stack = [(a, b)]
+            while stack:
+                p, q = stack.pop()
+                m = middle[bisect_left(keys, p * n + q if p < q else q * n + p)]
+                if m == -1:
+                    path.append(q)
+                else:
+                    stack.append((m, q))
+                    stack.append((p, m))
+        return path
+
+    def shortest_path(self, source, target):
+        """
+        Returns:
+            tuple[float, list[int]]: (cost, path of RoadGraph node ids); (inf, []) if unreachable
+        """
+        s, t = int(self.rank[source]), int(self.rank[target])
+        if s == t:
+            return 0.0, [source]
+        anc_s, dist_s, pred_s = self._upward(s)
+        anc_t, dist_t, pred_t = self._upward(t)
+        # Both searches end in the same root path; align it from the top
+        common = min(len(anc_s), len(anc_t))
+        tail_s, tail_t = anc_s[len(anc_s) - common:], anc_t[len(anc_t) - common:]
+        shared = np.flatnonzero(tail_s == tail_t)
+        if len(shared) == 0:
+            return float("inf"), []
+        off_s, off_t = len(anc_s) - common, len(anc_t) - common
+        totals = dist_s[off_s + shared] + dist_t[off_t + shared]
+        k = int(np.argmin(totals))
+        best = float(totals[k])
+        if best == np.inf:
+            return float("inf"), []
+
+        i = off_s + int(shared[k])
+        up_from_s = []
+        while i != -1:
+            up_from_s.append(int(anc_s[i]))
+            i = pred_s[i]
+        j = off_t + int(shared[k])
+        up_from_t = []
+        while j != -1:
+            up_from_t.append(int(anc_t[j]))
+            j = pred_t[j]
+        ranks = self._unpack(up_from_s[::-1] + up_from_t[1:])
+        return best, self.node_of_rank[ranks].tolist()
+
+    def many_to_many(self, sources, targets):
+        """
+        Cost matrix between RoadGraph nodes: one upward search per distinct node, then
+        every source meets all targets' searches through their shared ancestors.
+        Returns:
+            np.ndarray: (len(sources), len(targets)) costs; inf where unreachable
+        """
+        ranks = self.rank[np.asarray(targets, dtype=np.int64)]
+        searches = {int(t): self._upward(int(t))[:2] for t in np.unique(ranks).tolist()}
+        target_ranks = np.concatenate([searches[t][0] for t in ranks.tolist()])
+        target_dist = np.concatenate([searches[t][1] for t in ranks.tolist()])
+        column = np.repeat(np.arange(len(ranks)), [len(searches[t][0]) for t in ranks.tolist()])
+
+        out = np.full((len(sources), len(ranks)), np.inf)
+        scratch = np.full(len(self.rank), np.inf)
+        for i, s in enumerate(self.rank[np.asarray(sources, dtype=np.int64)].tolist()):
+            ancestors, dist = searches[s] if s in searches else self._upward(s)[:2]
+            scratch[ancestors] = dist
+            np.minimum.at(out[i], column, scratch[target_ranks] + target_dist)
+            scratch[ancestors] = np.inf
+        return out
+
+def load_index(road_path, graph, path=None):
+    """
+    Attach the saved hierarchy for a road layer to its RoadGraph, if one exists and
+    matches the graph. Current hazard weights are customized in.
+    Returns:
+        ContractionHierarchy | None
+    """
+    path = Path(path or default_index_path(road_path))
+    if not path.exists():
+        return None
+    ch = ContractionHierarchy.load(path)
+    if len(ch.rank) != len(graph) or len(ch.arc_of_edge) != graph.edge_count:
+        return None  # stale index for a different road file
+    graph.attach_hierarchy(ch)
+    return ch
+
+def build_index(road_path, mode="safe", out_path=None):
+    """Offline step: load a road layer, build its hierarchy and save it next to the file."""
+    from surface_overlay.mapper import load_roads
+    from pavepath.routing.graph import RoadGraph
+
+    graph = RoadGraph.from_roads(load_roads(road_path))
+    ch = ContractionHierarchy.build(graph, mode)
+    out_path = out_path or default_index_path(road_path)
+    ch.save(out_path)
+    return out_path
+
+if __name__ == "__main__":
+    print(build_index(sys.argv[1] if len(sys.argv) > 1 else "data/roads.geojson"))
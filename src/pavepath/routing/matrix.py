@@ -0,0 +1,207 @@
+# pavepath/routing/matrix.py
+
+import atexit
+import heapq
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from pavepath.route_optimizer import segment_costs
+
+# Below this many origins the pool round trip costs more than it saves
+_MIN_PARALLEL_ORIGINS = 16
+
+# Worker-side views onto the shared graph arrays, attached on first use (see _graph_views)
+_shared = {}
+
+class _SharedArrays:
+    """Copy arrays into named shared-memory blocks once; workers attach by name without pickling data."""
+
+    def __init__(self, arrays):
+        self._blocks = []
+        self.spec = {}
+        self.views = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            view[...] = array
+            self._blocks.append(block)
+            self.spec[name] = (block.name, array.shape, array.dtype.str)
+            self.views[name] = view
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.views.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+def _attach(spec):
+    blocks, views = [], {}
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        views[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return blocks, views
+
+def _graph_views(spec):
+    # Workers outlive a single cost_matrix call: re-attach only when the graph's blocks change
+    if _shared.get("spec") != spec:
+        for block in _shared.get("blocks", ()):
+            block.close()
+        blocks, views = _attach(spec)
+        _shared.clear()
+        _shared.update(views, blocks=blocks, spec=spec)  # keep the mappings alive
+    return _shared
+
+# --- Process-wide pool, shared by every cost_matrix call ---
+class _MatrixPool:
+    """
+    One ProcessPoolExecutor plus the shared-memory copy of the last graph it was given.
+    The graph's CSR arrays and weights are copied again only when a call brings a
+    different graph or new weights (RoadGraph.set_hazards makes a new weights array);
+    a replaced copy is freed once no running call still uses it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._workers = 0
+        self._current = None  # [indptr, indices, weights, _SharedArrays, users]
+        self._retired = []
+
+    def executor(self, workers):
+        with self._lock:
+            if self._executor is None or self._workers != workers:
+                if self._executor is not None:
+                    self._executor.shutdown()
+                self._executor = ProcessPoolExecutor(max_workers=workers)
+                self._workers = workers
+            return self._executor
+
+    def acquire(self, indptr, indices, weights):
+        """Returns: the graph entry to pass to release(); its [3].spec names the blocks."""
+        with self._lock:
+            entry = self._current
+            if entry is None or not (entry[0] is indptr and entry[1] is indices and entry[2] is weights):
+                if entry is not None:
+                    self._retired.append(entry)
+                shared = _SharedArrays({"indptr": indptr, "indices": indices, "weights": weights})
+                self._current = entry = [indptr, indices, weights, shared, 0]
+            entry[4] += 1
+            self._free_retired()
+            return entry
+
+    def release(self, entry):
+        with self._lock:
+            entry[4] -= 1
+            self._free_retired()
+
+    def _free_retired(self):
+        # Workers attached to a freed block keep their mapping until they re-attach
+        for entry in [e for e in self._retired if e[4] == 0]:
+            entry[3].close()
+            self._retired.remove(entry)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            for entry in self._retired + ([self._current] if self._current else []):
+                entry[3].close()
+            self._current, self._retired = None, []
+
+_pool = _MatrixPool()
+atexit.register(_pool.shutdown)
+
+def shutdown_pool():
+    """Stop the shared cost_matrix workers and free the graph's shared memory."""
+    _pool.shutdown()
+
+# --- Searches ---
+def _one_to_many(indptr, indices, weights, source, targets):
+    """Dijkstra from one node, stopping once every target node is settled."""
+    remaining = set(targets.tolist())
+    dist = {source: 0.0}
+    settled = set()
+    heap = [(0.0, source)]
+    while heap and remaining:
+        d, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        remaining.discard(node)
+        lo, hi = indptr[node], indptr[node + 1]
+        for nxt, w in zip(indices[lo:hi].tolist(), weights[lo:hi].tolist()):
+            cand = d + w
+            if cand < dist.get(nxt, float("inf")):
+                dist[nxt] = cand
+                heapq.heappush(heap, (cand, nxt))
+    return np.array([dist.get(t, np.inf) if t in settled else np.inf for t in targets.tolist()])
+
+def _fill_rows(sources, targets, arrays):
+    indptr, indices, weights = arrays["indptr"], arrays["indices"], arrays["weights"]
+    out = np.empty((len(sources), len(targets)))
+    for row, source in enumerate(sources.tolist()):
+        out[row] = _one_to_many(indptr, indices, weights, source, targets)
+    return out
+
+def _fill_rows_shared(spec, sources, targets):
+    return _fill_rows(sources, targets, _graph_views(spec))
+
+def cost_matrix(origins, destinations, mode="safe", graph=None, max_workers=None, chunk_size=None,
+                executor=None):
+    """
+    Many-to-many composite route costs.
+    Args:
+        origins, destinations (list[tuple]): (lat, lon) points
+        mode (str): Routing mode (see route_optimizer.HAZARD_WEIGHTS)
+        graph (RoadGraph, optional): Road network; without it costs are straight-line legs.
+            An attached ContractionHierarchy for this mode answers the whole matrix
+        max_workers (int, optional): Worker processes (default: CPU count); 1 runs in-process
+        chunk_size (int, optional): Origins per task
+        executor (concurrent.futures.Executor, optional): Run the searches here instead
+            of the module's shared process pool
+    Returns:
+        np.ndarray: (len(origins), len(destinations)) costs; inf where unreachable
+    """
+    o = np.asarray(origins, dtype=np.float64).reshape(-1, 2)
+    d = np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+    if graph is None:
+        # A single broadcast op beats any process fan-out for straight-line costs
+        return segment_costs(o[:, None, :], d[None, :, :], mode)[0]
+
+    sources = np.array([graph.nearest_node(lat, lon) for lat, lon in o], dtype=np.int64)
+    targets = np.array([graph.nearest_node(lat, lon) for lat, lon in d], dtype=np.int64)
+    if graph.hierarchy is not None and graph.hierarchy.mode == mode:
+        # Hierarchy queries are a few upward scans each: no searches to fan out
+        return graph.hierarchy.many_to_many(sources, targets)
+
+    weights = graph.edge_weights(mode)
+    workers = max_workers or os.cpu_count() or 1
+    if (workers == 1 and executor is None) or len(o) < _MIN_PARALLEL_ORIGINS:
+        return _fill_rows(sources, targets, {"indptr": graph.indptr, "indices": graph.indices, "weights": weights})
+
+    # The pool and the graph's shared-memory copy persist across calls, so repeated
+    # matrices over one graph pay neither process start-up nor the CSR copy again
+    entry = _pool.acquire(graph.indptr, graph.indices, weights)
+    try:
+        executor = executor or _pool.executor(workers)
+        chunk_size = chunk_size or max(1, len(o) // (workers * 4))
+        starts = range(0, len(o), chunk_size)
+        rows = executor.map(_fill_rows_shared, [entry[3].spec] * len(starts),
+                            [sources[i:i + chunk_size] for i in starts], [targets] * len(starts))
+        return np.vstack(list(rows))
+    finally:
+        _pool.release(entry)
@@ -0,0 +1,362 @@
+# pavepath/service.py
+
+import asyncio
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from pavepath.core.routing import default_route_cache, optimize_route, route_from_matrix
+from pavepath.core.segments import SegmentTable
+from pavepath.hazard_service import DEFAULT_RISK_THRESHOLD, analyze_routes
+from pavepath.route_optimizer import HAZARD_WEIGHTS, segment_costs
+from pavepath.utils.geocoder import geocode_many
+
+DEFAULT_PORT = 8080
+MAX_BODY_BYTES = 1 << 20
+MAX_HEADER_BYTES = 16 << 10
+IDLE_TIMEOUT_S = 30.0
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+# ---- Batch handlers (run in the worker pool; module-level so they pickle) ----
+def route_batch(requests):
+    """
+    Args:
+        requests (list[tuple]): (locations, mode) per request
+    Returns:
+        list: optimize_route result, or the exception raised, per request
+    """
+    results = [None] * len(requests)
+    # Straight-line requests are costed together: one broadcast per (stop count, mode)
+    # gives every request's leg matrix; two-stop legs need no solver at all
+    groups = {}
+    for i, (locations, mode) in enumerate(requests):
+        try:
+            if len(locations) >= 2 and not (mode == "driving" and len(locations) == 2):
+                groups.setdefault((len(locations), mode), []).append(i)
+        except TypeError:
+            continue  # unsized stops or an unhashable mode: fails on its own below
+    for (n, mode), rows in groups.items():
+        try:
+            stops = np.asarray([requests[i][0] for i in rows], dtype=np.float64).reshape(len(rows), n, 2)
+        except (TypeError, ValueError):
+            continue  # malformed stops: each request fails on its own below
+        if n == 2:
+            costs, hazards, distances = segment_costs(stops[:, 0], stops[:, 1], mode)
+            for k, i in enumerate(rows):
+                origin, destination = requests[i][0]
+                results[i] = {
+                    "optimized_route": [origin, destination],
+                    "segments": SegmentTable(stops[k:k + 1, 0], stops[k:k + 1, 1], hazards[k:k + 1],
+                                             np.round(distances[k:k + 1], 2), costs[k:k + 1]),
+                    "directions": [],
+                    "mode": mode,
+                }
+            continue
+        costs, hazards, distances = segment_costs(stops[:, :, None, :], stops[:, None, :, :], mode)
+        for k, i in enumerate(rows):
+            try:
+                results[i] = route_from_matrix(requests[i][0], mode, costs[k], hazards[k], distances[k])
+            except Exception as exc:
+                results[i] = exc
+
+    for i, (locations, mode) in enumerate(requests):
+        if results[i] is None:
+            try:
+                results[i] = optimize_route(locations, mode)
+            except Exception as exc:
+                results[i] = exc
+    return results
+
+def analyze_batch(requests):
+    """
+    Args:
+        requests (list[tuple]): (route, surface_data, risk_threshold) per request; all
+            hazards in the batch are scored in one vectorized call (analyze_routes)
+    """
+    return analyze_routes(requests)
+
+def geocode_batch(requests, api_key=None):
+    """
+    Args:
+        requests (list[list[str]]): Query list per request; the batch is geocoded as one
+            deduplicated geocode_many call
+    """
+    flat = [query for queries in requests for query in queries]
+    coords = geocode_many(flat, api_key or os.environ.get("OPENCAGE_API_KEY"))
+    results, start = [], 0
+    for queries in requests:
+        results.append(coords[start:start + len(queries)])
+        start += len(queries)
+    return results
+
+# ---- Micro-batching ----
+class MicroBatcher:
+    """
+    Collects concurrent submissions and hands them to a batch handler in one executor call,
+    either when max_batch items are waiting or max_delay_s after the first one arrived.
+    The handler returns one result per item; exception instances are raised to that caller.
+    """
+
+    def __init__(self, handler, executor, max_batch=64, max_delay_s=0.005):
+        self.handler = handler
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_delay_s = max_delay_s
+        self._pending = []
+        self._timer = None
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay_s, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            asyncio.ensure_future(self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self.handler, [item for item, _ in batch])
+        except Exception as exc:
+            results = [exc] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():  # caller timed out
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+# ---- HTTP service ----
+def _json_default(obj):
+    if isinstance(obj, SegmentTable):
+        return obj.to_records()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+def _parse_locations(value):
+    try:
+        locations = [(float(lat), float(lon)) for lat, lon in value]
+    except (TypeError, ValueError):
+        raise HttpError(400, "'locations' must be a list of [lat, lon] pairs")
+    if len(locations) < 2:
+        raise HttpError(400, "'locations' needs at least two stops")
+    return locations
+
+# Checked before a request is queued: a batch handler only sees well-formed requests
+def _parse_mode(value):
+    if not isinstance(value, str) or value not in HAZARD_WEIGHTS:
+        raise HttpError(400, f"'mode' must be one of {', '.join(sorted(HAZARD_WEIGHTS))}")
+    return value
+
+def _parse_threshold(value):
+    try:
+        threshold = float(value)
+    except (TypeError, ValueError):
+        threshold = math.nan
+    if isinstance(value, bool) or not math.isfinite(threshold):
+        raise HttpError(400, "'risk_threshold' must be a finite number")
+    return threshold
+
+def _parse_surface_data(value):
+    if value is not None and not isinstance(value, dict):
+        raise HttpError(400, "'surface_data' must be an object mapping locations to surfaces")
+    return value
+
+class RoutingService:
+    """
+    asyncio HTTP/1.1 JSON API over the routing, hazard and geocoding code.
+
+        POST /route    {"locations": [[lat, lon], ...], "mode": "safe"}
+        POST /analyze  {"route": [...segments] | {"segments": [...]}, "risk_threshold": 4}
+        GET  /geocode?q=Anaheim, CA   |   POST /geocode {"queries": [...]}
+        GET  /health
+
+    Concurrent requests of one kind are micro-batched into a single worker-pool call.
+    Beyond max_pending in-flight requests new ones get 503 with Retry-After, and any
+    request running longer than request_timeout_s gets 504.
+    """
+
+    def __init__(self, executor=None, io_executor=None, max_pending=256, request_timeout_s=10.0,
+                 max_batch=64, max_delay_s=0.005, cache=default_route_cache, api_key=None):
+        self.executor = executor or ProcessPoolExecutor()
+        self.io_executor = io_executor or ThreadPoolExecutor(max_workers=8)
+        self.max_pending = max_pending
+        self.request_timeout_s = request_timeout_s
+        self.cache = cache
+        self.api_key = api_key or os.environ.get("OPENCAGE_API_KEY")
+        self.pending = 0
+        self.stats = {"requests": 0, "rejected": 0, "timeouts": 0}
+        self._routes = MicroBatcher(route_batch, self.executor, max_batch, max_delay_s)
+        self._analyses = MicroBatcher(analyze_batch, self.executor, max_batch, max_delay_s)
+        self._geocodes = MicroBatcher(self._geocode_batch, self.io_executor, max_batch, max_delay_s)
+
+    def _geocode_batch(self, requests):
+        return geocode_batch(requests, self.api_key)
+
+    # --- Endpoints ---
+    async def route(self, body):
+        locations = _parse_locations(body.get("locations"))
+        mode = _parse_mode(body.get("mode", "safe"))
+        # The cache may hit SQLite: keep its I/O off the event loop
+        loop = asyncio.get_running_loop()
+        if self.cache is not None:
+            cached = await loop.run_in_executor(self.io_executor, self.cache.get, locations, mode)
+            if cached is not None:
+                return cached
+        result = await self._routes.submit((locations, mode))
+        if self.cache is not None:
+            await loop.run_in_executor(self.io_executor, self.cache.set, locations, mode, result)
+        return result
+
+    async def analyze(self, body):
+        route = body.get("route")
+        if not isinstance(route, (list, dict)):
+            raise HttpError(400, "'route' must be a segment list or a route dict")
+        threshold = _parse_threshold(body.get("risk_threshold", DEFAULT_RISK_THRESHOLD))
+        surface_data = _parse_surface_data(body.get("surface_data"))
+        return await self._analyses.submit((route, surface_data, threshold))
+
+    async def geocode(self, queries):
+        if not queries or not all(isinstance(q, str) for q in queries):
+            raise HttpError(400, "expected one or more location strings")
+        coords = await self._geocodes.submit(list(queries))
+        return [{"query": q, "lat": lat, "lon": lon} for q, (lat, lon) in zip(queries, coords)]
+
+    async def dispatch(self, method, target, body):
+        """Route one parsed request. Returns (status, payload)."""
+        url = urlsplit(target)
+        if url.path == "/health" and method == "GET":
+            return 200, {"status": "ok", "pending": self.pending}
+        if url.path == "/geocode" and method == "GET":
+            results = await self.geocode(parse_qs(url.query).get("q", []))
+            return 200, results[0] if len(results) == 1 else {"results": results}
+
+        handlers = {"/route": self.route, "/analyze": self.analyze}
+        if method != "POST" or (url.path not in handlers and url.path != "/geocode"):
+            raise HttpError(404, f"no endpoint {method} {url.path}")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(400, "request body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise HttpError(400, "request body must be a JSON object")
+        if url.path == "/geocode":
+            return 200, {"results": await self.geocode(payload.get("queries"))}
+        return 200, await handlers[url.path](payload)
+
+    async def handle(self, method, target, body):
+        """dispatch() with backpressure, timeout and error mapping. Returns (status, payload, headers)."""
+        self.stats["requests"] += 1
+        if self.pending >= self.max_pending:
+            self.stats["rejected"] += 1
+            return 503, {"error": "server busy"}, {"Retry-After": "1"}
+        self.pending += 1
+        try:
+            status, payload = await asyncio.wait_for(self.dispatch(method, target, body), self.request_timeout_s)
+            return status, payload, {}
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            return 504, {"error": "request timed out"}, {}
+        except HttpError as exc:
+            return exc.status, {"error": exc.message}, {}
+        except (ValueError, KeyError, TypeError) as exc:
+            return 400, {"error": str(exc)}, {}
+        except Exception as exc:
+            return 500, {"error": f"{type(exc).__name__}: {exc}"}, {}
+        finally:
+            self.pending -= 1
+
+    # --- HTTP plumbing ---
+    async def _read_request(self, reader):
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT_S)
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "request body too large")
+        body = await asyncio.wait_for(reader.readexactly(length), self.request_timeout_s) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        return method.upper(), target, body, keep_alive
+
+    @staticmethod
+    def _encode(status, payload, headers, keep_alive):
+        body = json.dumps(payload, default=_json_default).encode("utf-8")
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                 "Content-Type: application/json",
+                 f"Content-Length: {len(body)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    method, target, body, keep_alive = await self._read_request(reader)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(self._encode(400, {"error": "malformed request"}, {}, False))
+                    break
+                except HttpError as exc:
+                    writer.write(self._encode(exc.status, {"error": exc.message}, {}, False))
+                    break
+                status, payload, headers = await self.handle(method, target, body)
+                writer.write(self._encode(status, payload, headers, keep_alive))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Start listening; returns the asyncio Server (port 0 picks a free port)."""
+        return await asyncio.start_server(self._serve_connection, host, port, limit=MAX_HEADER_BYTES)
+
+    async def serve_forever(self, host="127.0.0.1", port=DEFAULT_PORT):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.io_executor.shutdown(wait=False, cancel_futures=True)
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT, workers=None, **options):
+    service = RoutingService(executor=ProcessPoolExecutor(max_workers=workers), **options)
+    try:
+        asyncio.run(service.serve_forever(host, port))
+    finally:
+        service.close()
@@ -15,10 +15,11 @@ surface_data = {
 }
 
 if __name__ == "__main__":
-    scored_hazards, should_reroute = analyze_route(mock_route, surface_data)
+    result = analyze_route(mock_route, surface_data)
 
     print("✅ Scored Hazards:")
-    for hazard in scored_hazards:
+    for hazard in result["hazards"]:
         print(hazard)
 
-    print("\n🚦 Should Reroute:", should_reroute)
+    print("\n🚦 Should Reroute:", result["should_reroute"])
+    print("⏱️ Timings:", result["timings"])
@@ -1,9 +1,43 @@
+import numpy as np
+
+# Shared hazard colour ramp over normalized scores (0-1): a score above RAMP_BOUNDS[i]
+# moves up to colour i + 1
+RAMP_BOUNDS = np.array([0.25, 0.5, 0.75])
+RAMP_NAMES = ["green", "yellow", "orange", "red"]
+RAMP_RGB = np.array([[0, 180, 80], [255, 200, 0], [255, 140, 0], [220, 60, 60]], dtype=np.uint8)
+UNSCORED_RGB = np.array([100, 100, 255], dtype=np.uint8)
+
 def score_to_color(score):
-    if score > 0.75:
-        return 'red'
-    elif score > 0.5:
-        return 'orange'
-    elif score > 0.25:
-        return 'yellow'
+    return RAMP_NAMES[int(np.searchsorted(RAMP_BOUNDS, score))]
+
+def scores_to_rgb(scores, scale=1.0):
+    """
+    Vectorized score_to_color as RGB rows.
+    Args:
+        scores (array-like): Hazard scores; None/NaN are unscored
+        scale (float): Score that maps to 1.0 on the ramp
+    Returns:
+        np.ndarray: (N, 3) uint8 colours
+    """
+    scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+    unscored = np.isnan(scores)
+    if scale > 0:
+        normalized = scores / scale
     else:
-        return 'green'
+        normalized = np.where(scores > 0, np.inf, 0.0)
+    colors = RAMP_RGB[np.searchsorted(RAMP_BOUNDS, np.where(unscored, 0.0, normalized))]
+    colors[unscored] = UNSCORED_RGB
+    return colors
+
+def threshold_rgb(scores, threshold):
+    """
+    Road-map colours relative to a risk threshold: red at or above it, yellow from half
+    of it, green below; None/NaN are unscored.
+    Returns:
+        np.ndarray: (N, 3) uint8 colours
+    """
+    scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+    band = (scores >= threshold / 2).astype(np.intp) + (scores >= threshold)
+    colors = RAMP_RGB[[0, 1, 3]][band]
+    colors[np.isnan(scores)] = UNSCORED_RGB
+    return colors
@@ -0,0 +1,57 @@
+# pavepath/utils/geocode_cache.py
+
+import os
+import time
+from typing import Callable, Optional, Tuple
+
+from pavepath.utils.tiered_cache import TieredCache
+
+Coords = Tuple[Optional[float], Optional[float]]
+
+NEGATIVE = (None, None)
+
+def normalize_query(location: str) -> str:
+    """Cache key for a free-text location: case- and whitespace-insensitive."""
+    return " ".join(str(location).lower().split()).strip(" ,")
+
+class GeocodeCache(TieredCache):
+    """
+    Two-tier geocode cache: an in-process LRU in front of an optional SQLite store
+    (see TieredCache).
+
+    Positive results live for ttl_s; "no such place" answers are cached as (None, None)
+    for the shorter negative_ttl_s. Both tiers are size-bounded and evict least
+    recently used entries first.
+    """
+
+    table = "geocode_entries"
+
+    def __init__(self, path: Optional[str] = None, ttl_s: float = 30 * 86400,
+                 negative_ttl_s: float = 3600, max_memory_entries: int = 4096,
+                 max_disk_entries: int = 100_000, clock: Callable[[], float] = time.time):
+        super().__init__(path, max_memory_entries, max_disk_entries, clock)
+        self.ttl_s = ttl_s
+        self.negative_ttl_s = negative_ttl_s
+        self.stats["negative_hits"] = 0
+
+    def decode(self, text: str) -> Coords:
+        lat, lon = super().decode(text)
+        return (lat, lon)
+
+    def get(self, location: str) -> Optional[Coords]:
+        """
+        Returns:
+            (lat, lon) on a hit, (None, None) on a cached negative result, None on a miss
+        """
+        coords = self.lookup(normalize_query(location))
+        if coords == NEGATIVE:
+            self.stats["negative_hits"] += 1
+        return coords
+
+    def set(self, location: str, coords: Coords) -> None:
+        """Store a geocode result; pass (None, None) to cache a negative result."""
+        coords = NEGATIVE if coords is None or None in coords else (float(coords[0]), float(coords[1]))
+        self.store(normalize_query(location), coords, self.negative_ttl_s if coords == NEGATIVE else self.ttl_s)
+
+# Process-wide cache; set PAVEPATH_GEOCODE_CACHE to a file path to persist it across restarts
+default_cache = GeocodeCache(path=os.environ.get("PAVEPATH_GEOCODE_CACHE"))
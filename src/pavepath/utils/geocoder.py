@@ -1,19 +1,53 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from pavepath.utils.geocode_cache import NEGATIVE, default_cache, normalize_query
 
 GEOCODING_API = "https://api.opencagedata.com/geocode/v1/json"
 
-def geocode_location(location: str, api_key: str, debug: bool = False):
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+def get_session(pool_size: int = 16) -> requests.Session:
+    """
+    Shared keep-alive session so repeated geocodes reuse pooled connections. A request
+    for a larger pool than the current one remounts the adapters with that size.
+    """
+    global _session, _session_pool_size
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        if pool_size > _session_pool_size:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session_pool_size = pool_size
+        return _session
+
+def geocode_location(location: str, api_key: str, debug: bool = False, cache=default_cache):
     if debug:
         masked = lambda k: (k[:4] + "..." + k[-4:]) if k and len(k) > 8 else ("set" if k else "None")
         print(f"[geocoder] key loaded: {masked(api_key)} | query: '{location}'")
 
+    if cache is not None:
+        cached = cache.get(location)
+        if cached is not None:
+            if debug:
+                print(f"[geocoder] cache hit: {cached}")
+            return cached
+
     if not api_key:
         if debug:
             print("[geocoder] Missing OPENCAGE_API_KEY")
         return None, None
 
     try:
-        response = requests.get(
+        response = get_session().get(
             GEOCODING_API,
             params={"q": location, "key": api_key, "limit": 1},
             timeout=12,
@@ -26,21 +60,7 @@ def geocode_location(location: str, api_key: str, debug: bool = False):
         if response.status_code != 200:
             return None, None
 
-        data = response.json()
-        results = data.get("results", [])
-        if not results:
-            if debug:
-                print("[geocoder] No results returned")
-            return None, None
-
-        geometry = results[0].get("geometry", {})
-        lat, lng = geometry.get("lat"), geometry.get("lng")
-        if lat is None or lng is None:
-            if debug:
-                print("[geocoder] Missing lat/lng in geometry")
-            return None, None
-
-        return float(lat), float(lng)
+        return _parse_response(location, response.json(), debug, cache)
 
     except requests.Timeout:
         if debug:
@@ -51,3 +71,116 @@ def geocode_location(location: str, api_key: str, debug: bool = False):
             print(f"[geocoder] Exception: {e}")
         return None, None
 
+def _parse_response(location, data, debug=False, cache=None):
+    # Only definitive answers are cached; transport errors and non-200s are retried next time
+    results = data.get("results", [])
+    if not results:
+        if debug:
+            print("[geocoder] No results returned")
+        if cache is not None:
+            cache.set(location, NEGATIVE)
+        return None, None
+
+    geometry = results[0].get("geometry", {})
+    lat, lng = geometry.get("lat"), geometry.get("lng")
+    if lat is None or lng is None:
+        if debug:
+            print("[geocoder] Missing lat/lng in geometry")
+        if cache is not None:
+            cache.set(location, NEGATIVE)
+        return None, None
+
+    coords = (float(lat), float(lng))
+    if cache is not None:
+        cache.set(location, coords)
+    return coords
+
+# ----------------------------
+# Batch geocoding
+# ----------------------------
+
+class RateLimiter:
+    """
+    Thread-safe request pacing: at most rate_per_s requests per second, plus a shared
+    back-off window when the API answers 429.
+    """
+
+    def __init__(self, rate_per_s=None):
+        self.interval = 1.0 / rate_per_s if rate_per_s else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def back_off(self, seconds):
+        with self._lock:
+            self._next_at = max(self._next_at, time.monotonic() + seconds)
+
+def _retry_after(response, attempt):
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return 0.5 * 2 ** attempt
+
+def geocode_many(queries, api_key: str, max_concurrency: int = 8, rate_per_s=None,
+                 cache=default_cache, url: str = None, timeout: float = 12, max_retries: int = 2):
+    """
+    Geocode many locations concurrently over pooled keep-alive connections.
+    Args:
+        queries (list[str]): Free-text locations; duplicates are fetched once
+        api_key (str): OpenCage API key
+        max_concurrency (int): Parallel in-flight requests
+        rate_per_s (float, optional): Request rate cap shared by all workers
+        cache (GeocodeCache, optional): Consulted first and filled with results
+        url (str, optional): Endpoint override (e.g. a local stub server)
+        max_retries (int): Retries per query after a 429 or transport error
+    Returns:
+        list[tuple]: (lat, lon) or (None, None) per query, in input order
+    """
+    url = url or GEOCODING_API
+    unique = {}
+    for query in queries:
+        unique.setdefault(normalize_query(query), query)
+
+    results = {}
+    pending = []
+    for key, query in unique.items():
+        cached = cache.get(query) if cache is not None else None
+        if cached is not None:
+            results[key] = cached
+        else:
+            pending.append((key, query))
+
+    if pending and api_key:
+        session = get_session(pool_size=max(max_concurrency, 1))
+        limiter = RateLimiter(rate_per_s)
+
+        def fetch(query):
+            for attempt in range(max_retries + 1):
+                limiter.wait()
+                try:
+                    response = session.get(url, params={"q": query, "key": api_key, "limit": 1}, timeout=timeout)
+                except requests.RequestException:
+                    continue
+                if response.status_code == 429:
+                    limiter.back_off(_retry_after(response, attempt))
+                    continue
+                if response.status_code != 200:
+                    return None, None
+                try:
+                    return _parse_response(query, response.json(), cache=cache)
+                except ValueError:
+                    return None, None
+            return None, None
+
+        with ThreadPoolExecutor(max_workers=max(max_concurrency, 1)) as pool:
+            for (key, _), coords in zip(pending, pool.map(fetch, [q for _, q in pending])):
+                results[key] = coords
+
+    return [results.get(normalize_query(query), (None, None)) for query in queries]
@@ -0,0 +1,21 @@
+# pavepath/utils/geometry.py
+
+import numpy as np
+
+def linestring_arrays(geometries):
+    """
+    Flatten LineString geometries into one coordinate array plus offsets.
+    Args:
+        geometries (array-like): shapely LineStrings in (lon, lat)
+    Returns:
+        tuple[np.ndarray, np.ndarray]: coords (N, 2) as (lon, lat) and offsets (M + 1,)
+            such that line k is coords[offsets[k]:offsets[k + 1]]
+    """
+    import shapely
+
+    geoms = np.asarray(geometries, dtype=object)
+    coords, line_index = shapely.get_coordinates(geoms, return_index=True)
+    counts = np.bincount(line_index, minlength=len(geoms))
+    offsets = np.zeros(len(geoms) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return coords, offsets
@@ -1,4 +1,84 @@
-import polyline
+import numpy as np
 
-def decode_polyline(encoded):
-    return polyline.decode(encoded)
+# Google's encoded polyline format: 1e5 fixed point, zig-zag deltas in 5-bit groups + 63
+PRECISION = 5
+_OFFSET = 63
+_MAX_GROUPS = 7  # enough for any 32-bit delta
+
+def decode_polylines(encoded, precision=PRECISION):
+    """
+    Decode many encoded polylines at once.
+    Args:
+        encoded (list[str]): Encoded polylines
+        precision (int): Decimal places used by the encoder (Google uses 5)
+    Returns:
+        tuple[np.ndarray, np.ndarray]: coords (N, 2) float64 as (lat, lon) and offsets
+            (M + 1,) such that polyline k is coords[offsets[k]:offsets[k + 1]]
+    """
+    encoded = list(encoded)
+    raw = np.frombuffer("".join(encoded).encode("ascii"), dtype=np.uint8).astype(np.int64) - _OFFSET
+    if len(raw) and (raw.min() < 0 or raw.max() > 63):
+        raise ValueError("invalid character in encoded polyline")
+    byte_ends = np.cumsum([len(s) for s in encoded], dtype=np.int64)
+
+    # A value ends at every byte without the continuation bit
+    ends = (raw & 0x20) == 0
+    last_bytes = byte_ends[np.diff(byte_ends, prepend=0) > 0] - 1
+    if not ends[last_bytes].all():
+        raise ValueError("truncated encoded polyline")
+    ends_before = np.concatenate([[0], np.cumsum(ends)])
+    value_offsets = ends_before[np.concatenate([[0], byte_ends])]
+    if np.any(np.diff(value_offsets) % 2):
+        raise ValueError("encoded polyline has an odd number of values")
+
+    starts = np.flatnonzero(np.concatenate([[True], ends[:-1]])) if len(raw) else np.empty(0, dtype=np.int64)
+    shifts = 5 * (np.arange(len(raw)) - np.repeat(starts, np.diff(np.append(starts, len(raw)))))
+    values = np.bitwise_or.reduceat((raw & 0x1f) << shifts, starts) if len(raw) else raw
+    deltas = np.where(values & 1, ~(values >> 1), values >> 1).reshape(-1, 2)
+
+    # Deltas restart at every polyline: cumulative sum minus the running total before it
+    totals = np.cumsum(deltas, axis=0)
+    point_offsets = value_offsets // 2
+    counts = np.diff(point_offsets)
+    before = np.vstack([np.zeros((1, 2), dtype=np.int64), totals])[point_offsets[:-1]]
+    coords = (totals - np.repeat(before, counts, axis=0)) / 10.0 ** precision
+    return coords, point_offsets
+
+def decode_polyline(encoded, precision=PRECISION):
+    """Single polyline as a list of (lat, lon) tuples."""
+    coords, _ = decode_polylines([encoded], precision)
+    return [tuple(point) for point in coords.tolist()]
+
+def iter_encode_polyline(blocks, precision=PRECISION, chunk_points=4096):
+    """
+    Encode (lat, lon) points incrementally, yielding one string per chunk of points, so
+    long routes can be streamed to a client without building the whole string first.
+    Args:
+        blocks (iterable): Successive (n, 2) point arrays of one polyline; pass [coords]
+            for a single array
+        chunk_points (int): Points encoded per yielded string
+    """
+    previous = np.zeros(2, dtype=np.int64)
+    scale = 10.0 ** precision
+    for block in blocks:
+        block = np.asarray(block, dtype=np.float64).reshape(-1, 2)
+        for start in range(0, len(block), chunk_points):
+            fixed = np.round(block[start:start + chunk_points] * scale).astype(np.int64)
+            deltas = np.diff(fixed, axis=0, prepend=previous[None, :]).reshape(-1)
+            previous = fixed[-1]
+            yield _encode_values(deltas)
+
+def encode_polyline(coords, precision=PRECISION):
+    return "".join(iter_encode_polyline([coords], precision))
+
+def _encode_values(values):
+    zigzag = np.where(values < 0, ~(values << 1), values << 1)
+    shifts = 5 * np.arange(_MAX_GROUPS)
+    shifted = zigzag[:, None] >> shifts
+    groups = shifted & 0x1f
+    # Groups needed per value: the first, plus every later one with bits still left
+    needed = 1 + np.count_nonzero(shifted[:, 1:], axis=1)
+    column = np.arange(_MAX_GROUPS)
+    continued = column < needed[:, None] - 1
+    chars = (groups | np.where(continued, 0x20, 0)) + _OFFSET
+    return chars[column < needed[:, None]].astype(np.uint8).tobytes().decode("ascii")
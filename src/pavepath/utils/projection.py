@@ -0,0 +1,109 @@
+# pavepath/utils/projection.py
+
+import numpy as np
+
+METERS_PER_DEG_LAT = 111_320.0
+
+class LocalProjection:
+    """
+    Equirectangular projection from (lon, lat) degrees to metres around a reference point.
+    Distortion stays well under 1% across a county-sized extent, which is plenty for
+    buffering and nearest-neighbour queries.
+    """
+
+    def __init__(self, lat0: float, lon0: float = 0.0):
+        self.lat0 = float(lat0)
+        self.lon0 = float(lon0)
+        self._mx = METERS_PER_DEG_LAT * np.cos(np.radians(self.lat0))
+
+    @classmethod
+    def from_bounds(cls, min_lon, min_lat, max_lon, max_lat):
+        if not np.all(np.isfinite([min_lon, min_lat, max_lon, max_lat])):
+            return cls(0.0, 0.0)
+        return cls((min_lat + max_lat) / 2, (min_lon + max_lon) / 2)
+
+    def forward(self, lon, lat):
+        """Degrees -> metres. Accepts scalars or arrays."""
+        return (np.asarray(lon) - self.lon0) * self._mx, (np.asarray(lat) - self.lat0) * METERS_PER_DEG_LAT
+
+    def inverse(self, x, y):
+        """Metres -> degrees. Accepts scalars or arrays."""
+        return np.asarray(x) / self._mx + self.lon0, np.asarray(y) / METERS_PER_DEG_LAT + self.lat0
+
+    def project(self, geometries):
+        """Project shapely geometries (single or array) given in (lon, lat) to metres."""
+        import shapely
+
+        def _fwd(coords):
+            x, y = self.forward(coords[:, 0], coords[:, 1])
+            return np.column_stack([x, y])
+
+        return shapely.transform(geometries, _fwd)
+
+    def unproject(self, geometries):
+        """Inverse of project: shapely geometries in metres back to (lon, lat)."""
+        import shapely
+
+        def _inv(coords):
+            lon, lat = self.inverse(coords[:, 0], coords[:, 1])
+            return np.column_stack([lon, lat])
+
+        return shapely.transform(geometries, _inv)
+
+# Query geometries are measured in a projection centred on their own 0.25° latitude band,
+# so the cos(lat) scale is off by < 0.3% even at 49°N, however wide the indexed extent
+LAT_BAND_DEG = 0.25
+
+def degrees_for_meters(distance_m, lat):
+    """Degrees of longitude spanning distance_m at latitude lat (>= the degrees of latitude)."""
+    lat = np.minimum(np.abs(np.asarray(lat, dtype=np.float64)), 89.9)
+    return distance_m / (METERS_PER_DEG_LAT * np.cos(np.radians(lat)))
+
+def query_dwithin_m(tree, tree_geoms, geoms, distance_m):
+    """
+    STRtree "dwithin" query in metres against a tree built over (lon, lat) geometries.
+
+    Candidates come from a degree-space query with a per-geometry margin wide enough at the
+    geometry's most poleward latitude; each candidate pair is then measured exactly in a
+    LocalProjection centred on the query geometry's latitude band. Unlike one projection
+    for the whole tree, this stays accurate for statewide and national extents.
+    Args:
+        tree (shapely.STRtree): Tree over tree_geoms
+        tree_geoms (np.ndarray): The (lon, lat) geometries the tree was built from
+        geoms (np.ndarray): (lon, lat) query geometries
+        distance_m (float): Search distance in metres
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (query index, tree index) pairs, as STRtree.query
+    """
+    import shapely
+
+    geoms = np.asarray(geoms, dtype=object)
+    tree_geoms = np.asarray(tree_geoms, dtype=object)
+    if len(geoms) == 0 or len(tree_geoms) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    # GEOS flags dwithin on zero-length lines (e.g. a single-vertex query) as invalid:
+    # query those as the point they are
+    degenerate = np.flatnonzero((shapely.get_type_id(geoms) == shapely.GeometryType.LINESTRING)
+                                & (shapely.length(geoms) == 0))
+    if len(degenerate):
+        geoms = geoms.copy()
+        geoms[degenerate] = shapely.get_point(geoms[degenerate], 0)
+    bounds = shapely.bounds(geoms)
+    reach = np.maximum(np.abs(bounds[:, 1]), np.abs(bounds[:, 3])) + distance_m / METERS_PER_DEG_LAT
+    query_pos, tree_pos = tree.query(geoms, predicate="dwithin", distance=degrees_for_meters(distance_m, reach))
+    if len(query_pos) == 0:
+        return query_pos, tree_pos
+
+    center_lat = (bounds[:, 1] + bounds[:, 3]) / 2
+    center_lon = (bounds[:, 0] + bounds[:, 2]) / 2
+    band = np.round(center_lat[query_pos] / LAT_BAND_DEG).astype(np.int64)
+    keep = np.zeros(len(query_pos), dtype=bool)
+    for b in np.unique(band).tolist():
+        pairs = np.flatnonzero(band == b)
+        queries, query_of_pair = np.unique(query_pos[pairs], return_inverse=True)
+        targets, target_of_pair = np.unique(tree_pos[pairs], return_inverse=True)
+        projection = LocalProjection(b * LAT_BAND_DEG, float(np.mean(center_lon[queries])))
+        keep[pairs] = shapely.dwithin(projection.project(geoms[queries])[query_of_pair],
+                                      projection.project(tree_geoms[targets])[target_of_pair], distance_m)
+    return query_pos[keep], tree_pos[keep]
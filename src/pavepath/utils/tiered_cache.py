@@ -0,0 +1,152 @@
+# pavepath/utils/tiered_cache.py
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+class TieredCache:
+    """
+    In-process LRU in front of an optional SQLite store, shared by the geocode and route
+    caches.
+
+    Values are written to disk as JSON text (never pickles, so opening a cache file from
+    an untrusted path cannot run code). Each entry has an expiry time and an integer tag
+    (e.g. a data epoch) so whole generations can be dropped at once. Both tiers are
+    size-bounded and evict least recently used entries first. Subclasses pick the table
+    name and override encode()/decode() for values JSON cannot represent directly.
+    """
+
+    table = "cache_entries"
+
+    def __init__(self, path: Optional[str] = None, max_memory_entries: int = 1024,
+                 max_disk_entries: int = 100_000, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at, tag)
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0}
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT, expires_at REAL, tag INTEGER, last_used REAL)"
+            )
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_last_used ON {self.table}(last_used)")
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {self.table}_meta (name TEXT PRIMARY KEY, value TEXT)")
+            self._db.commit()
+
+    def __len__(self):
+        return len(self._memory)
+
+    # --- Serialization (override per value type) ---
+    def encode(self, value: Any) -> str:
+        return json.dumps(value)
+
+    def decode(self, text: str) -> Any:
+        return json.loads(text)
+
+    # --- Entries ---
+    def _remember(self, key: str, value: Any, expires_at: float, tag: int) -> None:
+        self._memory[key] = (value, expires_at, tag)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def lookup(self, key: str) -> Optional[Any]:
+        """Returns: the cached value, or None on a miss (or an expired entry)."""
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[0]
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    f"SELECT value, expires_at, tag FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._db.execute(f"UPDATE {self.table} SET last_used = ? WHERE key = ?", (now, key))
+                    self._db.commit()
+                    value = self.decode(row[0])
+                    self._remember(key, value, row[1], row[2])
+                    self.stats["hits"] += 1
+                    self.stats["disk_hits"] += 1
+                    return value
+
+            self.stats["misses"] += 1
+            return None
+
+    def store(self, key: str, value: Any, ttl_s: float = math.inf, tag: int = 0) -> None:
+        now = self._clock()
+        expires_at = now + ttl_s
+        with self._lock:
+            self._remember(key, value, expires_at, tag)
+            if self._db is not None:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, tag, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, self.encode(value), expires_at, tag, now),
+                )
+                cur = self._db.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY last_used LIMIT "
+                    f"max(0, (SELECT COUNT(*) FROM {self.table}) - ?))",
+                    (self.max_disk_entries,),
+                )
+                self.stats["evictions"] += max(cur.rowcount, 0)
+                self._db.commit()
+
+    def drop_tags_below(self, tag: int) -> None:
+        """Remove every entry stored with a tag lower than `tag`."""
+        with self._lock:
+            for key in [k for k, entry in self._memory.items() if entry[2] < tag]:
+                del self._memory[key]
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.table} WHERE tag < ?", (tag,))
+                self._db.commit()
+
+    def purge_expired(self) -> None:
+        now = self._clock()
+        with self._lock:
+            for key in [k for k, entry in self._memory.items() if entry[1] <= now]:
+                del self._memory[key]
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+                self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.table}")
+                self._db.commit()
+
+    # --- Persistent settings (e.g. the current epoch) ---
+    def get_meta(self, name: str, default: Any = None) -> Any:
+        if self._db is None:
+            return default
+        with self._lock:
+            row = self._db.execute(f"SELECT value FROM {self.table}_meta WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, name: str, value: Any) -> None:
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.execute(f"INSERT OR REPLACE INTO {self.table}_meta (name, value) VALUES (?, ?)",
+                             (name, json.dumps(value)))
+            self._db.commit()
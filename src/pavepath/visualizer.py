@@ -1,6 +1,8 @@
 import matplotlib.pyplot as plt
 import folium
 
+from pavepath.core.segments import as_segment_table
+
 def visualize_route_scores(segment_scores: list, save=False):
     """
     Displays a bar chart of hazard scores per segment.
@@ -29,7 +31,7 @@ def render_route_map(route_data: dict):
     Input: route_data dict with 'optimized_route' and 'segments'
     """
     route = route_data.get("optimized_route", [])
-    segments = route_data.get("segments", [])
+    segments = as_segment_table(route_data.get("segments", []))
 
     if not route or not segments:
         raise ValueError("Missing route or segment data")
@@ -37,17 +39,16 @@ def render_route_map(route_data: dict):
     m = folium.Map(location=route[0], zoom_start=12)
     folium.PolyLine(route, color="blue", weight=4, opacity=0.6).add_to(m)
 
-    for seg in segments:
-        midpoint = (
-            (seg["from"][0] + seg["to"][0]) / 2,
-            (seg["from"][1] + seg["to"][1]) / 2
-        )
-        score = seg["hazard_score"]
+    midpoints = segments.midpoints().tolist()
+    scores = segments.hazard_score.tolist()
+    distances = segments.distance_km.tolist()
+    costs = segments.composite_cost.tolist()
+    for midpoint, score, distance_km, cost in zip(midpoints, scores, distances, costs):
         color = "green" if score < 2 else "orange" if score < 4 else "red"
         popup = (
             f"<b>Hazard Score:</b> {score}<br>"
-            f"<b>Distance:</b> {seg['distance_km']} km<br>"
-            f"<b>Cost:</b> {seg['composite_cost']}"
+            f"<b>Distance:</b> {distance_km} km<br>"
+            f"<b>Cost:</b> {cost}"
         )
         folium.Circle(
             location=midpoint,
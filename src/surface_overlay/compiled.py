@@ -0,0 +1,151 @@
+# surface_overlay/compiled.py
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+FORMAT_VERSION = 1
+SUFFIX = ".roads"
+
+def compiled_path(source_path):
+    """Default location of the compiled layer: next to the source, e.g. data/roads.geojson.roads/"""
+    return Path(str(source_path) + SUFFIX)
+
+def is_compiled(path):
+    return (Path(path) / "meta.json").is_file()
+
+def compiled_mtime(path):
+    """
+    Modification time of a compiled layer. meta.json is rewritten last on every compile;
+    the directory's own mtime does not change when files inside it are replaced.
+    """
+    return os.path.getmtime(Path(path) / "meta.json")
+
+def _source_stamp(source_path):
+    stat = os.stat(source_path)
+    return {"path": str(source_path), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def is_fresh(path, source_path):
+    """
+    True when the compiled layer at path was built from source_path as it is now (same
+    mtime and size recorded at compile time), or, for layers compiled without a source
+    stamp, when it is newer than the source.
+    """
+    if not is_compiled(path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    stamp = json.loads((Path(path) / "meta.json").read_text()).get("source")
+    if stamp is not None:
+        current = _source_stamp(source_path)
+        return stamp["mtime_ns"] == current["mtime_ns"] and stamp["size"] == current["size"]
+    return compiled_mtime(path) >= os.path.getmtime(source_path)
+
+class CompiledRoads:
+    """
+    Road layer stored as flat .npy columns and opened with np.load(mmap_mode="r").
+
+    Arrays are views onto the page cache, so any number of processes opening the same
+    directory share one copy and start without parsing anything.
+    Attributes:
+        coords (np.ndarray): (N, 2) vertices as (lon, lat)
+        offsets (np.ndarray): (M + 1,) road k is coords[offsets[k]:offsets[k + 1]]
+        surface_codes (np.ndarray): (M,) index into surfaces, -1 if missing
+        surfaces (list[str]): Surface vocabulary
+        attributes (dict[str, np.ndarray]): Other property columns
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        meta = json.loads((self.path / "meta.json").read_text())
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled road format version: {meta.get('version')}")
+        self.crs = meta.get("crs")
+        self.surfaces = meta["surfaces"]
+        self.coords = np.load(self.path / "coords.npy", mmap_mode="r")
+        self.offsets = np.load(self.path / "offsets.npy", mmap_mode="r")
+        self.surface_codes = np.load(self.path / "surface_codes.npy", mmap_mode="r")
+        self.attributes = {
+            name: np.load(self.path / f"attr_{i}.npy", mmap_mode="r")
+            for i, name in enumerate(meta["attributes"])
+        }
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def surface(self):
+        """Surface name per road (None where missing)."""
+        vocab = np.array(self.surfaces + [None], dtype=object)
+        return vocab[np.asarray(self.surface_codes)]
+
+    def rows_with_surface(self, surface):
+        """Row positions of roads with the given surface name."""
+        if surface not in self.surfaces:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(np.asarray(self.surface_codes) == self.surfaces.index(surface))
+
+    def to_geodataframe(self, rows=None):
+        """
+        Build a GeoDataFrame, creating one shapely geometry per road: O(roads) work,
+        unlike opening the layer. Pass rows (positions) to build only a subset.
+        """
+        import geopandas as gpd
+        import shapely
+
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.int64)
+        offsets = np.asarray(self.offsets)
+        starts, counts = offsets[rows], offsets[rows + 1] - offsets[rows]
+        vertex = np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts) + np.arange(counts.sum())
+        geometry = shapely.linestrings(np.asarray(self.coords)[vertex], indices=np.repeat(np.arange(len(rows)), counts))
+        columns = {name: np.asarray(values)[rows] for name, values in self.attributes.items()}
+        columns["surface"] = self.surface[rows]
+        return gpd.GeoDataFrame(columns, geometry=geometry, crs=self.crs)
+
+def compile_roads(roads_gdf, out_path, source_path=None):
+    """
+    Write a road GeoDataFrame in the compiled layout. Multi-part roads are split into
+    one record per part; string attributes are stored as fixed-width unicode.
+    Args:
+        source_path (str, optional): File the roads were read from; its mtime and size
+            are recorded so is_fresh() can tell when it changes
+    """
+    from pavepath.utils.geometry import linestring_arrays
+
+    out = Path(out_path)
+    out.mkdir(parents=True, exist_ok=True)
+    roads = roads_gdf.explode(index_parts=False).reset_index(drop=True)
+    coords, offsets = linestring_arrays(roads.geometry.values)
+
+    surface_values = roads["surface"].tolist() if "surface" in roads else [None] * len(roads)
+    surfaces = sorted({s for s in surface_values if isinstance(s, str)})
+    lookup = {name: code for code, name in enumerate(surfaces)}
+    surface_codes = np.array([lookup.get(s, -1) for s in surface_values], dtype=np.int16)
+
+    np.save(out / "coords.npy", coords)
+    np.save(out / "offsets.npy", offsets)
+    np.save(out / "surface_codes.npy", surface_codes)
+
+    attributes = [c for c in roads.columns if c not in ("geometry", "surface")]
+    for i, name in enumerate(attributes):
+        values = roads[name]
+        if values.dtype.kind in "biuf":
+            np.save(out / f"attr_{i}.npy", values.to_numpy())
+        else:
+            np.save(out / f"attr_{i}.npy", values.fillna("").astype(str).to_numpy().astype(str))
+
+    crs = roads.crs.to_string() if roads.crs is not None else None
+    meta = {"version": FORMAT_VERSION, "count": len(roads), "surfaces": surfaces,
+            "attributes": attributes, "crs": crs}
+    if source_path is not None:
+        meta["source"] = _source_stamp(source_path)
+    # meta.json goes last, replaced atomically: readers never see it ahead of the columns
+    tmp = out / "meta.json.tmp"
+    tmp.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp, out / "meta.json")
+    return out
+
+def load_compiled_roads(path):
+    return CompiledRoads(path)
@@ -0,0 +1,60 @@
+# surface_overlay/layers.py
+
+import numpy as np
+import shapely
+
+from pavepath.utils.color_map import scores_to_rgb
+from pavepath.utils.geometry import linestring_arrays
+
+# Folium colour per road surface
+SURFACE_COLORS = {"dirt": "brown", "paved": "gray"}
+DEFAULT_SURFACE_COLOR = "blue"
+
+def geometry_paths(geometries, lat_lon=False):
+    """
+    Coordinate lists for many LineStrings in one pass; anything else gets an empty path.
+    Args:
+        geometries (array-like): shapely geometries in (lon, lat)
+        lat_lon (bool): Emit (lat, lon) pairs (folium) instead of (lon, lat) (pydeck)
+    Returns:
+        list[list[list[float]]]: one path per geometry
+    """
+    geoms = np.asarray(geometries, dtype=object)
+    geoms = np.where(shapely.get_type_id(geoms) == 1, geoms, None)  # 1 = LineString
+    coords, offsets = linestring_arrays(geoms)
+    flat = (coords[:, ::-1] if lat_lon else coords).tolist()
+    bounds = offsets.tolist()
+    return [flat[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+def path_layer_data(roads_gdf, scores=None, scale=1.0):
+    """
+    Columns for a pydeck PathLayer: 'path' ([lon, lat] lists), 'color' (RGB) and 'hazard_score'.
+    Args:
+        roads_gdf (GeoDataFrame): Roads, one path per row
+        scores (array-like, optional): Hazard score per road (default: 'hazard_score' column)
+        scale (float): Score drawn at the top of the colour ramp (see utils.color_map)
+    """
+    import pandas as pd
+
+    if scores is None:
+        scores = roads_gdf["hazard_score"] if "hazard_score" in roads_gdf else np.full(len(roads_gdf), np.nan)
+    scores = pd.to_numeric(pd.Series(np.asarray(scores, dtype=object)), errors="coerce").to_numpy(dtype=float)
+    return pd.DataFrame({
+        "path": geometry_paths(roads_gdf.geometry.values),
+        "color": scores_to_rgb(scores, scale).tolist(),
+        "hazard_score": scores,
+    })
+
+def surface_polylines(roads_gdf):
+    """
+    Group road paths by folium surface colour so each colour is drawn as one multi-line.
+    Returns:
+        dict[str, list]: colour -> list of (lat, lon) paths
+    """
+    surfaces = roads_gdf["surface"].to_numpy() if "surface" in roads_gdf else np.full(len(roads_gdf), None)
+    colors = np.array([SURFACE_COLORS.get(s, DEFAULT_SURFACE_COLOR) for s in surfaces], dtype=object)
+    paths = geometry_paths(roads_gdf.geometry.values, lat_lon=True)
+    grouped = {}
+    for color in dict.fromkeys(colors.tolist()):
+        grouped[color] = [paths[i] for i in np.flatnonzero(colors == color).tolist() if paths[i]]
+    return grouped
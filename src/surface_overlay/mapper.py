@@ -1,17 +1,119 @@
 import json
+import numpy as np
 import geopandas as gpd
 import pydeck as pdk
 import folium
+import shapely
+from shapely import STRtree
+
+from pavepath.utils.projection import LocalProjection
+from surface_overlay.compiled import CompiledRoads, compiled_path, is_compiled, is_fresh, load_compiled_roads
+from surface_overlay.layers import surface_polylines
+from surface_overlay.tiles import RoadTiles
 
 # --- Data Loading ---
+def open_roads(path="data/roads.geojson"):
+    """
+    Memory-mapped road layer, without building any geometry: the fast startup path.
+    Returns:
+        CompiledRoads | None: the compiled layer at path, or the fresh one next to the
+            source file (see surface_overlay.compiled.is_fresh); None if there is none
+    """
+    if is_compiled(path):
+        return load_compiled_roads(path)
+    compiled = compiled_path(path)
+    return load_compiled_roads(compiled) if is_fresh(compiled, path) else None
+
 def load_roads(path="data/roads.geojson"):
-    roads_gdf = gpd.read_file(path)
-    print(roads_gdf.columns)  # Should include 'surface'
-    print(roads_gdf.head())   # Quick preview
-    return roads_gdf
+    """
+    Load a road layer as a GeoDataFrame. A fresh compiled layer skips parsing, but every
+    road's shapely geometry is still built here (O(roads)); use open_roads() for the
+    zero-copy mmap layer, or filter_roads(open_roads(path), ...) to build only a subset.
+    """
+    compiled = open_roads(path)
+    if compiled is not None:
+        return compiled.to_geodataframe()
+    return gpd.read_file(path)
+
+# --- Spatial Index ---
+class RoadIndex:
+    """
+    STRtree over road geometries, built once at load time.
+
+    Geometries are indexed in a local metric projection so buffers and distances are in
+    metres. Query results are row subsets of the original GeoDataFrame.
+    """
+
+    def __init__(self, roads_gdf):
+        self.roads = roads_gdf
+        self.projection = LocalProjection.from_bounds(*roads_gdf.total_bounds)
+        self._geoms = self.projection.project(np.asarray(roads_gdf.geometry.values))
+        self._tree = STRtree(self._geoms)
+        surfaces = roads_gdf["surface"].to_numpy() if "surface" in roads_gdf else np.full(len(roads_gdf), None)
+        self._by_surface = {
+            surface: np.flatnonzero(surfaces == surface) for surface in ("dirt", "paved")
+        }
+
+    def __len__(self):
+        return len(self.roads)
+
+    def _rows(self, positions):
+        return self.roads.iloc[np.sort(positions)]
+
+    def _point(self, lat, lon):
+        x, y = self.projection.forward(lon, lat)
+        return shapely.Point(float(x), float(y))
+
+    def filter(self, surface_type="both"):
+        """Same result as filter_roads, from precomputed per-surface row positions."""
+        if surface_type in self._by_surface:
+            return self._rows(self._by_surface[surface_type])
+        return self.roads
+
+    def roads_in_bbox(self, min_lon, min_lat, max_lon, max_lat):
+        """Roads whose geometry intersects the lon/lat bounding box."""
+        x0, y0 = self.projection.forward(min_lon, min_lat)
+        x1, y1 = self.projection.forward(max_lon, max_lat)
+        return self._rows(self._tree.query(shapely.box(x0, y0, x1, y1), predicate="intersects"))
+
+    def nearest_road(self, lat, lon, max_distance_m=None):
+        """
+        Closest road to a (lat, lon) point.
+        Returns:
+            (pd.Series, float) | (None, None): road row and distance in metres
+        """
+        positions, distances = self._tree.query_nearest(
+            self._point(lat, lon), max_distance=max_distance_m, return_distance=True, all_matches=False
+        )
+        if len(positions) == 0:
+            return None, None
+        return self.roads.iloc[int(positions[0])], float(distances[0])
+
+    def roads_along(self, route_polyline, buffer_m=25):
+        """
+        Roads within buffer_m metres of a route.
+        Args:
+            route_polyline (list[tuple]): Route as (lat, lon) points
+            buffer_m (float): Search radius around the route in metres
+        """
+        coords = np.asarray(route_polyline, dtype=np.float64).reshape(-1, 2)
+        if len(coords) == 0:
+            return self.roads.iloc[[]]
+        x, y = self.projection.forward(coords[:, 1], coords[:, 0])
+        route = shapely.LineString(np.column_stack([x, y])) if len(coords) > 1 else shapely.Point(x[0], y[0])
+        return self._rows(self._tree.query(route, predicate="dwithin", distance=buffer_m))
+
+def load_road_index(path="data/roads.geojson"):
+    return RoadIndex(load_roads(path))
 
 # --- Road Type Filtering ---
 def filter_roads(roads_gdf, surface_type="both"):
+    if isinstance(roads_gdf, RoadIndex):
+        return roads_gdf.filter(surface_type)
+    if isinstance(roads_gdf, CompiledRoads):
+        if surface_type in ("dirt", "paved"):
+            return roads_gdf.to_geodataframe(roads_gdf.rows_with_surface(surface_type))
+        return roads_gdf.to_geodataframe()
     if surface_type == "dirt":
         return roads_gdf[roads_gdf["surface"] == "dirt"]
     elif surface_type == "paved":
@@ -21,30 +123,43 @@ def filter_roads(roads_gdf, surface_type="both"):
 
 # --- Folium Map Rendering ---
 def add_roads_to_map(map_obj, roads_gdf):
-    surface_colors = {
-        "dirt": "brown",
-        "paved": "gray"
-    }
-    for _, row in roads_gdf.iterrows():
-        coords = [(pt[1], pt[0]) for pt in row.geometry.coords]  # Convert (lon, lat) to (lat, lon)
-        color = surface_colors.get(row["surface"], "blue")
-        folium.PolyLine(coords, color=color, weight=3).add_to(map_obj)
-
-def render_folium_map(surface_type="both"):
+    # One multi-line per surface colour instead of one PolyLine per road
+    for color, paths in surface_polylines(roads_gdf).items():
+        if paths:
+            folium.PolyLine(paths, color=color, weight=3).add_to(map_obj)
+
+def render_folium_map(surface_type="both", viewport=None, zoom=15):
+    """
+    Args:
+        viewport (tuple, optional): (min_lon, min_lat, max_lon, max_lat); only roads inside
+            it are written, simplified for zoom
+    """
     roads = load_roads()
     filtered = filter_roads(roads, surface_type)
-    fmap = folium.Map(location=[33.833, -117.19], zoom_start=15)
+    if viewport is not None:
+        filtered = RoadTiles(filtered).roads_in_view(*viewport, zoom)
+    fmap = folium.Map(location=[33.833, -117.19], zoom_start=zoom)
     add_roads_to_map(fmap, filtered)
     fmap.save("map.html")
 
 # --- Pydeck Layer Rendering with Hazard Coloring ---
-def draw_roads_layer(filtered_roads_gdf):
+def draw_roads_layer(filtered_roads_gdf, viewport=None, zoom=12, tiles=None):
+    """
+    Args:
+        viewport (tuple, optional): (min_lon, min_lat, max_lon, max_lat); only roads inside
+            it are sent, simplified for zoom. Without it the whole layer is serialized.
+        tiles (RoadTiles, optional): Prebuilt LOD index for filtered_roads_gdf, reused across calls
+    """
     if filtered_roads_gdf.empty:
         return None
+    if viewport is not None:
+        data = (tiles or RoadTiles(filtered_roads_gdf)).geojson(*viewport, zoom)
+    else:
+        data = filtered_roads_gdf.__geo_interface__
 
     layer = pdk.Layer(
         "GeoJsonLayer",
-        data=filtered_roads_gdf.__geo_interface__,
+        data=data,
         get_line_color="""
             d => {
                 const score = d.properties.hazard_score || 0;
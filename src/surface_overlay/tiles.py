@@ -0,0 +1,116 @@
+# surface_overlay/tiles.py
+
+import math
+
+import numpy as np
+import shapely
+
+from pavepath.utils.geometry import linestring_arrays
+from pavepath.utils.projection import LocalProjection
+
+# Zoom levels with a precomputed simplified copy of the layer; other zooms use the
+# closest level at or below them
+LOD_ZOOMS = (6, 9, 12, 15)
+TILE_SIZE_PX = 256
+# Web-mercator ground resolution at zoom 0 on the equator, metres per pixel
+_EQUATOR_M_PER_PX = 156_543.03392
+DEFAULT_PROPERTIES = ("name", "surface", "hazard_score")
+
+def tolerance_m(zoom, lat=0.0):
+    """Douglas-Peucker tolerance for a zoom level: half a screen pixel on the ground."""
+    return 0.5 * _EQUATOR_M_PER_PX * math.cos(math.radians(lat)) / 2 ** zoom
+
+def coordinate_digits(zoom):
+    """Decimal places that keep coordinates within half a pixel at this zoom."""
+    half_px_deg = 360.0 / (TILE_SIZE_PX * 2 ** zoom) / 2
+    return min(7, max(1, math.ceil(-math.log10(half_px_deg))))
+
+def tile_bounds(z, x, y):
+    """XYZ (slippy map) tile -> (min_lon, min_lat, max_lon, max_lat)."""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+class RoadTiles:
+    """
+    Level-of-detail road overlay served by viewport.
+
+    At construction every road is split into parts, indexed in an STRtree (metres) and
+    simplified once per LOD_ZOOMS level; parts shorter than a pixel are dropped at that
+    level. A viewport query then only touches roads it intersects and returns geometry
+    already simplified for the requested zoom.
+    """
+
+    def __init__(self, roads_gdf, zooms=LOD_ZOOMS, properties=DEFAULT_PROPERTIES):
+        self.roads = roads_gdf
+        self.zooms = tuple(sorted(zooms))
+        parts = roads_gdf.geometry.reset_index(drop=True).explode(index_parts=False)
+        parts = parts[shapely.get_type_id(parts.values) == 1]  # LineStrings only
+        self._row = parts.index.to_numpy()
+        self.projection = LocalProjection.from_bounds(*roads_gdf.total_bounds)
+        projected = self.projection.project(np.asarray(parts.values))
+        self._tree = shapely.STRtree(projected)
+
+        self._levels = {}
+        for zoom in self.zooms:
+            tol = tolerance_m(zoom, self.projection.lat0)
+            simplified = shapely.simplify(projected, tol, preserve_topology=False)
+            visible = shapely.length(simplified) >= tol
+            self._levels[zoom] = (self.projection.unproject(simplified), visible)
+
+        self.properties = [p for p in properties if p in roads_gdf]
+        self._columns = {
+            p: [None if v is None or v != v else v for v in roads_gdf[p].tolist()]  # NaN -> None
+            for p in self.properties
+        }
+
+    def __len__(self):
+        return len(self._row)
+
+    def level(self, zoom):
+        """Precomputed LOD zoom used for a requested zoom."""
+        below = [z for z in self.zooms if z <= zoom]
+        return below[-1] if below else self.zooms[0]
+
+    def query(self, min_lon, min_lat, max_lon, max_lat, zoom):
+        """
+        Roads intersecting a viewport at a zoom level.
+        Returns:
+            tuple[np.ndarray, np.ndarray]: source row per road part and its simplified
+                (lon, lat) geometry
+        """
+        x0, y0 = self.projection.forward(min_lon, min_lat)
+        x1, y1 = self.projection.forward(max_lon, max_lat)
+        positions = np.sort(self._tree.query(shapely.box(x0, y0, x1, y1), predicate="intersects"))
+        geoms, visible = self._levels[self.level(zoom)]
+        positions = positions[visible[positions]]
+        return self._row[positions], geoms[positions]
+
+    def roads_in_view(self, min_lon, min_lat, max_lon, max_lat, zoom):
+        """Viewport query as a GeoDataFrame: one row per road part, simplified geometry."""
+        rows, geoms = self.query(min_lon, min_lat, max_lon, max_lat, zoom)
+        return self.roads.iloc[rows].set_geometry(geoms, crs=self.roads.crs)
+
+    def geojson(self, min_lon, min_lat, max_lon, max_lat, zoom):
+        """Viewport query as a GeoJSON FeatureCollection dict with coordinates rounded for the zoom."""
+        rows, geoms = self.query(min_lon, min_lat, max_lon, max_lat, zoom)
+        coords, offsets = linestring_arrays(geoms)
+        flat = np.round(coords, coordinate_digits(zoom)).tolist()
+        bounds = offsets.tolist()
+        columns = self._columns
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": flat[a:b]},
+                "properties": {p: columns[p][row] for p in self.properties},
+            }
+            for row, a, b in zip(rows.tolist(), bounds[:-1], bounds[1:])
+        ]
+        return {"type": "FeatureCollection", "features": features}
+
+    def tile(self, z, x, y):
+        """One XYZ tile as GeoJSON (roads crossing the tile edge are included whole)."""
+        return self.geojson(*tile_bounds(z, x, y), z)
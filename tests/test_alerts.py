@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from pavepath.core.alerts import check_for_dirt_road, generate_alert
+
+
+def test_legacy_id_lists_still_work():
+    assert check_for_dirt_road(["a", "b"], ["x", "b"])
+    assert not check_for_dirt_road([{"id": 1}], [{"id": 2}])
+    alert = generate_alert(["a", "b", "c", "d"], ["b"])
+    assert alert["segments"] == [1] and alert["dirt_fraction"] == 0.25
+    assert generate_alert(["a"], [])["message"] is None
+
+
+def test_dirt_road_index_ids_and_snap_fallback():
+    gpd = pytest.importorskip("geopandas")
+    from shapely.geometry import LineString
+
+    from pavepath.core.alerts import DirtRoadIndex
+    from pavepath.core.monitor import RerouteMonitor
+    from pavepath.core.segments import SegmentTable
+
+    roads = gpd.GeoDataFrame(
+        {"surface": ["dirt", "paved"]},
+        geometry=[LineString([(-117.190, 33.830), (-117.189, 33.830), (-117.188, 33.830)]),
+                  LineString([(-117.188, 33.830), (-117.180, 33.830)])],
+        crs="EPSG:4326",
+    )
+    index = DirtRoadIndex(roads)
+    assert len(index) == 2
+
+    # Exact road vertices (reversed), a straight leg along the dirt road, then the paved road
+    route = SegmentTable(
+        [(33.830, -117.188), (33.83005, -117.1899), (33.830, -117.188)],
+        [(33.830, -117.189), (33.83005, -117.1881), (33.830, -117.180)],
+        [0, 0, 0], [0.09, 0.17, 0.74], [0, 0, 0],
+    )
+    assert index.route_mask(route).tolist() == [True, True, False]
+    alert = generate_alert(route, index)
+    assert alert["segments"] == [0, 1] and alert["dirt_fraction"] == pytest.approx(0.259, abs=1e-3)
+
+    monitor = RerouteMonitor(lookahead=3, dirt_index=index)
+    monitor.register_route("jeep", [(33.830, -117.192), (33.830, -117.190), (33.830, -117.188)])
+    assert [(a["type"], a["segment"]) for a in monitor.ping("jeep", 33.830, -117.1915)] == [("dirt_ahead", 1)]
+
+
+def test_dirt_road_snap_distance_is_metric_at_any_latitude():
+    gpd = pytest.importorskip("geopandas")
+    from shapely.geometry import LineString
+
+    from pavepath.core.alerts import DirtRoadIndex
+
+    roads = gpd.GeoDataFrame(
+        {"surface": ["dirt", "dirt"]},
+        geometry=[LineString([(-122.9, 49.0), (-122.9, 49.01)]), LineString([(-81.8, 25.0), (-81.8, 25.01)])],
+        crs="EPSG:4326",
+    )
+    index = DirtRoadIndex(roads, snap_m=15)
+    east = 1 / (111_320 * 0.656059)  # degrees of longitude per metre at 49°N
+    points = [(49.005, -122.9 + 13.5 * east), (49.005, -122.9 + 16.5 * east)]
+    assert index._snaps(np.asarray(points)).tolist() == [True, False]
+
+
+def test_dirt_fraction_counts_segments_shorter_than_the_rounding():
+    gpd = pytest.importorskip("geopandas")
+    from shapely.geometry import LineString
+
+    from pavepath.core.alerts import DirtRoadIndex
+    from pavepath.core.segments import SegmentTable
+    from pavepath.route_optimizer import haversine_many
+
+    step = 4e-5  # ~3.7 m of longitude: distance_km rounds to 0.0
+    dirt_road = [(-117.190 + i * step, 33.830) for i in range(3)]
+    roads = gpd.GeoDataFrame({"surface": ["dirt"]}, geometry=[LineString(dirt_road)], crs="EPSG:4326")
+    stops = [(lat, lon) for lon, lat in dirt_road] + [(33.830, -117.189)]
+    route = SegmentTable(stops[:-1], stops[1:], [0, 0, 0], [0.0, 0.0, 0.09], [0, 0, 0])
+    lengths = haversine_many(stops[:-1], stops[1:])
+    alert = generate_alert(route, DirtRoadIndex(roads))
+    assert alert["segments"] == [0, 1]
+    assert alert["dirt_fraction"] == pytest.approx(lengths[:2].sum() / lengths.sum())
@@ -0,0 +1,42 @@
+import json
+
+import numpy as np
+
+from benchmarks import generators, suite
+from benchmarks.runner import compare_results, main, time_callable
+
+def _result(name, size, *samples):
+    return {"name": name, "size": size, "min_s": min(samples), "median_s": float(np.median(samples)),
+            "samples": list(samples)}
+
+def test_generators_are_seeded():
+    assert generators.stop_set(50, seed=3) == generators.stop_set(50, seed=3)
+    assert generators.stop_set(50, seed=3) != generators.stop_set(50, seed=4)
+    hazards, surface_data = generators.hazard_set(400, seed=1)
+    assert len(hazards) == 400 and len(surface_data) == 20
+    assert {h["location"] for h in hazards} <= set(surface_data)
+
+def test_compare_flags_only_separated_slowdowns():
+    baseline = [_result("a", 100, 1.0, 1.1, 1.2), _result("b", 100, 1.0, 1.5, 2.0), _result("c", 100, 1.0, 1.0)]
+    current = [
+        _result("a", 100, 1.5, 1.6, 1.7),   # 1.5x and no overlap
+        _result("b", 100, 1.4, 1.5, 1.6),   # 1.4x but inside the noisy baseline's spread
+        _result("c", 100, 0.5, 0.5),
+        _result("d", 100, 1.0),
+    ]
+    status = {row["name"]: row["status"] for row in compare_results(current, baseline, tolerance=0.25)}
+    assert status == {"a": "regression", "b": "ok", "c": "improvement", "d": "new"}
+
+def test_time_callable_and_cli_roundtrip(tmp_path):
+    stats = time_callable(lambda: sum(range(100)), repeat=3, min_time_s=0.001)
+    assert stats["repeat"] == len(stats["samples"]) == 3
+    assert stats["min_s"] <= stats["median_s"]
+
+    output, baseline = tmp_path / "latest.json", tmp_path / "baseline.json"
+    args = ["-k", "haversine_many", "--sizes", "1e2", "--repeat", "2", "--min-time", "0",
+            "-o", str(output), "--baseline", str(baseline)]
+    assert main(args + ["--save-baseline"]) == 0
+    saved = json.loads(baseline.read_text())
+    assert [(r["name"], r["size"]) for r in saved["results"]] == [("route_optimizer.haversine_many", 100)]
+    assert [c.name for c in suite.select("haversine_many")] == ["route_optimizer.haversine_many"]
+    assert main(args + ["--tolerance", "1000"]) == 0
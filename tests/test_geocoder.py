@@ -0,0 +1,127 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from pavepath.utils import geocoder
+from pavepath.utils.geocode_cache import GeocodeCache
+
+
+class FakeResponse:
+    status_code = 200
+    url = "stub"
+    text = ""
+
+    def __init__(self, results):
+        self._results = results
+
+    def json(self):
+        return {"results": self._results}
+
+
+@pytest.fixture
+def fake_get(monkeypatch):
+    calls = []
+
+    def _get(url, params, timeout):
+        calls.append(params["q"])
+        if params["q"] == "Nowhere":
+            return FakeResponse([])
+        return FakeResponse([{"geometry": {"lat": 33.83, "lng": -117.91}}])
+
+    class FakeSession:
+        get = staticmethod(_get)
+
+    monkeypatch.setattr(geocoder, "get_session", lambda: FakeSession)
+    return calls
+
+
+def test_repeat_queries_hit_cache(fake_get):
+    cache = GeocodeCache()
+    assert geocoder.geocode_location("Anaheim, CA", "key", cache=cache) == (33.83, -117.91)
+    assert geocoder.geocode_location("  anaheim,  CA ", "key", cache=cache) == (33.83, -117.91)
+    assert geocoder.geocode_location("Nowhere", "key", cache=cache) == (None, None)
+    assert geocoder.geocode_location("Nowhere", "key", cache=cache) == (None, None)
+    assert fake_get == ["Anaheim, CA", "Nowhere"]
+    assert cache.stats["hits"] == 2 and cache.stats["negative_hits"] == 1
+
+
+def test_cache_ttl_lru_and_disk(tmp_path):
+    now = [1000.0]
+    path = str(tmp_path / "geocode.sqlite")
+    cache = GeocodeCache(path=path, ttl_s=60, negative_ttl_s=10, max_memory_entries=2, clock=lambda: now[0])
+    cache.set("A", (1.0, 2.0))
+    cache.set("B", (3.0, 4.0))
+    cache.set("C", None)
+    assert len(cache) == 2 and cache.stats["evictions"] == 1
+
+    # Evicted from memory but still on disk
+    assert cache.get("A") == (1.0, 2.0)
+    assert cache.stats["disk_hits"] == 1
+
+    now[0] += 30
+    assert cache.get("C") is None  # negative entry expired
+    assert GeocodeCache(path=path, clock=lambda: now[0]).get("B") == (3.0, 4.0)
+    now[0] += 60
+    assert cache.get("B") is None
+
+
+LATITUDES = {"Anaheim": 33.84, "Menifee": 33.73, "Busy": 34.1}
+
+
+@pytest.fixture
+def stub_server():
+    seen = []
+    throttled = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            q = parse_qs(urlparse(self.path).query)["q"][0]
+            seen.append(q)
+            if q == "Busy" and q not in throttled:
+                throttled.add(q)
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            results = [] if q == "Nowhere" else [{"geometry": {"lat": LATITUDES[q], "lng": -117.0}}]
+            body = json.dumps({"results": results}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/geocode", seen
+    server.shutdown()
+
+
+def test_geocode_many_dedupes_and_keeps_order(stub_server):
+    url, seen = stub_server
+    queries = ["Anaheim", "Menifee", "anaheim", "Nowhere", "Busy", "Menifee"]
+    results = geocoder.geocode_many(queries, "key", max_concurrency=4, cache=GeocodeCache(), url=url)
+    assert results == [(33.84, -117.0), (33.73, -117.0), (33.84, -117.0), (None, None), (34.1, -117.0),
+                       (33.73, -117.0)]
+    assert sorted(seen) == ["Anaheim", "Busy", "Busy", "Menifee", "Nowhere"]
+
+
+def test_session_pool_grows_on_demand(monkeypatch):
+    monkeypatch.setattr(geocoder, "_session", None)
+    monkeypatch.setattr(geocoder, "_session_pool_size", 0)
+    session = geocoder.get_session(4)
+    assert session.get_adapter("https://x")._pool_maxsize == 4
+    assert geocoder.get_session(32) is session
+    assert session.get_adapter("https://x")._pool_maxsize == 32
+    geocoder.get_session(8)  # never shrinks
+    assert session.get_adapter("http://x")._pool_maxsize == 32
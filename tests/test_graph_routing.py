@@ -0,0 +1,145 @@
+import pytest
+
+gpd = pytest.importorskip("geopandas")
+from shapely.geometry import LineString
+
+from pavepath.core.routing import optimize_route
+from pavepath.routing.graph import RoadGraph
+
+
+@pytest.fixture
+def roads():
+    # A short dirt shortcut vs. a longer paved detour between the same corners
+    return gpd.GeoDataFrame(
+        {"surface": ["dirt", "paved", "paved"], "name": ["Shortcut", "Detour A", "Detour B"]},
+        geometry=[
+            LineString([(-117.20, 33.80), (-117.19, 33.80)]),
+            LineString([(-117.20, 33.80), (-117.20, 33.801), (-117.195, 33.801)]),
+            LineString([(-117.195, 33.801), (-117.19, 33.801), (-117.19, 33.80)]),
+        ],
+    )
+
+
+def test_graph_builds_shared_nodes(roads):
+    graph = RoadGraph.from_roads(roads)
+    assert len(graph) == 5
+    assert graph.edge_count == 2 * 5
+
+
+def test_graph_route_prefers_paved_detour(roads):
+    graph = RoadGraph.from_roads(roads)
+    result = optimize_route([(33.80, -117.20), (33.80, -117.19)], graph=graph)
+    assert len(result["path"]) == 5
+    assert result["segments"].total_distance_km() > 0.9
+
+    graph.set_hazards([0.0, 5.0, 5.0])
+    rerouted = graph.route((33.80, -117.20), (33.80, -117.19))
+    assert len(rerouted["path"]) == 2
+
+
+def _grid_roads(n=8, surfaces=("paved", "dirt", "gravel")):
+    lines, surface = [], []
+    for i in range(n):
+        lines.append(LineString([(-117.5 + j * 0.001, 33.5 + i * 0.001) for j in range(n)]))
+        lines.append(LineString([(-117.5 + i * 0.001, 33.5 + j * 0.001) for j in range(n)]))
+        surface += [surfaces[i % len(surfaces)], surfaces[(i + 1) % len(surfaces)]]
+    return gpd.GeoDataFrame({"surface": surface}, geometry=lines)
+
+
+def test_hierarchy_matches_astar_and_recustomizes(tmp_path):
+    from pavepath.routing.hierarchy import ContractionHierarchy, load_index
+
+    graph = RoadGraph.from_roads(_grid_roads())
+    ch = ContractionHierarchy.build(graph)
+    pairs = [(0, 63), (5, 40), (17, 17), (62, 1), (30, 33)]
+    for s, t in pairs:
+        cost, path = ch.shortest_path(s, t)
+        expected, _ = graph.shortest_path(s, t)
+        assert abs(cost - expected) < 1e-9
+        assert path[0] == s and path[-1] == t
+
+    index_path = tmp_path / "roads.geojson.ch.npz"
+    ch.save(index_path)
+    assert load_index("roads.geojson", graph, path=index_path) is not None
+
+    hazards = [float(i % 4) for i in range(len(graph.road_surfaces))]
+    graph.set_hazards(hazards)  # re-customizes the attached hierarchy
+    reference = RoadGraph.from_roads(_grid_roads())
+    reference.set_hazards(hazards)
+    for s, t in pairs:
+        assert abs(graph.shortest_path(s, t)[0] - reference.shortest_path(s, t)[0]) < 1e-9
+
+
+def test_cost_matrix_parallel_matches_serial():
+    import numpy as np
+    from pavepath.routing.matrix import cost_matrix
+
+    graph = RoadGraph.from_roads(_grid_roads(n=10))
+    rng = np.random.default_rng(3)
+    stops = np.column_stack([rng.uniform(33.5, 33.509, 20), rng.uniform(-117.5, -117.491, 20)])
+    serial = cost_matrix(stops, stops, graph=graph, max_workers=1)
+    parallel = cost_matrix(stops, stops, graph=graph, max_workers=2, chunk_size=3)
+    assert serial.shape == (20, 20)
+    assert np.allclose(serial, parallel)
+    assert np.allclose(np.diag(serial), 0)
+    source = graph.nearest_node(*stops[0])
+    target = graph.nearest_node(*stops[7])
+    assert abs(serial[0, 7] - graph.shortest_path(source, target)[0]) < 1e-9
+
+    straight = cost_matrix(stops[:3], stops[:4])
+    assert straight.shape == (3, 4)
+
+
+def test_saved_hierarchy_is_loaded_and_answers_cost_matrices(tmp_path):
+    import numpy as np
+    from pavepath.routing.hierarchy import build_index
+    from pavepath.routing.matrix import cost_matrix
+
+    road_path = tmp_path / "roads.geojson"
+    _grid_roads(n=10).set_crs("EPSG:4326").to_file(road_path, driver="GeoJSON")
+    plain = RoadGraph.from_file(road_path)
+    assert plain.hierarchy is None
+    build_index(road_path)
+    graph = RoadGraph.from_file(road_path)
+    assert graph.hierarchy is not None
+
+    rng = np.random.default_rng(5)
+    stops = np.column_stack([rng.uniform(33.5, 33.509, 12), rng.uniform(-117.5, -117.491, 12)])
+    expected = cost_matrix(stops, stops[:7], graph=plain, max_workers=1)
+    assert np.allclose(cost_matrix(stops, stops[:7], graph=graph), expected)
+    result = optimize_route([tuple(s) for s in stops[:5]], graph=graph)
+    assert sorted(result["optimized_route"]) == sorted(tuple(s) for s in stops[:5])
+
+
+def test_cost_matrix_reuses_its_pool_until_weights_change():
+    import numpy as np
+    from pavepath.routing import matrix
+
+    graph = RoadGraph.from_roads(_grid_roads(n=10))
+    rng = np.random.default_rng(4)
+    stops = np.column_stack([rng.uniform(33.5, 33.509, 16), rng.uniform(-117.5, -117.491, 16)])
+    first = matrix.cost_matrix(stops, stops, graph=graph, max_workers=2)
+    pool, spec = matrix._pool._executor, matrix._pool._current[3].spec
+    assert np.allclose(matrix.cost_matrix(stops, stops, graph=graph, max_workers=2), first)
+    assert matrix._pool._executor is pool and matrix._pool._current[3].spec == spec
+
+    graph.set_hazards([float(i % 3) for i in range(len(graph.road_surfaces))])
+    updated = matrix.cost_matrix(stops, stops, graph=graph, max_workers=2)
+    assert matrix._pool._executor is pool and matrix._pool._current[3].spec != spec
+    assert np.allclose(updated, matrix.cost_matrix(stops, stops, graph=graph, max_workers=1))
+    assert not np.allclose(updated, first)
+    matrix.shutdown_pool()
+
+
+def test_astar_matches_dijkstra_near_and_far():
+    import numpy as np
+    from pavepath.routing.matrix import _one_to_many
+
+    graph = RoadGraph.from_roads(_grid_roads(n=12))
+    graph.set_hazards([float(i % 5) for i in range(len(graph.road_surfaces))])
+    weights = graph.edge_weights("safe")
+    # Neighbouring pairs stay on the lazy heuristic; corner-to-corner switches to the array
+    for source, target in [(50, 51), (50, 63), (0, len(graph) - 1), (len(graph) - 1, 7)]:
+        expected = _one_to_many(graph.indptr, graph.indices, weights, source, np.array([target]))[0]
+        cost, path = graph.shortest_path(source, target)
+        assert abs(cost - expected) < 1e-9 and path[0] == source and path[-1] == target
@@ -0,0 +1,38 @@
+import numpy as np
+
+from pavepath.hazard_scoring import (
+    encode_hazards,
+    score_hazard_columns,
+    score_hazards,
+    surface_adjustment_table,
+)
+
+
+def test_score_hazards_surface_adjustments():
+    hazards = [
+        {"location": "A", "type": "unpaved", "severity": 2},
+        {"location": "B", "type": "flood", "severity": 5},
+        {"location": "C", "type": "unpaved", "severity": 1},
+        {"location": "D", "type": "flood"},
+    ]
+    surface_data = {"A": "gravel", "B": "asphalt", "C": "paved"}
+    scored = score_hazards(hazards, surface_data)
+    assert [h["score"] for h in scored] == [3, 5, 1, 1]
+    assert scored[0]["type"] == "unpaved"
+
+
+def test_score_hazard_columns_matches_dict_api():
+    rng = np.random.default_rng(0)
+    hazards = [
+        {"location": f"L{i % 50}", "type": "flood", "severity": int(s)}
+        for i, s in enumerate(rng.integers(0, 6, 1000))
+    ]
+    surface_data = {f"L{i}": ("gravel", "paved", "dirt")[i % 3] for i in range(50)}
+    columns = encode_hazards(hazards)
+    scores = score_hazard_columns(
+        columns.severity, columns.location_codes, surface_adjustment_table(columns.locations, surface_data)
+    )
+    adjust = {"gravel": 1, "paved": -1}
+    expected = [max(h["severity"] + adjust.get(surface_data[h["location"]], 0), 1) for h in hazards]
+    assert scores.tolist() == expected
+    assert scores.min() >= 1
@@ -8,3 +8,51 @@ def test_analyze_route_returns_expected_structure():
     result = analyze_route(dummy_route)
     assert isinstance(result, dict)
     assert "hazards" in result
+
+def test_analyze_route_matches_staged_pipeline():
+    from pavepath.hazard_rules import should_reroute
+    from pavepath.hazard_scoring import score_hazards
+    from pavepath.hazard_sources.osm_loader import load_osm_hazards
+
+    route = [
+        {"location": "A", "surface": "gravel"},
+        {"location": "B", "flood_risk": True},
+        {"location": "C", "surface": "paved"},
+    ]
+    surface_data = {"A": "gravel", "C": "paved"}
+    staged = score_hazards(load_osm_hazards(route), surface_data)
+
+    result = analyze_route({"segments": route}, surface_data)
+    assert result["hazards"] == staged
+    assert result["should_reroute"] == should_reroute(staged) is True
+    assert [s["score"] for s in result["segment_scores"]] == [3, 5, 0]
+    assert set(result["timings"]) == {"extract_s", "score_s", "evaluate_s", "total_s"}
+
+def test_analyze_route_reroute_only_short_circuits():
+    route = [{"location": "A"}, {"location": "B", "flood_risk": True}, {"location": "C", "flood_risk": True}]
+    result = analyze_route(route, risk_threshold=5, reroute_only=True)
+    assert result["should_reroute"] is True
+    assert len(result["segment_scores"]) == 2
+
+def test_incremental_analyzer_recomputes_only_changes():
+    from pavepath.hazard_service import IncrementalRouteAnalyzer
+
+    route = [{"id": i, "location": f"L{i}", "surface": "paved"} for i in range(100)]
+    analyzer = IncrementalRouteAnalyzer(route, risk_threshold=5)
+    assert analyzer.total_score == 0 and not analyzer.should_reroute
+
+    route[10] = {"id": 10, "location": "L10", "flood_risk": True}
+    assert analyzer.update_segments(route) == [10]
+    assert analyzer.max_score == 5 and analyzer.should_reroute
+
+    route[20] = {"id": 20, "location": "L20", "surface": "unpaved"}
+    analyzer.update_segments([route[20]])
+    assert analyzer.update_surface({"L20": "gravel"}) == [20]
+    assert analyzer.segment_score(20) == 3
+
+    full = analyze_route(route, analyzer.surface_data, risk_threshold=5)
+    assert analyzer.total_score == sum(h["score"] for h in full["hazards"]) == 8
+    assert analyzer.should_reroute == full["should_reroute"]
+
+    analyzer.remove_segments([10])
+    assert analyzer.max_score == 3 and not analyzer.should_reroute
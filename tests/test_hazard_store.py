@@ -0,0 +1,176 @@
+import pytest
+from shapely.geometry import Polygon
+
+from pavepath.hazard_store import HazardStore
+from pavepath.routing.annotate import annotate_route_spatially
+from pavepath.utils.polyline_tools import encode_polyline
+
+
+def _store():
+    return HazardStore([
+        {"id": "crash", "type": "crash", "severity": 4, "lat": 33.8300, "lon": -117.1905},
+        {"id": "flood", "type": "flood", "severity": 5,
+         "geometry": Polygon([(-117.182, 33.829), (-117.181, 33.829), (-117.181, 33.831), (-117.182, 33.831)])},
+        {"id": "far", "type": "closure", "severity": 3, "lat": 34.5, "lon": -118.0},
+    ])
+
+
+def test_hazards_along_route_segments():
+    store = _store()
+    route = [(33.8301, -117.195), (33.8301, -117.185), (33.8301, -117.175)]
+    along = store.hazards_along(route, buffer_m=30)
+    assert [[h["id"] for h in hazards] for hazards in along] == [["crash"], ["flood"]]
+    assert store.hazards_along(route, buffer_m=1)[0] == []
+    assert [h["id"] for h in store.near(34.5001, -118.0, radius_m=50)] == ["far"]
+
+
+def test_remove_rebuilds_index_and_annotate_steps():
+    store = _store()
+    store.remove([0])
+    assert len(store) == 2
+    steps = [
+        {"polyline": {"points": encode_polyline([(33.8301, -117.195), (33.8301, -117.185)])}},
+        {"start_location": {"lat": 33.8301, "lng": -117.185}, "end_location": {"lat": 33.8301, "lng": -117.175}},
+    ]
+    annotate_route_spatially(steps, store, buffer_m=30)
+    assert steps[0]["hazards"] == [] and steps[0]["hazard_score"] == 0
+    assert [h["id"] for h in steps[1]["hazards"]] == ["flood"] and steps[1]["hazard_score"] == 5
+
+
+def test_apply_updates_coalesces_by_key_and_advances_epoch():
+    store = HazardStore()
+    assert store.apply_updates([
+        {"id": "w1", "type": "flood", "severity": 2, "lat": 33.83, "lon": -117.19},
+        {"id": "w1", "type": "flood", "severity": 5, "lat": 33.83, "lon": -117.19},
+        {"type": "crash", "severity": 3, "lat": 33.84, "lon": -117.18},
+    ]) == 1
+    assert len(store) == 2 and store.get("w1")["severity"] == 5
+    assert store.apply_updates([{"id": "w1", "deleted": True}]) == 2
+    assert len(store) == 1 and store.near(33.83, -117.19) == []
+
+
+def test_feed_ingests_jsonl_and_socket_producers(tmp_path):
+    import asyncio
+    import json
+
+    from pavepath.hazard_sources.feed import HazardFeed
+
+    feed_path = tmp_path / "feed.jsonl"
+    events = [{"id": f"h{i % 50}", "type": "traffic", "severity": i % 5 + 1, "lat": 33.8 + (i % 50) * 1e-3,
+               "lon": -117.2, "ts": i} for i in range(500)]
+    feed_path.write_text("\n".join(json.dumps(e) for e in events) + "\nnot json\n")
+    epochs = []
+
+    async def scenario():
+        feed = HazardFeed(queue_size=16, batch_size=100, flush_interval_s=0.01,
+                          listeners=[lambda epoch, updates: epochs.append((epoch, len(updates)))])
+        consumer = feed.start()
+        server = await feed.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+
+        async def socket_producer():
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b'{"id": "closure", "type": "closure", "severity": 4, "lat": 33.9, "lon": -117.3}\n')
+            await writer.drain()
+            writer.close()
+
+        await asyncio.gather(feed.produce_jsonl(feed_path), socket_producer())
+        while feed.stats["received"] < 501:
+            await asyncio.sleep(0.01)
+        server.close()
+        await feed.stop(consumer)
+        return feed
+
+    feed = asyncio.run(scenario())
+    assert feed.stats["rejected"] == 1 and feed.stats["received"] == 501
+    assert len(feed.store) == 51
+    assert feed.store.get("h7")["ts"] == 457  # last update per key wins
+    assert [e for e, _ in epochs] == list(range(1, len(epochs) + 1))
+    assert sum(n for _, n in epochs) == feed.stats["applied"] < 501
+
+
+def test_preloaded_hazards_are_upserted_and_deleted_by_key():
+    store = _store()
+    store.apply_updates([{"id": "crash", "type": "crash", "severity": 5, "lat": 33.8300, "lon": -117.1905}])
+    assert len(store) == 3
+    assert [h["severity"] for h in store.near(33.8300, -117.1905, radius_m=5)] == [5]
+    store.apply_updates([{"id": "crash", "deleted": True}])
+    assert len(store) == 2 and store.get("crash") is None
+    assert store.near(33.8300, -117.1905, radius_m=5) == []
+    # Keyless polygons of the same type stay distinct
+    square = [(0, 0), (0, 1e-3), (1e-3, 1e-3), (1e-3, 0)]
+    store.add([{"type": "flood", "geometry": Polygon(square)},
+               {"type": "flood", "geometry": Polygon([(x + 1, y) for x, y in square])}])
+    assert len(store) == 4
+
+
+def test_feed_survives_malformed_events():
+    import asyncio
+
+    from pavepath.hazard_sources.feed import HazardFeed
+
+    feed = HazardFeed(queue_size=2, batch_size=10, flush_interval_s=0.01)
+    events = [
+        {"id": "bad", "lat": "abc", "lon": 1},
+        {"id": "nan", "lat": float("nan"), "lon": 1},
+        {"id": "mixed-ts", "type": "crash", "lat": 33.8, "lon": -117.2, "ts": "soon"},
+        {"id": "shape", "type": "flood", "geometry": {"type": "Polygon", "coordinates": [[1, 2]]}},
+        {"id": "ok", "type": "crash", "lat": "33.81", "lon": -117.2, "ts": "5"},
+        {"id": "ok", "type": "crash", "lat": 33.81, "lon": -117.2, "ts": 4},
+    ]
+
+    async def produce():
+        for event in events:
+            await feed.submit(event)
+
+    asyncio.run(feed.run(produce()))
+    assert feed.stats["rejected"] == 4 and feed.stats["stale"] == 1
+    assert len(feed.store) == 1 and feed.store.get("ok")["ts"] == 5.0
+    # A bad event that slips past validation is dropped without stopping the consumer
+    feed.flush({"a": {"id": "a", "lat": 1.0, "lon": 2.0}, "b": {"id": "b", "geometry": "not a geometry"}})
+    assert feed.stats["dropped"] == 1 and feed.store.get("a") is not None
+
+
+def test_buffers_stay_metric_across_a_national_extent():
+    # One store from Key West to the Canadian border: a single projection centred near
+    # 37°N would stretch east-west distances by ~22% at 49°N and shrink them by ~12% at 25°N
+    north_lon, south_lon = -122.9, -81.8
+    store = HazardStore([
+        {"id": "north", "lat": 49.0005, "lon": north_lon + 40 / (111_320 * 0.656059)},  # 40 m east
+        {"id": "south", "lat": 25.0005, "lon": south_lon + 40 / (111_320 * 0.906308)},
+    ])
+    north_route = [(49.0, north_lon), (49.001, north_lon)]
+    south_route = [(25.0, south_lon), (25.001, south_lon)]
+    assert [h["id"] for h in store.hazards_along(north_route, buffer_m=45)[0]] == ["north"]
+    assert store.hazards_along(north_route, buffer_m=35)[0] == []
+    assert [h["id"] for h in store.hazards_along(south_route, buffer_m=42)[0]] == ["south"]
+    assert store.hazards_along(south_route, buffer_m=38)[0] == []
+
+
+def test_feed_invalidates_cached_routes():
+    import asyncio
+
+    from pavepath.core.routing import RouteCache, optimize_route
+    from pavepath.hazard_sources.feed import HazardFeed
+
+    cache = RouteCache()
+    stops = [(33.81, -117.91), (33.83, -117.90)]
+    optimize_route(stops, "safe", cache=cache)
+    assert cache.get(stops, "safe") is not None
+    feed = HazardFeed(batch_size=10, flush_interval_s=0.01, listeners=[cache.on_hazard_update])
+
+    async def produce():
+        await feed.submit({"id": "crash", "type": "crash", "severity": 4, "lat": 33.82, "lon": -117.905})
+
+    asyncio.run(feed.run(produce()))
+    assert feed.store.epoch == cache.epoch == 1
+    assert cache.get(stops, "safe") is None
+
+
+@pytest.mark.filterwarnings("error")
+def test_point_and_zero_length_queries_do_not_warn():
+    store = _store()
+    assert [h["id"] for h in store.near(33.83002, -117.1905, radius_m=5)] == ["crash"]  # ~2 m away
+    # A repeated vertex makes a zero-length segment
+    along = store.hazards_along([(33.83002, -117.1905), (33.83002, -117.1905), (33.8301, -117.195)], buffer_m=5)
+    assert [[h["id"] for h in hazards] for hazards in along] == [["crash"], ["crash"]]
@@ -21,3 +21,32 @@ def test_invalid_input():
         assert False
     except ValueError:
         assert True
+
+def test_iter_route_features_matches_full_parse(tmp_path):
+    import json
+    from pavepath.input_parser import iter_route_features, parse_geojson_file
+    geojson = {
+        "type": "FeatureCollection",
+        "crs": {"type": "name", "properties": {"name": "EPSG:4326"}},
+        "features": [
+            {"type": "Feature", "properties": {"name": f"Road {i}", "surface": "dirt", "flood_risk": i % 2 == 0},
+             "geometry": {"type": "LineString", "coordinates": [[-117.1 - i, 33.8], [-117.2, 33.9]]}}
+            for i in range(25)
+        ],
+        "bbox": [-142.2, 33.8, -117.1, 33.9],
+    }
+    path = tmp_path / "roads.geojson"
+    path.write_text(json.dumps(geojson, indent=2))
+
+    # Tiny reads force features to straddle refill boundaries
+    streamed = list(iter_route_features(path, read_size=7))
+    assert streamed == parse_geojson_file(path)
+
+    batches = list(iter_route_features(path, chunk_size=10))
+    assert [len(b) for b in batches] == [10, 10, 5]
+
+def test_iter_route_features_empty_collection(tmp_path):
+    from pavepath.input_parser import iter_route_features
+    path = tmp_path / "empty.geojson"
+    path.write_text('{"type": "FeatureCollection", "features": []}')
+    assert list(iter_route_features(path)) == []
@@ -0,0 +1,83 @@
+import numpy as np
+
+from pavepath.core.monitor import RerouteMonitor
+from pavepath.hazard_store import HazardStore
+
+# A straight 20-segment route heading east, ~90 m per segment
+ROUTE = [(33.83, -117.20 + i * 0.001) for i in range(21)]
+
+
+def _drive(monitor, vehicle, points):
+    alerts = []
+    for lat, lon in points:
+        alerts.extend(monitor.ping(vehicle, lat, lon))
+    return alerts
+
+
+def test_lookahead_alerts_fire_once_per_segment():
+    scores = np.zeros(20)
+    scores[9] = 6
+    dirt = np.zeros(20, dtype=bool)
+    dirt[15] = True
+    monitor = RerouteMonitor(risk_threshold=4, lookahead=3)
+    monitor.register_route("truck-1", ROUTE, scores=scores, dirt=dirt)
+
+    alerts = _drive(monitor, "truck-1", [(33.83001, lon + 0.0005) for _, lon in ROUTE[:-1]])
+    kinds = [(a["type"], a["segment"]) for a in alerts]
+    assert kinds == [("hazard_ahead", 9), ("dirt_ahead", 15)]
+    assert 0 < alerts[0]["distance_m"] < 3 * 95 and alerts[0]["options"] == ["Proceed", "Reroute"]
+
+    assert _drive(monitor, "truck-1", [ROUTE[-1]])[0]["type"] == "arrived"
+    assert "truck-1" not in monitor
+
+
+def test_off_route_skip_ahead_and_hazard_store():
+    store = HazardStore([{"type": "flood", "severity": 5, "lat": 33.8301, "lon": -117.1855}])
+    monitor = RerouteMonitor(lookahead=2, hazard_store=store, buffer_m=30)
+    monitor.register_route("van", ROUTE)
+
+    assert _drive(monitor, "van", [(33.84, -117.199)])[0]["type"] == "off_route"
+    assert _drive(monitor, "van", [(33.845, -117.199)]) == []   # reported once
+    alerts = _drive(monitor, "van", [(33.83, -117.1865)])       # back on route, 13 segments later
+    assert [(a["type"], a["segment"]) for a in alerts] == [("hazard_ahead", 14)]
+    assert monitor.stats["rescans"] >= 1
+
+
+def test_refresh_hazards_after_store_update():
+    store = HazardStore()
+    monitor = RerouteMonitor(lookahead=20, hazard_store=store, buffer_m=30)
+    monitor.register_route("bus", ROUTE)
+    assert _drive(monitor, "bus", [(33.83, -117.1995)]) == []
+    store.apply_updates([{"id": "crash", "type": "crash", "severity": 6, "lat": 33.83, "lon": -117.1925}])
+    monitor.refresh_hazards()
+    assert [a["segment"] for a in _drive(monitor, "bus", [(33.83, -117.1994)])] == [7]
+
+
+def test_refresh_only_realerts_raised_scores_on_touched_routes():
+    store = HazardStore([{"id": "crash", "type": "crash", "severity": 4, "lat": 33.83, "lon": -117.1975}])
+    monitor = RerouteMonitor(lookahead=5, hazard_store=store, buffer_m=30)
+    monitor.register_route("bus", ROUTE)
+    monitor.register_route("far", [(34.5, -118.0), (34.5, -117.99)])
+    assert [(a["type"], a["segment"]) for a in _drive(monitor, "bus", [(33.83, -117.1995)])] == [("hazard_ahead", 2)]
+
+    # Unrelated epochs neither rescore this route nor repeat its alert
+    for i in range(3):
+        store.apply_updates([{"id": f"other{i}", "type": "crash", "severity": 6, "lat": 34.0, "lon": -116.0}])
+        assert monitor.refresh_hazards(store.last_changed) == 0
+        assert _drive(monitor, "bus", [(33.83, -117.1994)]) == []
+
+    # A worse report at the same spot raises the score: alert again, once
+    store.apply_updates([{"id": "crash", "type": "crash", "severity": 7, "lat": 33.83, "lon": -117.1975}])
+    monitor.on_hazard_update(store.epoch, [])
+    assert [(a["type"], a["segment"]) for a in _drive(monitor, "bus", [(33.83, -117.1993)])] == [("hazard_ahead", 2)]
+    assert _drive(monitor, "bus", [(33.83, -117.1992)]) == []
+
+
+def test_off_route_rescans_use_the_route_tree():
+    monitor = RerouteMonitor()
+    monitor.register_route("van", ROUTE)
+    for _ in range(3):
+        assert len(_drive(monitor, "van", [(33.84, -117.19)])) <= 1
+    assert monitor.stats["rescans"] == 3 and monitor._routes["van"].tree is not None
+    assert _drive(monitor, "van", [(33.8301, -117.1855)]) == []   # rejoins 14 segments ahead
+    assert monitor.remaining_route("van")[0][1] == ROUTE[14][1]
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from pavepath.utils.polyline_tools import decode_polyline, decode_polylines, encode_polyline, iter_encode_polyline
+
+# Example from Google's encoded polyline format documentation
+GOOGLE_EXAMPLE = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+GOOGLE_POINTS = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+
+
+def test_decode_matches_reference():
+    assert decode_polyline(GOOGLE_EXAMPLE) == GOOGLE_POINTS
+    coords, offsets = decode_polylines([GOOGLE_EXAMPLE, "", GOOGLE_EXAMPLE])
+    assert coords.dtype == np.float64 and coords.shape == (6, 2)
+    assert offsets.tolist() == [0, 3, 3, 6]
+    assert np.allclose(coords[3:], GOOGLE_POINTS)
+
+
+def test_streaming_encode_roundtrip():
+    assert encode_polyline(GOOGLE_POINTS) == GOOGLE_EXAMPLE
+    rng = np.random.default_rng(0)
+    points = np.cumsum(rng.normal(scale=0.01, size=(5000, 2)), axis=0) + (33.8, -117.2)
+    chunks = list(iter_encode_polyline([points[:1200], points[1200:]], chunk_points=1000))
+    assert len(chunks) == 6
+    decoded, _ = decode_polylines(["".join(chunks)])
+    assert np.abs(decoded - points).max() <= 0.5e-5 + 1e-12
+
+
+@pytest.mark.parametrize("bad", ["_p~iF~ps|U_", "_p~iF", "?\x01"])
+def test_decode_rejects_malformed(bad):
+    with pytest.raises(ValueError):
+        decode_polylines([bad])
@@ -9,3 +9,87 @@ def test_optimize_route_runs():
     points = [(0, 0), (1, 1)]
     route = optimize_route(points)
     assert route is not None
+
+def test_haversine_many_matches_scalar():
+    import numpy as np
+    from pavepath.route_optimizer import haversine_many
+    a = [(33.8121, -117.9190), (34.0522, -118.2437)]
+    b = [(33.7701, -118.1937), (33.8358, -117.9143)]
+    expected = [haversine(p, q) for p, q in zip(a, b)]
+    assert np.allclose(haversine_many(a, b), expected)
+    assert haversine_many(a, b, dtype=np.float32).dtype == np.float32
+
+def test_distance_matrix_symmetric():
+    import numpy as np
+    from pavepath.route_optimizer import distance_matrix
+    points = [(33.8121, -117.9190), (34.0522, -118.2437), (33.7701, -118.1937)]
+    m = distance_matrix(points)
+    assert m.shape == (3, 3)
+    assert np.allclose(m, m.T)
+    assert np.allclose(np.diag(m), 0)
+    assert abs(m[0, 1] - haversine(points[0], points[1])) < 1e-6
+
+def test_core_optimize_route_multi_stop():
+    from pavepath.core.routing import optimize_route as core_optimize
+    stops = [(0, 0), (0, 3), (0, 1), (0, 2)]
+    result = core_optimize(stops)
+    assert result["optimized_route"] == [(0, 0), (0, 1), (0, 2), (0, 3)]
+    assert len(result["segments"]) == 3
+
+def test_segment_table_aggregates_and_dict_view():
+    from pavepath.core.segments import SegmentTable
+    table = SegmentTable.from_records([
+        {"from": (0, 0), "to": (0, 2), "hazard_score": 0.9, "distance_km": 1.5, "composite_cost": 2.0},
+        {"from": (0, 2), "to": (2, 2), "hazard_score": 0.1, "distance_km": 2.5, "composite_cost": 3.0},
+    ])
+    assert len(table) == 2
+    assert table[1]["from"] == (0.0, 2.0) and table[1].get("hazard_score") == 0.1
+    assert abs(table.total_hazard() - 1.0) < 1e-9
+    assert table.high_risk_count(0.7) == 1
+    assert table.midpoints().tolist() == [[0.0, 1.0], [1.0, 2.0]]
+    assert [seg["distance_km"] for seg in table[1:]] == [2.5]
+    table[0].update({"hazard_score": 5.0})  # dicts are snapshots
+    assert table[0]["hazard_score"] == 0.9
+
+def test_core_optimize_route_driving_without_segments(monkeypatch):
+    import pavepath.core.routing as routing
+    monkeypatch.setattr(routing, "get_driving_segments", lambda origin, destination: ([], []))
+    result = routing.optimize_route([(33.83, -117.19), (33.84, -117.18)], mode="driving")
+    assert len(result["segments"]) == 0 and result["directions"] == []
+    assert result["optimized_route"] == [(33.83, -117.19), (33.84, -117.18)]
+
+def test_route_cache_quantized_lru_epoch_and_disk(tmp_path):
+    from pavepath.core.routing import RouteCache, optimize_route
+    stops = [(33.8121, -117.9190), (34.0522, -118.2437), (33.7701, -118.1937)]
+    nearby = [(lat + 1e-6, lon - 1e-6) for lat, lon in stops]
+    cache = RouteCache(path=str(tmp_path / "routes.sqlite"), max_memory_entries=1)
+
+    first = optimize_route(stops, mode="safe", cache=cache)
+    assert cache.stats["misses"] == 1
+    again = optimize_route(nearby, mode="safe", cache=cache)
+    assert again["optimized_route"] == first["optimized_route"] and cache.stats["hits"] == 1
+    assert cache.get(stops, "fast") is None
+
+    cache.set(stops[:2], "safe", {"segments": []})  # evicts the 3-stop route from memory
+    assert len(cache) == 1 and cache.stats["evictions"] == 1
+    assert cache.get(stops, "safe") is not None and cache.stats["disk_hits"] == 1
+
+    reopened = RouteCache(path=str(tmp_path / "routes.sqlite"))
+    assert reopened.get(stops, "safe")["segments"].total_distance_km() == first["segments"].total_distance_km()
+    assert reopened.bump_epoch() == 1 and reopened.get(stops, "safe") is None
+    assert reopened.bump_epoch(0) == 1
+    assert RouteCache(path=str(tmp_path / "routes.sqlite")).epoch == 1
+
+def test_route_cache_stores_json_not_pickles(tmp_path):
+    import json
+    import sqlite3
+    from pavepath.core.routing import RouteCache, optimize_route
+    path = str(tmp_path / "routes.sqlite")
+    stops = [(33.8121, -117.9190), (34.0522, -118.2437), (33.7701, -118.1937)]
+    first = optimize_route(stops, cache=RouteCache(path=path))
+
+    (raw,) = sqlite3.connect(path).execute("SELECT value FROM route_entries").fetchone()
+    assert json.loads(raw)["mode"] == "safe"
+    reloaded = RouteCache(path=path).get(stops, "safe")
+    assert reloaded["optimized_route"] == first["optimized_route"]
+    assert reloaded["segments"].composite_cost.tolist() == first["segments"].composite_cost.tolist()
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pavepath.service import MicroBatcher, RoutingService
+
+
+def _request(port, method, path, payload=None):
+    async def go():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        raw = await reader.read()
+        writer.close()
+        head, _, data = raw.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(data)
+    return go()
+
+
+def _service(**options):
+    executor = ThreadPoolExecutor(max_workers=2)
+    return RoutingService(executor=executor, io_executor=executor, cache=None, **options)
+
+
+def test_route_and_analyze_endpoints():
+    async def scenario():
+        service = _service()
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        legs = [[[33.81, -117.91], [33.83, -117.90]], [[34.05, -118.24], [33.77, -118.19]]]
+        responses = await asyncio.gather(*[
+            _request(port, "POST", "/route", {"locations": leg, "mode": "fast"}) for leg in legs
+        ], _request(port, "POST", "/route", {"locations": [[33.81, -117.91], [34.05, -118.24], [33.77, -118.19]]}))
+        hazards = [{"type": "flood", "severity": 5, "location": "x"}]
+        analysis = await _request(port, "POST", "/analyze", {"route": [{"id": "s1", "hazards": hazards}]})
+        bad = await _request(port, "POST", "/route", {"locations": [[1, 2]]})
+        missing = await _request(port, "GET", "/nowhere")
+        server.close()
+        service.close()
+        return responses, analysis, bad, missing
+
+    responses, analysis, bad, missing = asyncio.run(scenario())
+    assert [status for status, _ in responses] == [200, 200, 200]
+    (_, first), _, (_, multi) = responses
+    assert first["segments"][0]["from"] == [33.81, -117.91] and first["mode"] == "fast"
+    assert len(multi["segments"]) == 2
+    assert analysis[0] == 200 and "segment_scores" in analysis[1]
+    assert bad[0] == 400 and missing[0] == 404
+
+
+def test_micro_batching_backpressure_and_timeout():
+    batches = []
+    release = threading.Event()
+
+    def handler(items):
+        batches.append(list(items))
+        release.wait(1)
+        return [item * 2 for item in items]
+
+    async def scenario():
+        executor = ThreadPoolExecutor(max_workers=1)
+        batcher = MicroBatcher(handler, executor, max_batch=8, max_delay_s=0.01)
+        release.set()
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(5)])
+
+        service = _service(max_pending=1, request_timeout_s=0.05)
+
+        async def slow_dispatch(method, target, body):
+            await asyncio.sleep(1)
+        service.dispatch = slow_dispatch
+        first, second = await asyncio.gather(service.handle("GET", "/health", b""),
+                                             service.handle("GET", "/health", b""))
+        service.close()
+        executor.shutdown()
+        return results, first, second
+
+    results, first, second = asyncio.run(scenario())
+    assert results == [0, 2, 4, 6, 8] and batches == [[0, 1, 2, 3, 4]]
+    assert sorted([first[0], second[0]]) == [503, 504]
+
+
+def test_batch_handlers_match_single_request_paths():
+    from pavepath.core.routing import optimize_route
+    from pavepath.hazard_service import analyze_route
+    from pavepath.service import analyze_batch, route_batch
+
+    stops = [[(33.81, -117.91), (34.05, -118.24), (33.77, -118.19), (33.90, -117.80)],
+             [(33.70, -117.50), (33.60, -117.40), (33.65, -117.70), (33.95, -117.45)]]
+    batched = route_batch([(s, "safe") for s in stops] + [([(1, 2), (3,)], "safe")])
+    for locations, result in zip(stops, batched):
+        assert result["optimized_route"] == optimize_route(locations, "safe")["optimized_route"]
+    assert isinstance(batched[-1], Exception)
+
+    requests = [
+        ([{"id": "a", "location": "A", "surface": "gravel"}, {"location": "B", "flood_risk": True}],
+         {"A": "gravel"}, 4),
+        ({"segments": [{"location": "A", "surface": "unpaved"}]}, {"A": "paved"}, 2),
+        (7, None, 4),
+    ]
+    results = analyze_batch(requests)
+    for (route, surface_data, threshold), result in zip(requests[:2], results):
+        expected = analyze_route(route, surface_data, threshold)
+        assert {k: result[k] for k in ("hazards", "segment_scores", "should_reroute")} == \
+            {k: expected[k] for k in ("hazards", "segment_scores", "should_reroute")}
+    assert isinstance(results[2], Exception)
+
+
+def test_route_cache_io_runs_off_the_event_loop():
+    calls = []
+
+    class RecordingCache:
+        def get(self, locations, mode):
+            calls.append(threading.current_thread())
+
+        def set(self, locations, mode, result):
+            calls.append(threading.current_thread())
+
+    async def scenario():
+        service = _service()
+        service.cache = RecordingCache()
+        await service.route({"locations": [[33.81, -117.91], [33.83, -117.90]]})
+        service.close()
+
+    asyncio.run(scenario())
+    assert len(calls) == 2 and threading.main_thread() not in calls
+
+
+def test_bad_request_does_not_fail_its_batch():
+    from pavepath.service import analyze_batch, route_batch
+
+    leg = [(33.81, -117.91), (33.83, -117.90)]
+    routed = route_batch([(leg, "safe"), (leg, ["x"])])
+    assert routed[0]["optimized_route"] == leg and isinstance(routed[1], Exception)
+    route = [{"location": "A", "flood_risk": True}]
+    analyzed = analyze_batch([(route, None, 4), (route, None, "high"), (route, ["gravel"], 4)])
+    assert analyzed[0]["should_reroute"] and all(isinstance(r, Exception) for r in analyzed[1:])
+
+    async def scenario():
+        service = _service(max_delay_s=0.05)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        responses = await asyncio.gather(
+            _request(port, "POST", "/analyze", {"route": route}),
+            _request(port, "POST", "/analyze", {"route": route, "risk_threshold": "high"}),
+            _request(port, "POST", "/analyze", {"route": route, "surface_data": ["gravel"]}),
+            _request(port, "POST", "/route", {"locations": leg}),
+            _request(port, "POST", "/route", {"locations": leg, "mode": ["x"]}),
+        )
+        server.close()
+        service.close()
+        return [status for status, _ in responses]
+
+    assert asyncio.run(scenario()) == [200, 400, 400, 200, 400]
@@ -0,0 +1,30 @@
+import itertools
+import time
+
+import numpy as np
+
+from pavepath.core.solver import nearest_neighbour_tour, solve_route, tour_cost
+from pavepath.route_optimizer import distance_matrix
+
+
+def _random_stops(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(33.5, 34.0, n), rng.uniform(-118.0, -117.5, n)])
+
+
+def test_solve_route_matches_brute_force_on_small_instance():
+    costs = distance_matrix(_random_stops(7))
+    tour = solve_route(costs, start=0)
+    best = min(tour_cost(costs, (0,) + p) for p in itertools.permutations(range(1, 7)))
+    assert tour[0] == 0
+    assert sorted(tour) == list(range(7))
+    assert tour_cost(costs, tour) <= best * 1.05
+
+
+def test_solve_route_improves_on_seed_within_budget():
+    costs = distance_matrix(_random_stops(300, seed=1))
+    start = time.perf_counter()
+    tour = solve_route(costs, time_budget_s=0.5)
+    assert time.perf_counter() - start < 1.0
+    assert sorted(tour) == list(range(300))
+    assert tour_cost(costs, tour) < tour_cost(costs, nearest_neighbour_tour(costs))
@@ -0,0 +1,159 @@
+import pytest
+
+gpd = pytest.importorskip("geopandas")
+import numpy as np
+from shapely.geometry import LineString
+
+from surface_overlay.mapper import RoadIndex, filter_roads
+
+
+@pytest.fixture
+def roads():
+    return gpd.GeoDataFrame(
+        {"surface": ["dirt", "paved", "paved"], "name": ["Farm Trail", "Orchard Ave", "Main St"]},
+        geometry=[
+            LineString([(-117.189, 33.832), (-117.190, 33.833)]),
+            LineString([(-117.191, 33.834), (-117.192, 33.835)]),
+            LineString([(-117.300, 33.900), (-117.301, 33.901)]),
+        ],
+        crs="EPSG:4326",
+    )
+
+
+def test_road_index_bbox_and_filter(roads):
+    index = RoadIndex(roads)
+    hits = index.roads_in_bbox(-117.195, 33.830, -117.185, 33.836)
+    assert list(hits["name"]) == ["Farm Trail", "Orchard Ave"]
+    assert list(filter_roads(index, "paved")["name"]) == list(filter_roads(roads, "paved")["name"])
+
+
+def test_road_index_nearest_and_along(roads):
+    index = RoadIndex(roads)
+    row, distance_m = index.nearest_road(33.8321, -117.1891)
+    assert row["name"] == "Farm Trail"
+    assert distance_m < 20
+
+    along = index.roads_along([(33.8335, -117.1905), (33.8345, -117.1915)], buffer_m=100)
+    assert set(along["name"]) == {"Farm Trail", "Orchard Ave"}
+    assert index.roads_along([(33.0, -117.0)], buffer_m=100).empty
+
+
+def test_compiled_roads_roundtrip(tmp_path, roads):
+    import numpy as np
+    from pavepath.cli import main
+    from surface_overlay.compiled import load_compiled_roads
+    from surface_overlay.mapper import load_roads
+
+    source = tmp_path / "roads.geojson"
+    roads.to_file(source, driver="GeoJSON")
+    assert main(["roads", "compile", str(source)]) == 0
+
+    compiled = load_compiled_roads(str(source) + ".roads")
+    assert isinstance(compiled.coords, np.memmap)
+    assert len(compiled) == 3
+    assert list(compiled.surface) == ["dirt", "paved", "paved"]
+
+    loaded = load_roads(str(source))  # picks up the compiled sibling
+    assert list(loaded["name"]) == list(roads["name"])
+    assert all(a.equals(b) for a, b in zip(loaded.geometry, roads.geometry))
+
+
+def test_recompile_after_source_edit_is_picked_up(tmp_path, roads):
+    import os
+
+    from pavepath.cli import main
+    from surface_overlay.compiled import CompiledRoads, compiled_path, compiled_mtime
+    from surface_overlay.mapper import filter_roads, load_roads, open_roads
+
+    source = tmp_path / "roads.geojson"
+    roads.to_file(source, driver="GeoJSON")
+    assert main(["roads", "compile", str(source)]) == 0
+    first = compiled_mtime(compiled_path(source))
+
+    edited = roads.copy()
+    edited.loc[2, "surface"] = "dirt"
+    edited.to_file(source, driver="GeoJSON")
+    os.utime(source, ns=(os.stat(source).st_atime_ns, os.stat(source).st_mtime_ns + 10**9))
+    assert open_roads(str(source)) is None  # stale: falls back to the source file
+    assert list(load_roads(str(source))["surface"]) == ["dirt", "paved", "dirt"]
+
+    assert main(["roads", "compile", str(source)]) == 0
+    assert compiled_mtime(compiled_path(source)) >= first
+    compiled = open_roads(str(source))
+    assert isinstance(compiled, CompiledRoads)
+    dirt = filter_roads(compiled, "dirt")
+    assert list(dirt["name"]) == ["Farm Trail", "Main St"]
+    assert dirt.geometry.iloc[1].equals(roads.geometry.iloc[2])
+
+
+def test_layer_paths_and_colours(roads):
+    import folium
+    from pavepath.utils.color_map import score_to_color, scores_to_rgb, RAMP_RGB, UNSCORED_RGB
+    from surface_overlay.layers import path_layer_data
+    from surface_overlay.mapper import add_roads_to_map
+
+    data = path_layer_data(roads, scores=[0.1, 0.9, None])
+    assert data["path"][0] == [[-117.189, 33.832], [-117.190, 33.833]]
+    assert data["color"].tolist() == [RAMP_RGB[0].tolist(), RAMP_RGB[3].tolist(), UNSCORED_RGB.tolist()]
+
+    scores = [0.0, 0.3, 0.6, 0.8]
+    assert [RAMP_RGB.tolist().index(c) for c in scores_to_rgb(scores).tolist()] == [0, 1, 2, 3]
+    assert [score_to_color(s) for s in scores] == ["green", "yellow", "orange", "red"]
+
+    fmap = folium.Map()
+    add_roads_to_map(fmap, roads)
+    lines = [c for c in fmap._children.values() if isinstance(c, folium.PolyLine)]
+    assert sorted(line.options["color"] for line in lines) == ["brown", "gray"]
+
+
+def test_road_tiles_viewport_and_lod():
+    from surface_overlay.tiles import RoadTiles, tile_bounds
+
+    # A wiggly road (metre-scale zig-zag) plus one far away
+    xs = -117.19 + np.linspace(0, 0.01, 101)
+    ys = 33.83 + np.where(np.arange(101) % 2, 0.00002, 0.0)
+    far = LineString([(-117.5, 34.1), (-117.49, 34.11)])
+    roads = gpd.GeoDataFrame({"name": ["Wiggle Rd", "Far Rd"], "surface": ["dirt", None],
+                              "hazard_score": [3.0, np.nan]},
+                             geometry=[LineString(np.column_stack([xs, ys])), far], crs="EPSG:4326")
+    tiles = RoadTiles(roads)
+
+    near = tiles.geojson(-117.2, 33.82, -117.17, 33.84, zoom=16)
+    assert [f["properties"] for f in near["features"]] == [
+        {"name": "Wiggle Rd", "surface": "dirt", "hazard_score": 3.0}
+    ]
+    detailed = len(near["features"][0]["geometry"]["coordinates"])
+    coarse = len(tiles.geojson(-117.2, 33.82, -117.17, 33.84, zoom=9)["features"][0]["geometry"]["coordinates"])
+    assert coarse == 2 < detailed
+
+    far_tile = tiles.tile(12, 711, 1634)
+    min_lon, min_lat, max_lon, max_lat = tile_bounds(12, 711, 1634)
+    assert min_lon < -117.5 < max_lon and min_lat < 34.1 < max_lat
+    assert [f["properties"]["name"] for f in far_tile["features"]] == ["Far Rd"]
+    assert far_tile["features"][0]["properties"]["surface"] is None
+
+
+def test_colour_bands_keep_their_cut_offs():
+    from pavepath.utils.color_map import RAMP_RGB, UNSCORED_RGB, score_to_color, threshold_rgb
+
+    # score_to_color: strictly above 0.25 / 0.5 / 0.75 moves up a band
+    scores = [0.0, 0.25, 0.26, 0.5, 0.51, 0.75, 0.76, 1.0]
+    assert [score_to_color(s) for s in scores] == \
+        ["green", "green", "yellow", "yellow", "orange", "orange", "red", "red"]
+
+    # The road map at the default threshold of 6: yellow from 3, red from 6
+    green, yellow, red = RAMP_RGB[0].tolist(), RAMP_RGB[1].tolist(), RAMP_RGB[3].tolist()
+    colors = threshold_rgb([0.0, 2.9, 3.0, 5.9, 6.0, 9.5, np.nan], 6.0).tolist()
+    assert colors == [green, green, yellow, yellow, red, red, UNSCORED_RGB.tolist()]
+
+
+def test_layer_coordinate_order(roads):
+    from surface_overlay.layers import path_layer_data, surface_polylines
+
+    # pydeck PathLayer paths are [lon, lat] (the road geometry's own order); the old
+    # per-row helper emitted [lat, lon], which drew roads at the wrong place
+    paths = path_layer_data(roads)["path"].tolist()
+    assert paths == [[list(xy) for xy in geom.coords] for geom in roads.geometry]
+    assert all(-118 < lon < -117 and 33 < lat < 34 for path in paths for lon, lat in path)
+    # folium polylines stay (lat, lon)
+    assert surface_polylines(roads)["brown"] == [[[33.832, -117.189], [33.833, -117.190]]]